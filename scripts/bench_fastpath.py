@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Measure the intent fast path: hit rate, wrong hits and latency per path."""
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from fake_ha import FakeHomeAssistant
+from malone.conversation.fastpath import IntentMatcher
+from malone.embedding import build_embedder
+from malone.homeassistant import client as ha_client
+from malone.homeassistant import state as ha_state
+from malone.tools.executor import ToolExecutor
+from malone.tools.registry import ToolRegistry
+
+# (utterance, expected tool or None when the LLM should handle it)
+UTTERANCES = [
+    ("What time is it?", "get_current_time"),
+    ("Hey Malone, what's the time", "get_current_time"),
+    ("do you know what time it is", "get_current_time"),
+    ("What's the date today?", "get_current_time"),
+    ("which day of the week is it", "get_current_time"),
+    ("Turn on the porch light", "ha_control_device"),
+    ("turn off the bedroom fan please", "ha_control_device"),
+    ("Switch the kitchen lights off", "ha_control_many"),
+    ("turn off all the living room lights", "ha_control_many"),
+    ("Dim the living room lamp to 30 percent", "ha_control_device"),
+    ("set the thermostat to 21 degrees", "ha_control_device"),
+    ("Run the movie night scene", "ha_trigger_scene"),
+    ("activate good morning", "ha_trigger_scene"),
+    ("what jobs are running", "job_status"),
+    ("turn on the kitchen light", None),  # ambiguous: several kitchen lights
+    ("turn on the garage door opener", None),  # no such device
+    ("turn off the lights", None),  # every light in the house: ask the LLM
+    ("shut off the garage door", None),  # a cover: no turn_off service
+    ("What's the weather going to be like tomorrow?", None),
+    ("Can you check why the nginx pod keeps restarting", None),
+    ("Write a python script that renames my photos by date", None),
+    ("What is the time complexity of quicksort?", None),
+    ("Tell me a joke", None),
+    ("run the test suite for the router", None),
+    ("How much disk space is left on the NAS", None),
+    ("Remind me what we talked about yesterday", None),
+    ("What time is it in Tokyo?", None),  # close to "what time is it", but not local time
+    ("what time is it in london", None),
+    ("what time is it there", None),
+    ("do you know what time it is in paris", None),
+    ("what day is it tomorrow", None),
+    ("what jobs are running on kubernetes", None),  # pods, not background jobs
+]
+
+
+def _percentiles(samples: list[float]) -> str:
+    if not samples:
+        return "n=0"
+    ms = np.asarray(samples) * 1000
+    p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+    return f"n={len(ms):<4} p50 {p50:7.3f} ms  p90 {p90:7.3f} ms  p99 {p99:7.3f} ms"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--embedder", default="hashing",
+                        help="'hashing', 'none' or a sentence-transformers model")
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--repeat", type=int, default=50, help="Match passes for timing")
+    args = parser.parse_args()
+
+    print("=== Malone AI - Intent Fast Path Benchmark ===\n")
+
+    server = FakeHomeAssistant(n_entities=200)
+    url = await server.start()
+    mirror = ha_state.StateMirror(url, server.token)
+    client = ha_client.HomeAssistantClient(url, server.token)
+    # Point the app-wide singletons at the fake instance
+    ha_state.get_state_mirror.cache_clear()
+    ha_state.get_state_mirror = lambda: mirror
+    ha_client.get_ha_client = lambda: client
+    import malone.conversation.fastpath as fastpath
+    import malone.homeassistant.resolver as resolver
+    import malone.tools.builtin.home_assistant as ha_tools
+    resolver.get_entity_resolver.cache_clear()
+    entity_resolver = resolver.EntityResolver(mirror)
+    for module in (fastpath, ha_tools):
+        module.get_state_mirror = lambda: mirror
+        module.get_entity_resolver = lambda: entity_resolver
+    ha_tools.get_ha_client = lambda: client
+
+    mirror.start()
+    await asyncio.wait_for(mirror.ready.wait(), 10)
+
+    matcher = IntentMatcher(embedder=build_embedder(args.embedder), threshold=args.threshold)
+    registry = ToolRegistry()
+    registry.auto_discover()
+    executor = ToolExecutor(registry)
+
+    hits = wrong = missed = 0
+    match_times: dict[str, list[float]] = {"hit": [], "miss": []}
+    tool_times: list[float] = []
+    try:
+        for text, expected in UTTERANCES:
+            intent = matcher.match(text)
+            got = intent.tool if intent else None
+            if got is not None:
+                hits += 1
+                start = time.perf_counter()
+                result = await executor.execute(intent.tool, intent.arguments)
+                tool_times.append(time.perf_counter() - start)
+                reply = intent.reply(result)
+            else:
+                reply = "(LLM)"
+            if got != expected:
+                if got is None:
+                    missed += 1
+                else:
+                    wrong += 1
+            mark = "ok " if got == expected else "BAD"
+            print(f"  {mark} {text[:48]:<48} -> {got or '-':<18} {reply[:40]}")
+
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                matcher.match(text)
+                match_times["hit" if got else "miss"].append(time.perf_counter() - start)
+    finally:
+        await mirror.stop()
+        await client.close()
+        await server.stop()
+
+    print(f"\n  Hit rate: {hits}/{len(UTTERANCES)} ({hits / len(UTTERANCES):.0%}), "
+          f"wrong hits: {wrong}, missed intents: {missed}")
+    print(f"  Match (hit):     {_percentiles(match_times['hit'])}")
+    print(f"  Match (miss):    {_percentiles(match_times['miss'])}")
+    print(f"  Tool call (hit): {_percentiles(tool_times)}")
+    print("\n  A fast-path hit replaces one or two LLM round trips "
+          "(typically 0.5-3 s each).")
+
+    print("\n=== Benchmark complete ===")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Benchmark per-call Home Assistant latency: fresh client per call vs pooled client."""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from fake_ha import FakeHomeAssistant
+from malone.homeassistant.client import HomeAssistantClient
+
+
+def _report(label: str, samples: list[float]):
+    ms = sorted(s * 1000 for s in samples)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    print(f"  {label:<28} mean {statistics.mean(ms):6.2f} ms   "
+          f"p50 {statistics.median(ms):6.2f} ms   p95 {p95:6.2f} ms")
+
+
+async def _per_call_client(url: str, token: str, n: int) -> list[float]:
+    """The old pattern: a new AsyncClient (and TCP connection) for every call."""
+    samples = []
+    for i in range(n):
+        start = time.perf_counter()
+        async with httpx.AsyncClient(timeout=10) as client:
+            resp = await client.post(
+                f"{url}/api/services/light/toggle",
+                headers={"Authorization": f"Bearer {token}"},
+                json={"entity_id": "light.kitchen_light_0"},
+            )
+            resp.raise_for_status()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def _pooled_client(url: str, token: str, n: int) -> list[float]:
+    client = HomeAssistantClient(url, token)
+    samples = []
+    try:
+        for i in range(n):
+            start = time.perf_counter()
+            await client.call_service("light", "toggle", {"entity_id": "light.kitchen_light_0"})
+            samples.append(time.perf_counter() - start)
+    finally:
+        await client.close()
+    return samples
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=200, help="Calls per variant")
+    parser.add_argument("--entities", type=int, default=200)
+    args = parser.parse_args()
+
+    print("=== Malone AI - Home Assistant Client Benchmark ===\n")
+
+    server = FakeHomeAssistant(n_entities=args.entities)
+    url = await server.start()
+    print(f"Fake Home Assistant at {url}, {args.n} service calls per variant\n")
+
+    try:
+        conns = server.connections
+        before = await _per_call_client(url, server.token, args.n)
+        before_conns = server.connections - conns
+
+        conns = server.connections
+        after = await _pooled_client(url, server.token, args.n)
+        after_conns = server.connections - conns
+    finally:
+        await server.stop()
+
+    _report(f"per-call client ({before_conns} conns)", before)
+    _report(f"pooled client ({after_conns} conns)", after)
+    speedup = statistics.mean(before) / statistics.mean(after)
+    print(f"\n  Pooled client is {speedup:.1f}x faster per call "
+          "(local HTTP; TLS to a real instance widens the gap)")
+
+    print("\n=== Benchmark complete ===")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
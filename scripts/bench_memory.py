@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Benchmark long-term memory retrieval on synthetic corpora.
+
+Fills a MemoryStore with clustered random unit vectors (standing in for
+sentence embeddings) and compares exhaustive search with the IVF index:
+latency per query and recall of the exact top-k.
+"""
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from malone.embedding import Embedder
+from malone.memory.store import Memory, MemoryStore
+
+
+class RandomEmbedder(Embedder):
+    """Clustered unit vectors: topics plus noise, like embeddings of real turns."""
+
+    def __init__(self, dim: int, topics: int = 500, seed: int = 0):
+        self.dim = dim
+        self.rng = np.random.default_rng(seed)
+        self.centers = self._unit(self.rng.standard_normal((topics, dim)))
+
+    @staticmethod
+    def _unit(x: np.ndarray) -> np.ndarray:
+        return (x / np.linalg.norm(x, axis=1, keepdims=True)).astype(np.float32)
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        topics = self.rng.integers(len(self.centers), size=len(texts))
+        noise = self.rng.standard_normal((len(texts), self.dim)) * 0.06
+        return self._unit(self.centers[topics] + noise)
+
+
+def _percentiles(samples: list[float]) -> str:
+    ms = np.array(samples) * 1000
+    return f"p50 {np.percentile(ms, 50):6.2f} ms  p99 {np.percentile(ms, 99):6.2f} ms"
+
+
+def bench(size: int, dim: int, queries: int, k: int, nprobe: int):
+    embedder = RandomEmbedder(dim)
+    with tempfile.TemporaryDirectory() as path:
+        store = MemoryStore(path, embedder, min_score=-1.0, nprobe=nprobe, index_min=size + 1)
+        start = time.perf_counter()
+        batch = 5000
+        for i in range(0, size, batch):
+            n = min(batch, size - i)
+            store.add([Memory(f"memory {i + j}", "turn", time.time(), "") for j in range(n)])
+        print(f"\n{size} memories x {dim} dims: stored in {time.perf_counter() - start:.1f}s")
+
+        probes = embedder.embed([""] * queries)
+        exact, exact_times = [], []
+        for q in probes:
+            t = time.perf_counter()
+            exact.append({m.text for m in store.search_vector(q, k)})
+            exact_times.append(time.perf_counter() - t)
+        print(f"  exhaustive   {_percentiles(exact_times)}")
+
+        store.reindex()
+        hits, ivf_times = 0, []
+        for q, truth in zip(probes, exact):
+            t = time.perf_counter()
+            found = {m.text for m in store.search_vector(q, k)}
+            ivf_times.append(time.perf_counter() - t)
+            hits += len(found & truth)
+        print(f"  IVF nprobe={nprobe:<2} {_percentiles(ivf_times)}  "
+              f"recall@{k} {hits / (k * queries):.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--dim", type=int, default=384, help="all-MiniLM-L6-v2 is 384")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--nprobe", type=int, default=8)
+    args = parser.parse_args()
+
+    print("=== Malone AI - Memory Retrieval Benchmark ===")
+    for size in args.sizes:
+        bench(size, args.dim, args.queries, args.k, args.nprobe)
+    print("\n=== Benchmark complete ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Benchmark turn latency with and without the VAD/STT/TTS thread plan.
+
+Transcribes a synthesized question and synthesizes a reply, first one
+after the other and then overlapping (the next utterance is transcribed
+while the reply is still being synthesized), with every engine on its
+default thread count and then with the cores partitioned by
+plan_threads(). Lower is better; the overlap case is where contention
+shows.
+"""
+
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from malone.config.settings import get_settings
+from malone.cpu import StageGate, available_cores, plan_threads
+from malone.stt.transcriber import Transcriber
+from malone.tts.synthesizer import TTSSynthesizer
+
+QUESTION = "How many pods are running in the monitoring namespace right now?"
+REPLY = (
+    "There are five pods in the monitoring namespace. "
+    "Prometheus, Grafana and the node exporter are running normally. "
+    "The alert manager restarted twice in the last hour but is ready now. "
+    "The blackbox exporter is still pending because its image is being pulled."
+)
+
+
+def to_whisper_input(pcm: bytes, rate: int) -> bytes:
+    """Piper's int16 audio resampled to the 16 kHz Whisper expects."""
+    audio = np.frombuffer(pcm, dtype=np.int16).astype(np.float32)
+    positions = np.arange(0, len(audio), rate / 16000)
+    return np.interp(positions, np.arange(len(audio)), audio).astype(np.int16).tobytes()
+
+
+async def turn(transcriber: Transcriber, tts: TTSSynthesizer, audio: bytes, overlap: bool) -> float:
+    start = time.perf_counter()
+    if overlap:
+        await asyncio.gather(
+            asyncio.to_thread(transcriber.transcribe, audio), tts.synthesize(REPLY)
+        )
+    else:
+        await asyncio.to_thread(transcriber.transcribe, audio)
+        await tts.synthesize(REPLY)
+    return time.perf_counter() - start
+
+
+async def bench(name: str, plan: dict, repeats: int):
+    settings = get_settings()
+    gate = StageGate()
+    transcriber = Transcriber(
+        model_size=settings.stt.model_size,
+        device=settings.stt.device,
+        compute_type=settings.stt.compute_type,
+        threads=plan.get("stt"),
+        gate=gate,
+    )
+    tts = TTSSynthesizer(
+        voice=settings.tts.voice, workers=settings.tts.workers, threads=plan.get("tts"), gate=gate
+    )
+    audio = to_whisper_input(bytes(await tts.synthesize(QUESTION)), tts.sample_rate)
+    await turn(transcriber, tts, audio, overlap=False)  # warm up
+
+    for overlap in (False, True):
+        times = sorted([await turn(transcriber, tts, audio, overlap) for _ in range(repeats)])
+        label = "overlapped" if overlap else "sequential"
+        print(f"  {name:<11} {label}: median {times[len(times) // 2] * 1000:6.0f} ms  "
+              f"best {times[0] * 1000:6.0f} ms")
+    tts.close()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--pin", action="store_true", help="also pin STT and TTS to their cores")
+    args = parser.parse_args()
+
+    config = get_settings().threads.model_copy(update={"pin": args.pin})
+    plan = plan_threads(config, get_settings().tts.workers)
+    print("=== Malone AI - Thread Plan Benchmark ===\n")
+    print(f"Cores: {len(available_cores())}")
+    for stage, threads in plan.items():
+        print(f"  {stage}: {threads.intra} threads" + (f" on {list(threads.cores)}" if threads.cores else ""))
+    print()
+    await bench("default", {}, args.repeats)
+    await bench("partitioned", plan, args.repeats)
+    print("\n=== Benchmark complete ===")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
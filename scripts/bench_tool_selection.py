@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Compare sending all tool schemas vs per-turn tool selection.
+
+Reports selection recall, schemas and estimated prompt tokens per turn.
+With --ollama, also sends each utterance to the configured Ollama model
+both ways and reports the prompt tokens and first-token latency it measures.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from malone.config.settings import get_settings
+from malone.tools.registry import ToolRegistry
+from malone.tools.selector import RequestMoreToolsTool, ToolSelector
+
+# (utterance, tool the model should call)
+UTTERANCES = [
+    ("Turn off the kitchen lights", "ha_control_device"),
+    ("Set the thermostat to 21 degrees", "ha_control_device"),
+    ("Turn off everything downstairs", "ha_control_many"),
+    ("Which lights are on right now?", "ha_list_entities"),
+    ("Activate the movie night scene", "ha_trigger_scene"),
+    ("What time is it?", "get_current_time"),
+    ("How much memory does this machine have?", "get_system_info"),
+    ("List the files in my downloads folder", "run_shell_command"),
+    ("Check the uptime on the NAS server", "ssh_command"),
+    ("Why does the nginx pod keep restarting?", "kubectl"),
+    ("Look up the opening hours of the library website", "browse_web"),
+    ("Add a feature so you can set timers", "claude_code"),
+    ("Is my background job finished yet?", "job_status"),
+    ("Cancel that job", "job_cancel"),
+]
+
+
+def _tokens(schemas: list[dict]) -> int:
+    """Rough token estimate for serialized schemas (about 4 chars per token)."""
+    return len(json.dumps(schemas)) // 4
+
+
+async def _measure_ollama(messages: list[dict], schemas: list[dict]) -> tuple[int, float]:
+    from malone.llm.ollama_client import OllamaClient
+
+    client = OllamaClient(get_settings().ollama)
+    response = await client.chat(messages, tools=schemas, on_tool_call=lambda call: None)
+    return response.usage.get("input_tokens", 0), response.first_token
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=4)
+    parser.add_argument("--ollama", action="store_true",
+                        help="Also measure real prompt tokens and first-token latency")
+    args = parser.parse_args()
+
+    print("=== Malone AI - Tool Selection Benchmark ===\n")
+
+    registry = ToolRegistry()
+    registry.auto_discover()
+    selector = ToolSelector(
+        registry, core=["get_current_time", "request_more_tools"], limit=args.limit
+    )
+    registry.register(RequestMoreToolsTool(selector))
+    all_schemas = registry.get_all_schemas()
+    print(f"{len(all_schemas)} tools, ~{_tokens(all_schemas)} tokens of schemas when all are sent\n")
+
+    hits = 0
+    sizes, select_times = [], []
+    for text, expected in UTTERANCES:
+        start = time.perf_counter()
+        names = selector.begin_turn(text)
+        select_times.append(time.perf_counter() - start)
+        schemas = registry.get_schemas(names)
+        sizes.append(_tokens(schemas))
+        found = expected in names
+        hits += found
+        print(f"  {'ok ' if found else 'MISS'} {text[:44]:<44} {len(names):>2} tools "
+              f"~{sizes[-1]:>4} tok  {', '.join(n for n in names if n not in selector.core)}")
+
+    print(f"\n  Recall: {hits}/{len(UTTERANCES)} turns had the needed tool "
+          "(misses can still use request_more_tools)")
+    print(f"  Schema tokens per turn: ~{statistics.mean(sizes):.0f} selected "
+          f"vs ~{_tokens(all_schemas)} all")
+    print(f"  Selection time: mean {statistics.mean(select_times) * 1e6:.0f} us")
+
+    if args.ollama:
+        print("\nMeasuring with Ollama (streaming, first round only)...")
+        system = {"role": "system", "content": get_settings().system_prompt}
+        rows = []
+        for text, _ in UTTERANCES:
+            messages = [system, {"role": "user", "content": text}]
+            full = await _measure_ollama(messages, all_schemas)
+            picked = await _measure_ollama(messages, registry.get_schemas(selector.begin_turn(text)))
+            rows.append((full, picked))
+        for label, index in (("all tools", 0), ("selected", 1)):
+            tokens = statistics.mean(row[index][0] for row in rows)
+            first = statistics.median(row[index][1] for row in rows) * 1000
+            print(f"  {label:<10} prompt tokens {tokens:6.0f}   first token p50 {first:6.0f} ms")
+
+    print("\n=== Benchmark complete ===")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
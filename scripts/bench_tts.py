@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Benchmark Piper synthesis throughput as the worker pool grows.
+
+Synthesizes a long multi-sentence reply (no phrase cache) with 1, 2, 4...
+Piper sessions and reports characters per second, the real-time factor
+and how soon the first sentence is ready to play.
+"""
+
+import argparse
+import asyncio
+import time
+
+from malone.config.settings import get_settings
+from malone.tts.synthesizer import TTSSynthesizer
+
+TEXT = (
+    "The nginx deployment has three replicas and two of them are running. "
+    "The third pod is in CrashLoopBackOff after exiting with code one. "
+    "Its logs show that the configuration file failed to parse on line forty two. "
+    "The most recent change to the config map added an upstream block without a closing brace. "
+    "Restoring the previous version of the config map should let the pod start again. "
+    "After that, the rollout will replace the failed pod automatically. "
+    "You may also want to add a readiness probe so broken pods never receive traffic. "
+    "I can make either change for you if you like."
+)
+
+
+async def bench(voice: str, workers: int, repeats: int):
+    tts = TTSSynthesizer(voice=voice, workers=workers)
+    await tts.synthesize("Warming up.")
+    totals, firsts = [], []
+    audio_bytes = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        first = None
+        audio_bytes = 0
+        async for chunk in tts.stream(TEXT):
+            if first is None:
+                first = time.perf_counter() - start
+            audio_bytes += len(chunk)
+        totals.append(time.perf_counter() - start)
+        firsts.append(first)
+    tts.close()
+
+    elapsed = min(totals)
+    audio_seconds = audio_bytes / 2 / tts.sample_rate
+    print(f"  workers={workers}: {len(TEXT) / elapsed:7.0f} chars/s  "
+          f"{audio_seconds / elapsed:5.1f}x real time  "
+          f"first sentence {min(firsts) * 1000:5.0f} ms  total {elapsed * 1000:6.0f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    voice = get_settings().tts.voice
+    print("=== Malone AI - TTS Benchmark ===\n")
+    print(f"Voice: {voice}, {len(TEXT)} characters\n")
+    for workers in args.workers:
+        await bench(voice, workers, args.repeats)
+    print("\n=== Benchmark complete ===")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Benchmark idle CPU use of speech detection with and without the energy gate.
+
+Feeds a quiet room (low noise, mains hum and the odd knock; or a WAV
+recording of your own room) through Silero VAD block by block at real
+time, once on every block and once behind EnergyGate, and reports the
+process CPU percentage and how many blocks reached Silero.
+"""
+
+import argparse
+import time
+import wave
+
+import numpy as np
+
+from malone.audio.gate import EnergyGate
+from malone.audio.vad import VoiceActivityDetector
+from malone.config.settings import get_settings
+from malone.cpu import plan_threads
+
+
+def quiet_room(seconds: float, rate: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * rate)) / rate
+    audio = rng.normal(0, 0.001, len(t)) + 0.002 * np.sin(2 * np.pi * 50 * t)
+    for start in rng.uniform(0, seconds - 0.1, size=max(int(seconds / 20), 1)):
+        i = int(start * rate)
+        audio[i:i + rate // 20] += rng.normal(0, 0.05, rate // 20)  # a knock
+    return (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+
+
+def read_wav(path: str, rate: int) -> np.ndarray:
+    with wave.open(path) as f:
+        if f.getframerate() != rate or f.getsampwidth() != 2 or f.getnchannels() != 1:
+            raise SystemExit(f"{path}: need mono 16-bit PCM at {rate} Hz")
+        return np.frombuffer(f.readframes(f.getnframes()), dtype=np.int16)
+
+
+def run(vad: VoiceActivityDetector, gate: EnergyGate | None, blocks: list[bytes], rate: int):
+    block_seconds = len(blocks[0]) / 2 / rate
+    vad_calls = 0
+    wall, cpu = time.perf_counter(), time.process_time()
+    deadline = wall
+    for block in blocks:
+        if gate is None or gate.passes(block):
+            vad.is_speech(block, rate)
+            vad_calls += 1
+        deadline += block_seconds
+        time.sleep(max(deadline - time.perf_counter(), 0))  # audio arrives in real time
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    label = "gated" if gate else "Silero only"
+    print(f"  {label:<12} CPU {cpu / wall * 100:5.1f}%  "
+          f"Silero on {vad_calls}/{len(blocks)} blocks ({cpu / len(blocks) * 1e6:5.0f} us/block)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--wav", help="mono 16 kHz recording of the idle room")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    rate, blocksize = settings.audio.sample_rate, settings.audio.blocksize
+    audio = read_wav(args.wav, rate) if args.wav else quiet_room(args.seconds, rate)
+    audio = audio[: int(args.seconds * rate)]
+    blocks = [audio[i:i + blocksize].tobytes() for i in range(0, len(audio) - blocksize + 1, blocksize)]
+
+    threads = plan_threads(settings.threads, settings.tts.workers)["vad"] if settings.threads.enabled else None
+    vad = VoiceActivityDetector(threshold=settings.vad.threshold, threads=threads)
+    print("=== Malone AI - VAD Energy Gate Benchmark ===\n")
+    print(f"{len(blocks)} blocks of {blocksize / rate * 1000:.0f} ms ({len(blocks) * blocksize / rate:.0f}s)\n")
+
+    run(vad, None, blocks, rate)
+    vad.reset()
+    gate = EnergyGate(margin_db=settings.vad.gate_margin_db, block_seconds=blocksize / rate)
+    run(vad, gate, blocks, rate)
+    print(f"  [{gate.summary()}]")
+    print("\n=== Benchmark complete ===")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Regenerate the builtin tool manifest and report each tool module's import cost.
+
+The manifest lets Malone register tools at startup without importing their
+modules. Run this after adding or changing a tool (startup still works with
+a stale manifest, it just imports the changed modules eagerly).
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+from malone.tools.manifest import MANIFEST_NAME, build_manifest, package_modules, write_manifest
+
+PACKAGE = "malone.tools.builtin"
+
+
+def _cold_import_ms(module_path: str) -> float | None:
+    """Import time in a fresh interpreter, including the module's dependencies."""
+    code = (
+        "import time; import malone.tools.base; t = time.perf_counter(); "
+        f"import {module_path}; print((time.perf_counter() - t) * 1000)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--no-report", action="store_true", help="Skip the import-time report")
+    args = parser.parse_args()
+
+    print("=== Malone AI - Tool Manifest ===\n")
+
+    manifest = build_manifest(PACKAGE)
+    modules = package_modules(PACKAGE)
+    out = Path(next(iter(modules.values()))).parent / MANIFEST_NAME
+    write_manifest(manifest, out)
+    print(f"Wrote {len(manifest['tools'])} tools from {len(manifest['modules'])} modules to {out}\n")
+
+    if args.no_report:
+        return
+
+    by_module: dict[str, list[str]] = {}
+    for entry in manifest["tools"]:
+        by_module.setdefault(entry["module"], []).append(entry["name"])
+
+    print("Cold import time per module (paid at startup without the manifest):")
+    total = 0.0
+    for module_path in modules:
+        ms = _cold_import_ms(module_path)
+        total += ms or 0.0
+        took = "failed" if ms is None else f"{ms:7.1f} ms"
+        tools = ", ".join(by_module.get(module_path, [])) or "-"
+        print(f"  {module_path.rsplit('.', 1)[1]:<16} {took}   {tools}")
+    print(f"\n  Total {total:.0f} ms (modules share dependencies, so eager startup pays somewhat less)")
+
+
+if __name__ == "__main__":
+    main()
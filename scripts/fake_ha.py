@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""Local stand-in Home Assistant server for benchmarks and manual testing.
+
+Serves the subset of the REST API Malone uses (GET /api/states and
+POST /api/services/<domain>/<service>) over HTTP/1.1 keep-alive, plus the
+WebSocket API at /api/websocket (auth, get_states, the area/device/entity
+registries, entity aliases and event subscriptions). Service calls and
+set_state() broadcast state_changed events to subscribers; move_entity()
+broadcasts entity_registry_updated.
+
+    python scripts/fake_ha.py --port 8123 --entities 500
+    MALONE_HOME_ASSISTANT__URL=http://127.0.0.1:8123 \\
+    MALONE_HOME_ASSISTANT__TOKEN=test-token python -m malone
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import struct
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+AREAS = [
+    "Kitchen", "Living Room", "Bedroom", "Office", "Hallway",
+    "Bathroom", "Garage", "Basement", "Dining Room", "Porch",
+]
+DOMAINS = ["light", "switch", "sensor", "binary_sensor", "fan", "cover", "climate"]
+SCENES = ["Movie Night", "Good Morning", "Dinner", "All Off", "Reading"]
+
+# Hand-named devices, so name resolution can be tried with realistic phrases
+NAMED = [
+    ("light.kitchen_ceiling", "Kitchen Ceiling", "Kitchen"),
+    ("light.kitchen_pendant", "Kitchen Pendant", "Kitchen"),
+    ("light.living_room_lamp", "Living Room Lamp", "Living Room"),
+    ("light.floor_lamp", "Floor Lamp", "Living Room"),
+    ("light.bedside", "Bedside Light", "Bedroom"),
+    ("light.porch", "Porch Light", "Porch"),
+    ("fan.bedroom_fan", "Bedroom Fan", "Bedroom"),
+    ("switch.coffee_maker", "Coffee Maker", "Kitchen"),
+    ("media_player.living_room_tv", "Living Room TV", "Living Room"),
+    ("climate.thermostat", "Thermostat", "Hallway"),
+    ("cover.garage_door", "Garage Door", "Garage"),
+    ("lock.front_door", "Front Door Lock", "Hallway"),
+]
+
+
+def make_states(n_entities: int, seed: int = 0) -> tuple[dict[str, dict], dict[str, str]]:
+    """Generate entity states and an entity_id -> area name map."""
+    rng = random.Random(seed)
+    states: dict[str, dict] = {}
+    areas: dict[str, str] = {}
+    for i in range(n_entities):
+        area = AREAS[i % len(AREAS)]
+        domain = DOMAINS[(i // len(AREAS)) % len(DOMAINS)]
+        object_id = f"{area.lower().replace(' ', '_')}_{domain}_{i}"
+        entity_id = f"{domain}.{object_id}"
+        state = rng.choice(["on", "off"]) if domain in ("light", "switch", "fan") else "idle"
+        if domain == "sensor":
+            state = f"{rng.uniform(15, 25):.1f}"
+        states[entity_id] = {
+            "entity_id": entity_id,
+            "state": state,
+            "attributes": {"friendly_name": f"{area} {domain.replace('_', ' ').title()} {i}"},
+            "last_changed": "2024-01-01T00:00:00+00:00",
+        }
+        areas[entity_id] = area
+    for entity_id, name, area in NAMED:
+        states[entity_id] = {
+            "entity_id": entity_id,
+            "state": "off",
+            "attributes": {"friendly_name": name},
+            "last_changed": "2024-01-01T00:00:00+00:00",
+        }
+        areas[entity_id] = area
+    for name in SCENES:
+        entity_id = f"scene.{name.lower().replace(' ', '_')}"
+        states[entity_id] = {
+            "entity_id": entity_id,
+            "state": "scening",
+            "attributes": {"friendly_name": name},
+            "last_changed": "2024-01-01T00:00:00+00:00",
+        }
+    return states, areas
+
+
+class FakeHomeAssistant:
+    """Minimal asyncio server imitating the Home Assistant REST and WebSocket APIs."""
+
+    def __init__(self, n_entities: int = 200, delay: float = 0.0, token: str = "test-token"):
+        self.states, self.areas = make_states(n_entities)
+        self.aliases: dict[str, list[str]] = {}  # entity_id -> voice aliases
+        self.delay = delay
+        self.token = token
+        self.requests = 0
+        self.connections = 0
+        self._server: asyncio.AbstractServer | None = None
+        # WebSocket writers -> event type -> subscription id
+        self._subscribers: dict[asyncio.StreamWriter, dict[str, int]] = {}
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    def apply_service(self, domain: str, service: str, data: dict) -> list[dict]:
+        """Apply a service call to the fake states, returning changed states."""
+        entity_ids = data.get("entity_id", [])
+        if isinstance(entity_ids, str):
+            entity_ids = [entity_ids]
+        changed = []
+        for entity_id in entity_ids:
+            entity = self.states.get(entity_id)
+            if entity is None:
+                continue
+            if service == "turn_on":
+                new_state = "on"
+            elif service == "turn_off":
+                new_state = "off"
+            elif service == "toggle":
+                new_state = "off" if entity["state"] == "on" else "on"
+            else:
+                new_state = entity["state"]
+            self.set_state(entity_id, new_state)
+            changed.append(self.states[entity_id])
+        return changed
+
+    def set_state(self, entity_id: str, state: str):
+        old = self.states[entity_id]
+        new = {**old, "state": state}
+        self.states[entity_id] = new
+        self._broadcast(
+            "state_changed", {"entity_id": entity_id, "old_state": old, "new_state": new}
+        )
+
+    def move_entity(self, entity_id: str, area: str):
+        """Assign an entity to another area, as editing it in the HA UI would."""
+        self.areas[entity_id] = area
+        self._broadcast("entity_registry_updated", {"action": "update", "entity_id": entity_id})
+
+    def set_aliases(self, entity_id: str, aliases: list[str]):
+        """Replace an entity's voice aliases, as editing it in the HA UI would."""
+        self.aliases[entity_id] = list(aliases)
+        self._broadcast("entity_registry_updated", {"action": "update", "entity_id": entity_id})
+
+    def _broadcast(self, event_type: str, data: dict):
+        for writer, subscriptions in list(self._subscribers.items()):
+            if event_type in subscriptions:
+                self._ws_send(writer, {
+                    "id": subscriptions[event_type],
+                    "type": "event",
+                    "event": {"event_type": event_type, "data": data},
+                })
+
+    def drop_websockets(self):
+        """Close every WebSocket connection (to exercise client reconnects)."""
+        for writer in list(self._subscribers):
+            writer.close()
+        self._subscribers.clear()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode().split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode().partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = b""
+                if "content-length" in headers:
+                    body = await reader.readexactly(int(headers["content-length"]))
+
+                if not await self._handle_request(method, path, headers, body, reader, writer):
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_request(self, method, path, headers, body, reader, writer) -> bool:
+        """Answer one request; return False to close the connection."""
+        self.requests += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+
+        if path == "/api/websocket" and headers.get("upgrade", "").lower() == "websocket":
+            await self._websocket(headers, reader, writer)
+            return False
+        if headers.get("authorization") != f"Bearer {self.token}":
+            self._respond(writer, 401, {"message": "Unauthorized"})
+        elif method == "GET" and path == "/api/states":
+            self._respond(writer, 200, list(self.states.values()))
+        elif method == "POST" and path.startswith("/api/services/"):
+            domain, _, service = path[len("/api/services/"):].partition("/")
+            data = json.loads(body or b"{}")
+            self._respond(writer, 200, self.apply_service(domain, service, data))
+        else:
+            self._respond(writer, 404, {"message": "Not found"})
+        await writer.drain()
+        return headers.get("connection", "").lower() != "close"
+
+    # --- WebSocket API ---------------------------------------------------------
+
+    async def _websocket(self, headers, reader, writer):
+        accept = base64.b64encode(
+            hashlib.sha1((headers["sec-websocket-key"] + _WS_GUID).encode()).digest()
+        ).decode()
+        writer.write(
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n".encode()
+        )
+        self._ws_send(writer, {"type": "auth_required", "ha_version": "fake"})
+        try:
+            msg = await self._ws_recv(reader, writer)
+            if msg is None or msg.get("access_token") != self.token:
+                self._ws_send(writer, {"type": "auth_invalid", "message": "Invalid token"})
+                return
+            self._ws_send(writer, {"type": "auth_ok", "ha_version": "fake"})
+            while (msg := await self._ws_recv(reader, writer)) is not None:
+                self._ws_command(writer, msg)
+                await writer.drain()
+        finally:
+            self._subscribers.pop(writer, None)
+
+    def _ws_command(self, writer, msg: dict):
+        kind = msg.get("type")
+        result = None
+        if kind == "subscribe_events":
+            self._subscribers.setdefault(writer, {})[msg.get("event_type", "*")] = msg["id"]
+        elif kind == "get_states":
+            result = list(self.states.values())
+        elif kind == "config/area_registry/list":
+            result = [
+                {"area_id": area.lower().replace(" ", "_"), "name": area, "aliases": []}
+                for area in AREAS
+            ]
+        elif kind == "config/device_registry/list":
+            result = []
+        elif kind == "config/entity_registry/list":
+            result = [
+                {"entity_id": entity_id, "area_id": area.lower().replace(" ", "_"),
+                 "device_id": None}
+                for entity_id, area in self.areas.items()
+            ]
+        elif kind == "config/entity_registry/get_entries":
+            result = {
+                entity_id: {"entity_id": entity_id, "aliases": self.aliases.get(entity_id, [])}
+                for entity_id in msg["entity_ids"]
+            }
+        elif kind == "ping":
+            self._ws_send(writer, {"id": msg["id"], "type": "pong"})
+            return
+        else:
+            self._ws_send(writer, {
+                "id": msg["id"], "type": "result", "success": False,
+                "error": {"code": "unknown_command", "message": kind},
+            })
+            return
+        self._ws_send(writer, {"id": msg["id"], "type": "result", "success": True, "result": result})
+
+    @staticmethod
+    async def _ws_recv(reader, writer) -> dict | None:
+        """Read one client text message, answering pings; None on close."""
+        while True:
+            head = await reader.readexactly(2)
+            opcode = head[0] & 0x0F
+            length = head[1] & 0x7F
+            if length == 126:
+                length = struct.unpack("!H", await reader.readexactly(2))[0]
+            elif length == 127:
+                length = struct.unpack("!Q", await reader.readexactly(8))[0]
+            mask = await reader.readexactly(4) if head[1] & 0x80 else b"\0\0\0\0"
+            payload = bytearray(await reader.readexactly(length))
+            for i in range(length):
+                payload[i] ^= mask[i % 4]
+            if opcode == 0x8:  # close
+                return None
+            if opcode == 0x9:  # ping
+                FakeHomeAssistant._ws_frame(writer, 0xA, bytes(payload))
+                continue
+            if opcode == 0x1:
+                return json.loads(payload)
+
+    @staticmethod
+    def _ws_send(writer, payload: dict):
+        FakeHomeAssistant._ws_frame(writer, 0x1, json.dumps(payload).encode())
+
+    @staticmethod
+    def _ws_frame(writer, opcode: int, data: bytes):
+        if writer.is_closing():
+            return
+        if len(data) < 126:
+            header = struct.pack("!BB", 0x80 | opcode, len(data))
+        elif len(data) < 65536:
+            header = struct.pack("!BBH", 0x80 | opcode, 126, len(data))
+        else:
+            header = struct.pack("!BBQ", 0x80 | opcode, 127, len(data))
+        writer.write(header + data)
+
+    @staticmethod
+    def _respond(writer: asyncio.StreamWriter, status: int, payload):
+        body = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} OK\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "Connection: keep-alive\r\n\r\n".encode() + body
+        )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Fake Home Assistant server")
+    parser.add_argument("--port", type=int, default=8123)
+    parser.add_argument("--entities", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.0,
+                        help="Artificial per-request latency in seconds")
+    args = parser.parse_args()
+
+    server = FakeHomeAssistant(n_entities=args.entities, delay=args.delay)
+    url = await server.start(port=args.port)
+    print(f"Fake Home Assistant at {url} (token: {server.token}, "
+          f"{len(server.states)} entities)")
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
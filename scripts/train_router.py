@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Retrain the routing complexity classifier from logged turn traces."""
+
+import argparse
+import random
+import sys
+import time
+
+from malone.llm.classifier import ComplexityClassifier
+from malone.llm.trace import label_trace, load_traces
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--traces", default="data/traces.jsonl")
+    parser.add_argument("--out", default="data/router_model.npz")
+    parser.add_argument("--hard-rounds", type=int, default=3,
+                        help="Turns using this many tool rounds count as complex")
+    parser.add_argument("--slow-latency", type=float, default=10.0,
+                        help="Local turns slower than this (s) count as complex")
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--holdout", type=float, default=0.2)
+    args = parser.parse_args()
+
+    print("=== Malone AI - Router Training ===\n")
+
+    try:
+        traces = load_traces(args.traces)
+    except FileNotFoundError:
+        print(f"ERROR: No trace log at {args.traces}")
+        sys.exit(1)
+
+    labelled = [
+        (t.text, label_trace(t, args.hard_rounds, args.slow_latency))
+        for t in traces
+        if t.text.strip()
+    ]
+    # Successful cloud turns carry no label (see label_trace)
+    examples = [(text, label) for text, label in labelled if label is not None]
+    if len(examples) < 10:
+        print(f"ERROR: Only {len(examples)} usable traces, need at least 10")
+        sys.exit(1)
+
+    positives = sum(label for _, label in examples)
+    print(f"Loaded {len(examples)} turns ({positives} complex, "
+          f"{len(examples) - positives} simple)")
+
+    random.Random(0).shuffle(examples)
+    split = int(len(examples) * (1 - args.holdout))
+    train, test = examples[:split], examples[split:]
+
+    clf = ComplexityClassifier()
+    clf.fit([t for t, _ in train], [y for _, y in train], epochs=args.epochs)
+
+    if test:
+        correct = sum(
+            (clf.predict_proba(text) >= 0.5) == bool(label) for text, label in test
+        )
+        print(f"Holdout accuracy: {correct / len(test):.1%} ({len(test)} turns)")
+
+    # Retrain on everything before saving
+    clf.fit([t for t, _ in examples], [y for _, y in examples], epochs=args.epochs)
+    clf.save(args.out)
+    print(f"Saved model to {args.out}")
+
+    start = time.perf_counter()
+    n = 0
+    for text, _ in examples[:1000]:
+        clf.predict_proba(text)
+        n += 1
+    per_call = (time.perf_counter() - start) / n * 1000
+    print(f"Inference: {per_call:.3f} ms per query")
+
+    print("\n=== Training complete ===")
+
+
+if __name__ == "__main__":
+    main()
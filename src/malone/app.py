@@ -1,18 +1,41 @@
 from __future__ import annotations
 
+import asyncio
 import os
 
 from malone.audio.capture import AudioCapture
+from malone.audio.gate import EnergyGate
 from malone.audio.playback import AudioPlayback
 from malone.audio.vad import VoiceActivityDetector
 from malone.config.settings import get_settings
+from malone.conversation.fastpath import IntentMatcher
+from malone.conversation.journal import ConversationJournal
 from malone.conversation.loop import ConversationLoop
 from malone.conversation.manager import ConversationManager
+from malone.conversation.response_cache import ResponseCache
+from malone.cpu import StageGate, plan_threads
+from malone.embedding import build_embedder
+from malone.homeassistant.client import get_ha_client
+from malone.homeassistant.state import get_state_mirror
 from malone.llm.ollama_client import OllamaClient
+from malone.llm.policy import build_policy
 from malone.llm.router import LLMRouter
+from malone.llm.trace import TraceLogger
+from malone.memory.store import MemoryStore
+from malone.residency import get_residency, rss_mb
 from malone.stt.transcriber import Transcriber
+from malone.tools.cache import ResultCache
 from malone.tools.executor import ToolExecutor
+from malone.tools.jobs import get_job_manager
 from malone.tools.registry import ToolRegistry
+from malone.tools.selector import RequestMoreToolsTool, ToolSelector
+from malone.tools.shaping import (
+    ReadToolOutputTool,
+    ResultShaper,
+    SpillStore,
+    make_llm_summarizer,
+)
+from malone.tts.cache import PhraseCache
 from malone.tts.synthesizer import TTSSynthesizer
 
 
@@ -29,16 +52,44 @@ class MaloneApp:
         print("Malone AI starting up...")
         print()
 
+        # Give each engine its own share of the cores instead of every
+        # runtime defaulting to all of them and contending when they overlap
+        plan = {}
+        gate = StageGate()
+        if self.settings.threads.enabled:
+            plan = plan_threads(self.settings.threads, self.settings.tts.workers)
+            print("  [Threads: " + ", ".join(
+                f"{stage} {t.intra}" + (f" on {list(t.cores)}" if t.cores else "")
+                for stage, t in plan.items()
+            ) + "]")
+
+        # Heavy components are registered with their measured footprint
+        # so they can be unloaded when idle
+        residency = get_residency() if self.settings.residency.enabled else None
+        baseline = rss_mb()
+
         # Initialize components
         print("  Loading voice activity detection...")
-        vad = VoiceActivityDetector(threshold=self.settings.vad.threshold)
+        before = rss_mb()
+        vad = VoiceActivityDetector(threshold=self.settings.vad.threshold, threads=plan.get("vad"))
+        if residency is not None:
+            # Needed to hear speech onset, so never unloaded
+            residency.register("vad", unload=None, size_mb=rss_mb() - before, keep=True)
 
         print("  Loading speech recognition...")
+        before = rss_mb()
         transcriber = Transcriber(
             model_size=self.settings.stt.model_size,
             device=self.settings.stt.device,
             compute_type=self.settings.stt.compute_type,
+            threads=plan.get("stt"),
+            gate=gate,
         )
+        if residency is not None:
+            residency.register(
+                "stt", unload=transcriber.unload, load=transcriber.load,
+                size_mb=rss_mb() - before,
+            )
 
         print("  Connecting to Ollama...")
         ollama = OllamaClient(self.settings.ollama)
@@ -51,15 +102,99 @@ class MaloneApp:
             print("  Connecting to Claude API (cloud fallback)...")
             cloud_llm = ClaudeClient(self.settings.claude)
 
-        llm = LLMRouter(local=ollama, cloud=cloud_llm)
+        llm = LLMRouter(
+            local=ollama,
+            cloud=cloud_llm,
+            policy=build_policy(self.settings.router),
+        )
+        tracer = None
+        if self.settings.router.trace_path:
+            tracer = TraceLogger(self.settings.router.trace_path)
+
+        ha_config = self.settings.home_assistant
+        mirror_states = bool(
+            ha_config.url and ha_config.token.get_secret_value() and ha_config.mirror_states
+        )
+        if mirror_states:
+            print("  Mirroring Home Assistant states...")
+            get_state_mirror().start()
 
         # Initialize tool system
         print("  Loading tools...")
         registry = ToolRegistry()
         registry.auto_discover()
-        tool_executor = ToolExecutor(registry)
+        shaper = None
+        shaping_config = self.settings.result_shaping
+        if shaping_config.enabled:
+            spill = SpillStore(max_items=shaping_config.spill_items)
+            shaper = ResultShaper(
+                spill,
+                budget=shaping_config.budget_tokens,
+                summarizer=make_llm_summarizer(ollama) if shaping_config.summarize else None,
+                summarize_over=shaping_config.summarize_over,
+            )
+            registry.register(ReadToolOutputTool(spill))
+        tool_selector = None
+        selection_config = self.settings.tool_selection
+        if selection_config.enabled:
+            core = [*selection_config.core, "request_more_tools"]
+            if shaper is not None:
+                core.append("read_tool_output")  # shortened results point to it
+            tool_selector = ToolSelector(
+                registry,
+                core=core,
+                limit=selection_config.limit,
+                min_score=selection_config.min_score,
+            )
+            registry.register(RequestMoreToolsTool(tool_selector))
+        cache = None
+        if self.settings.tool_cache.enabled:
+            cache = ResultCache(max_entries=self.settings.tool_cache.max_entries)
+        tool_executor = ToolExecutor(
+            registry, jobs=get_job_manager(), cache=cache, shaper=shaper
+        )
         print(f"    Registered tools: {registry.list_tools()}")
 
+        fast_path = None
+        fast_path_config = self.settings.fast_path
+        if fast_path_config.enabled:
+            print("  Loading intent fast path...")
+            fast_path = IntentMatcher(
+                embedder=build_embedder(fast_path_config.embedder),
+                threshold=fast_path_config.threshold,
+                margin=fast_path_config.margin,
+            )
+
+        response_cache = None
+        cache_config = self.settings.response_cache
+        if cache_config.enabled:
+            response_cache = ResponseCache(
+                embedder=build_embedder(cache_config.embedder),
+                ttl=cache_config.ttl,
+                max_entries=cache_config.max_entries,
+                threshold=cache_config.threshold,
+            )
+
+        memory = None
+        memory_config = self.settings.memory
+        embedder = None
+        if memory_config.enabled:
+            print("  Loading long-term memory...")
+            embedder = build_embedder(memory_config.embedder, hashing_dim=1024)
+        if embedder is not None:
+            memory = MemoryStore(
+                memory_config.path,
+                embedder,
+                embedder_name=memory_config.embedder,
+                top_k=memory_config.top_k,
+                min_score=memory_config.min_score,
+                nprobe=memory_config.nprobe,
+                index_min=memory_config.index_min,
+                retain_days=memory_config.retain_days,
+            )
+            memory.compact()
+            print(f"    {len(memory)} memories")
+
         audio_capture = AudioCapture(
             sample_rate=self.settings.audio.sample_rate,
             channels=self.settings.audio.channels,
@@ -67,19 +202,57 @@ class MaloneApp:
             device=self.settings.audio.input_device,
         )
 
+        print("  Loading text-to-speech (Piper)...")
+        tts_config = self.settings.tts
+        phrase_cache = None
+        if tts_config.cache_path:
+            phrase_cache = PhraseCache(tts_config.cache_path, max_bytes=tts_config.cache_mb * 2**20)
+        before = rss_mb()
+        tts = TTSSynthesizer(
+            voice=tts_config.voice,
+            cache=phrase_cache,
+            workers=tts_config.workers,
+            threads=plan.get("tts"),
+            gate=gate,
+        )
+        if residency is not None:
+            residency.register("tts", unload=tts.unload, load=tts.load, size_mb=rss_mb() - before)
+        prewarm = asyncio.create_task(tts.prewarm(tts_config.prewarm))
+
         audio_playback = AudioPlayback(
             sample_rate=tts.sample_rate,  # Match TTS output rate
             device=self.settings.audio.output_device,
         )
 
-        print("  Loading text-to-speech (Piper)...")
-        tts = TTSSynthesizer(
-            voice=self.settings.tts.voice,
-        )
-
+        budgets = [self.settings.ollama.context_budget]
+        if cloud_llm is not None:
+            budgets.append(self.settings.claude.context_budget)
+        journal = None
+        journal_config = self.settings.journal
+        if journal_config.enabled:
+            journal = ConversationJournal(
+                journal_config.path,
+                flush_interval=journal_config.flush_interval,
+                retain_messages=journal_config.retain_messages,
+                retain_days=journal_config.retain_days,
+            )
+            journal.compact()
         conversation = ConversationManager(
             system_prompt=self.settings.system_prompt,
+            max_tokens=max(budgets),
+            journal=journal,
         )
+        restored = conversation.restore(journal_config.restore_messages)
+        if restored:
+            print(f"  Restored {restored} messages of conversation history")
+
+        energy_gate = None
+        if self.settings.vad.energy_gate:
+            audio_config = self.settings.audio
+            energy_gate = EnergyGate(
+                margin_db=self.settings.vad.gate_margin_db,
+                block_seconds=audio_config.blocksize / audio_config.sample_rate,
+            )
 
         loop = ConversationLoop(
             audio_capture=audio_capture,
@@ -90,13 +263,45 @@ class MaloneApp:
             tts=tts,
             conversation=conversation,
             tool_executor=tool_executor,
+            tracer=tracer,
+            fast_path=fast_path,
+            tool_selector=tool_selector,
+            memory=memory,
+            response_cache=response_cache,
+            residency=residency,
+            energy_gate=energy_gate,
             silence_threshold=self.settings.vad.silence_threshold,
             min_speech_duration=self.settings.vad.min_speech_duration,
+            pre_roll=self.settings.vad.pre_roll,
         )
 
+        residency_task = None
+        if residency is not None:
+            print(f"  [RSS: {rss_mb():.0f} MB, {rss_mb() - baseline:.0f} MB of it models]")
+            residency_task = asyncio.create_task(residency.run())
+
         print()
         print("Malone is ready. Start speaking!")
         print("Press Ctrl+C to exit.")
         print()
 
-        await loop.run()
+        try:
+            await loop.run()
+        finally:
+            print(f"  [Tool import times]\n{registry.import_report()}")
+            if cache is not None:
+                print(f"  [{cache.summary()}]")
+            prewarm.cancel()
+            if residency_task is not None:
+                residency_task.cancel()
+                print(f"  [{residency.summary()}]")
+            tts.close()
+            if phrase_cache is not None:
+                print(f"  [{phrase_cache.summary()}]")
+            if journal is not None:
+                journal.close()
+            if tracer is not None:
+                tracer.close()
+            if mirror_states:
+                await get_state_mirror().stop()
+            await get_ha_client().close()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+
+def _db(ratio: float) -> float:
+    return 10 ** (ratio / 20)
+
+
+class EnergyGate:
+    """Cheap RMS / zero-crossing check that decides whether a block needs Silero.
+
+    Tracks the room's noise floor (falling at once, rising slowly, and
+    four times slower while open) and opens when a block is margin_db
+    above it, or only fricative_db above it with a high zero-crossing
+    rate (unvoiced sounds like "s" and "f" are quiet but noisy). Once open
+    it stays open for `hold` seconds so Silero sees a whole onset. Only
+    blocks outside an utterance are meant to be fed, so steady noise that
+    Silero keeps rejecting eventually becomes the floor.
+    """
+
+    def __init__(
+        self,
+        margin_db: float = 9.0,
+        fricative_db: float = 3.0,
+        zcr_min: float = 0.25,
+        min_rms: float = 0.002,
+        hold: float = 0.3,
+        block_seconds: float = 0.032,
+        adapt: float = 0.02,
+    ):
+        self.margin = _db(margin_db)
+        self.fricative = _db(fricative_db)
+        self.zcr_min = zcr_min  # crossings per sample
+        self.min_rms = min_rms  # never open below this (full scale = 1.0)
+        self.hold_blocks = max(round(hold / block_seconds), 1)
+        self.adapt = adapt  # per rejected block
+        self.floor: float | None = None
+        self._open_for = 0
+        self.blocks = 0
+        self.passed = 0
+
+    def passes(self, chunk: bytes) -> bool:
+        """True if the block (int16 PCM) may contain speech."""
+        samples = np.frombuffer(chunk, dtype=np.int16).astype(np.float32)
+        n = len(samples)
+        if n < 2:
+            return False
+        rms = math.sqrt(float(np.dot(samples, samples)) / n) / 32768.0
+        signs = np.signbit(samples)
+        zcr = np.count_nonzero(signs[1:] != signs[:-1]) / n
+        self.blocks += 1
+
+        floor = rms if self.floor is None else self.floor
+        loud = rms > max(floor * self.margin, self.min_rms)
+        hiss = zcr >= self.zcr_min and rms > max(floor * self.fricative, self.min_rms)
+        if loud or hiss:
+            self._open_for = self.hold_blocks
+        elif self._open_for:
+            self._open_for -= 1
+        is_open = loud or hiss or self._open_for > 0
+
+        if rms < floor:
+            self.floor = rms
+        else:
+            # e.g. a fan starting; while open, mostly someone starting to speak
+            self.floor = floor + (self.adapt / 4 if is_open else self.adapt) * (rms - floor)
+        self.passed += is_open
+        return is_open
+
+    def summary(self) -> str:
+        skipped = 1 - self.passed / self.blocks if self.blocks else 0.0
+        floor = 20 * math.log10(max(self.floor or 0.0, 1e-6))
+        return (
+            f"energy gate: skipped Silero on {skipped:.0%} of {self.blocks} idle blocks, "
+            f"noise floor {floor:.0f} dBFS"
+        )
@@ -3,6 +3,7 @@ from __future__ import annotations
 import asyncio
 import os
 import subprocess
+from collections.abc import AsyncIterator
 
 
 class AudioPlayback:
@@ -12,12 +13,30 @@ class AudioPlayback:
         self.sample_rate = sample_rate
         self.device = device
 
-    async def play(self, audio_data: bytes):
+    async def play(self, audio_data: bytes | memoryview):
         """Play raw PCM int16 audio data asynchronously."""
+        process = await self._spawn()
+        await process.communicate(input=audio_data)
+
+    async def play_stream(self, chunks: AsyncIterator[bytes | memoryview]):
+        """Play PCM chunks through one player as they arrive."""
+        process = await self._spawn()
+        try:
+            async for chunk in chunks:
+                process.stdin.write(chunk)
+                await process.stdin.drain()
+            process.stdin.close()
+            await process.wait()
+        except BaseException:
+            process.kill()
+            await process.wait()
+            raise
+
+    async def _spawn(self) -> asyncio.subprocess.Process:
         env = os.environ.copy()
         env["PULSE_SERVER"] = "unix:/mnt/wslg/PulseServer"
 
-        process = await asyncio.create_subprocess_exec(
+        return await asyncio.create_subprocess_exec(
             "paplay",
             "--raw",
             "--format=s16le",
@@ -27,4 +46,3 @@ class AudioPlayback:
             stderr=asyncio.subprocess.DEVNULL,
             env=env,
         )
-        await process.communicate(input=audio_data)
@@ -3,12 +3,21 @@ from __future__ import annotations
 import numpy as np
 import torch
 
+from malone.cpu import EngineThreads
+
 
 class VoiceActivityDetector:
     """Wraps Silero VAD for speech detection on audio chunks."""
 
-    def __init__(self, threshold: float = 0.5):
+    def __init__(self, threshold: float = 0.5, threads: EngineThreads | None = None):
         self.threshold = threshold
+        if threads is not None:
+            # Process-wide: also covers anything else running on torch
+            torch.set_num_threads(threads.intra)
+            try:
+                torch.set_num_interop_threads(threads.inter)
+            except RuntimeError:
+                pass  # only settable before the first parallel torch op
         self.model, _ = torch.hub.load(
             repo_or_dir="snakers4/silero-vad",
             model="silero_vad",
@@ -20,6 +20,9 @@ class VADSettings(BaseSettings):
     threshold: float = 0.5
     silence_threshold: float = 0.8  # seconds of silence to end utterance
     min_speech_duration: float = 0.3
+    energy_gate: bool = True  # skip Silero on blocks near the room's noise floor
+    gate_margin_db: float = 9.0  # how far above the noise floor opens the gate
+    pre_roll: float = 0.3  # seconds kept from before speech onset
 
 
 class STTSettings(BaseSettings):
@@ -30,23 +33,133 @@ class STTSettings(BaseSettings):
 
 class TTSSettings(BaseSettings):
     voice: str = "en_GB-alba-medium"
+    workers: int = 2  # Piper sessions synthesizing sentences in parallel
+    cache_path: str = "data/tts_cache"  # synthesized sentences; empty to disable
+    cache_mb: int = 64
+    prewarm: list[str] = [  # synthesized into the cache at startup
+        "I wasn't able to complete that task.",
+        "Sorry, that didn't work.",
+        "No background jobs.",
+        "Good morning.",
+        "Done.",
+    ]
+
+
+class ThreadSettings(BaseSettings):
+    enabled: bool = True  # give VAD, STT and TTS fixed shares of the cores
+    vad: int = 1  # torch threads (Silero)
+    stt: int = 0  # CTranslate2 threads; 0 = half of the cores left after VAD
+    tts: int = 0  # onnxruntime threads per Piper session; 0 = the rest, split
+    pin: bool = False  # also pin STT and TTS to their own cores (Linux)
+
+
+class ResidencySettings(BaseSettings):
+    enabled: bool = True  # unload idle models and the browser, log RSS
+    budget_mb: float = 0.0  # unload idle components LRU-first while RSS exceeds this; 0 = none
+    idle_minutes: float = 30.0  # unload anything unused this long; 0 = only over budget
+    interval: float = 30.0  # seconds between checks / RSS samples
+    log_path: str = "data/rss.csv"  # RSS over time; empty = don't log
 
 
 class OllamaSettings(BaseSettings):
     base_url: str = "http://mcomen.malonecentral.com:11434/v1"
     model: str = "llama3.1:8b"
     timeout: float = 30.0
+    context_budget: int = 3000  # history tokens; keep under num_ctx minus tools and reply
 
 
 class ClaudeSettings(BaseSettings):
     api_key: SecretStr = SecretStr("")
     model: str = "claude-sonnet-4-5-20250929"
     max_tokens: int = 1024
+    context_budget: int = 24000  # history tokens sent per request
+
+
+class RouterSettings(BaseSettings):
+    policy: str = "keyword"  # "keyword" or "classifier"
+    complexity_threshold: int = 500  # characters; keyword policy only
+    model_path: str = "data/router_model.npz"
+    cloud_threshold: float = 0.5  # classifier probability to route to cloud
+    trace_path: str = ""  # e.g. "data/traces.jsonl"; logs raw utterances, so opt-in
+
+
+class FastPathSettings(BaseSettings):
+    enabled: bool = True  # answer common intents without the LLM
+    embedder: str = "hashing"  # "hashing", "none", or a sentence-transformers model
+    threshold: float = 0.8  # min cosine similarity for an example match
+    margin: float = 0.1  # required lead over the next-best intent
+
+
+class ToolSelectionSettings(BaseSettings):
+    enabled: bool = True  # send only tools relevant to the utterance
+    core: list[str] = ["get_current_time"]  # always sent
+    limit: int = 4  # best-ranked tools added per turn (plus their groups)
+    min_score: float = 1.0  # BM25 score a tool needs to be picked
+
+
+class ToolCacheSettings(BaseSettings):
+    enabled: bool = True  # reuse results of tools that declare a cache_ttl
+    max_entries: int = 256
+
+
+class ResponseCacheSettings(BaseSettings):
+    enabled: bool = True  # reuse replies to repeated utterances
+    ttl: float = 3600.0  # seconds; shorter if the reply used tools with a cache_ttl
+    max_entries: int = 256
+    embedder: str = "hashing"  # for similarity hits; "none" for exact matches only
+    threshold: float = 0.9  # cosine similarity of a similarity hit
+
+
+class ResultShapingSettings(BaseSettings):
+    enabled: bool = True  # fit large tool results into a token budget
+    budget_tokens: int = 1000  # per result, unless the tool sets result_budget
+    summarize: bool = False  # summarize very large results with the local LLM
+    summarize_over: int = 4000  # tokens
+    spill_items: int = 32  # full outputs kept for read_tool_output
+
+
+class JournalSettings(BaseSettings):
+    enabled: bool = True  # persist conversation history across restarts
+    path: str = "data/conversation.db"
+    restore_messages: int = 40  # loaded at startup
+    flush_interval: float = 0.5  # seconds a write batch collects messages
+    retain_messages: int = 5000
+    retain_days: float = 30.0
+
+
+class MemorySettings(BaseSettings):
+    enabled: bool = True  # recall relevant past turns into the prompt
+    path: str = "data/memory"
+    embedder: str = "all-MiniLM-L6-v2"  # or "hashing" (no model, word overlap only)
+    top_k: int = 4
+    min_score: float = 0.35  # cosine similarity a memory needs to be recalled
+    nprobe: int = 8  # IVF buckets searched once there are index_min memories
+    index_min: int = 20000
+    retain_days: float = 365.0  # memories older than this are dropped at startup; 0 = never
+
+
+class ProcessSettings(BaseSettings):
+    max_concurrent: int = 4  # child processes tools may run at once
+    max_output_bytes: int = 65536  # per stream; the rest is dropped
+
+
+class JobSettings(BaseSettings):
+    max_running: int = 2
+    retention: float = 3600.0  # seconds to keep finished jobs
+    max_finished: int = 20
+    max_output_chars: int = 20000  # streamed output kept per job
 
 
 class HomeAssistantSettings(BaseSettings):
     url: str = ""
     token: SecretStr = SecretStr("")
+    timeout: float = 10.0
+    max_connections: int = 8  # pooled keep-alive connections
+    max_concurrent: int = 4  # requests in flight at once
+    http2: bool = False  # requires the h2 package
+    retries: int = 2  # extra attempts on transient errors
+    retry_backoff: float = 0.25  # seconds, doubled per attempt
+    mirror_states: bool = True  # keep a live state cache via the WebSocket API
 
 
 class MaloneSettings(BaseSettings):
@@ -56,9 +169,21 @@ class MaloneSettings(BaseSettings):
     vad: VADSettings = VADSettings()
     stt: STTSettings = STTSettings()
     tts: TTSSettings = TTSSettings()
+    threads: ThreadSettings = ThreadSettings()
+    residency: ResidencySettings = ResidencySettings()
     ollama: OllamaSettings = OllamaSettings()
     claude: ClaudeSettings = ClaudeSettings()
+    router: RouterSettings = RouterSettings()
+    fast_path: FastPathSettings = FastPathSettings()
+    tool_selection: ToolSelectionSettings = ToolSelectionSettings()
+    tool_cache: ToolCacheSettings = ToolCacheSettings()
+    result_shaping: ResultShapingSettings = ResultShapingSettings()
+    response_cache: ResponseCacheSettings = ResponseCacheSettings()
+    journal: JournalSettings = JournalSettings()
+    memory: MemorySettings = MemorySettings()
     home_assistant: HomeAssistantSettings = HomeAssistantSettings()
+    process: ProcessSettings = ProcessSettings()
+    jobs: JobSettings = JobSettings()
 
     system_prompt: str = (
         "You are Malone, a helpful personal AI assistant for Dennis. "
@@ -0,0 +1,325 @@
+from __future__ import annotations
+
+import re
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from malone.embedding import Embedder
+from malone.homeassistant.resolver import ACTION_DOMAINS, get_entity_resolver
+from malone.homeassistant.state import get_state_mirror
+
+# Wake words, politeness and filler that don't change the intent
+_FILLER_RE = re.compile(
+    r"^(?:(?:hey|ok|okay) )?(?:malone[, ]+)?(?:(?:can|could|would) you |please )?|(?: please| now| thanks| thank you)+$"
+)
+_PUNCT_RE = re.compile(r"[^\w\s%.']")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Words an example match may add to an intent's vocabulary; anything
+# else ("in tokyo", "tomorrow", "on kubernetes") changes the question
+_FUNCTION_WORDS = {
+    "a", "an", "the", "is", "it", "are", "be", "do", "does", "you", "me", "i",
+    "my", "please", "right", "now", "currently", "so", "just", "of",
+}
+
+
+def clean(text: str) -> str:
+    """Lowercase, drop punctuation and filler words around the request."""
+    text = _PUNCT_RE.sub(" ", text.lower().replace("\u2019", "'"))
+    text = " ".join(text.split()).strip(" .")
+    return _FILLER_RE.sub("", text).strip()
+
+
+@dataclass
+class Intent:
+    """A confident match: one tool call plus how to phrase its result."""
+
+    rule: str
+    tool: str
+    arguments: dict
+    reply: Callable[[str], str]  # tool result -> spoken reply
+    confidence: float = 1.0
+
+
+@dataclass(frozen=True)
+class PatternRule:
+    """A regex over the cleaned utterance.
+
+    build receives the match and returns an Intent, or None when the
+    slots can't be filled confidently (e.g. an ambiguous device name).
+    """
+
+    name: str
+    pattern: re.Pattern[str]
+    build: Callable[[str, re.Match[str]], Intent | None]
+
+
+@dataclass(frozen=True)
+class ExampleIntent:
+    """A parameterless intent recognized by similarity to sample utterances."""
+
+    name: str
+    tool: str
+    examples: tuple[str, ...]
+    reply: Callable[[str], str]
+
+
+# --- Replies -----------------------------------------------------------------
+
+
+def _ok(result: str) -> bool:
+    return not result.startswith(("Error", "Unknown action"))
+
+
+def _failed(result: str) -> str:
+    return "Sorry, that didn't work. " + result.removeprefix("Error: ").splitlines()[0]
+
+
+def _time_reply(result: str) -> str:
+    # "Monday, October 19, 2026 at 03:04 PM"
+    return f"It's {result.rpartition(' at ')[2].lstrip('0')}."
+
+
+def _date_reply(result: str) -> str:
+    return f"It's {result.rpartition(' at ')[0]}."
+
+
+def _jobs_reply(result: str) -> str:
+    lines = result.splitlines()
+    if len(lines) <= 1:
+        return lines[0] if lines else "No background jobs."
+    return f"{len(lines)} background jobs. " + " ".join(lines[:3])
+
+
+def _done(message: str) -> Callable[[str], str]:
+    return lambda result: message if _ok(result) else _failed(result)
+
+
+# --- Home Assistant rules ----------------------------------------------------
+
+# More targets than this must all be in one area ("the kitchen lights");
+# "the lights" across the house is left to the LLM
+_MAX_UNSCOPED = 3
+
+
+def _ha_targets(name: str, domains: set[str] | None = None) -> list[str] | None:
+    """Entity ids for a spoken name, or None unless the resolver is confident.
+
+    Stricter than the tools themselves: every word of the name must be
+    accounted for, so "garage door opener" never becomes "garage door".
+    """
+    mirror = get_state_mirror()
+    if not mirror.synced:
+        return None
+    targets, _ = get_entity_resolver().best(name, domains)
+    if not targets or any(m.coverage < 1.0 for m in targets):
+        return None
+    entity_ids = [m.entity_id for m in targets]
+    if len(entity_ids) > _MAX_UNSCOPED:
+        areas = {mirror.area_of(entity_id) for entity_id in entity_ids}
+        if len(areas) > 1 or "" in areas:
+            return None
+    return entity_ids
+
+
+def _control(rule: str, name: str, action: str, value: str, reply: str,
+             domains: set[str] | None = None) -> Intent | None:
+    targets = _ha_targets(name, domains)
+    if targets is None:
+        return None
+    if len(targets) == 1:
+        tool, arguments = "ha_control_device", {"entity_id": targets[0], "action": action}
+    else:
+        tool, arguments = "ha_control_many", {"entities": targets, "action": action}
+    if value:
+        arguments["value"] = value
+    return Intent(rule, tool, arguments, _done(reply))
+
+
+def _switch(rule: str, m: re.Match[str]) -> Intent | None:
+    state, name = m["state"], m["name"]
+    action = f"turn_{state}"
+    # Only domains with turn_on/turn_off: covers and locks take other services
+    return _control(
+        rule, name, action, "", f"Turned {state} the {name}.", domains=ACTION_DOMAINS[action]
+    )
+
+
+def _brightness(rule: str, m: re.Match[str]) -> Intent | None:
+    percent = min(int(m["percent"]), 100)
+    value = str(round(percent * 2.55))
+    return _control(
+        rule, m["name"], "set_brightness", value,
+        f"Set the {m['name']} to {percent} percent.", domains={"light"},
+    )
+
+
+def _temperature(rule: str, m: re.Match[str]) -> Intent | None:
+    return _control(
+        rule, m["name"], "set_temperature", m["temp"],
+        f"Set the {m['name']} to {m['temp']} degrees.", domains={"climate"},
+    )
+
+
+def _scene(rule: str, m: re.Match[str]) -> Intent | None:
+    targets = _ha_targets(m["name"], {"scene", "automation"})
+    if targets is None or len(targets) != 1:
+        return None
+    return Intent(
+        rule, "ha_trigger_scene", {"entity_id": targets[0]},
+        _done(f"Running {m['name']}."),
+    )
+
+
+def _fixed(tool: str, reply: Callable[[str], str]):
+    return lambda rule, m: Intent(rule, tool, {}, reply)
+
+
+_NAME = r"(?:all (?:of )?)?(?:the |my )?(?P<name>[\w' ]+?)"
+
+RULES = [
+    PatternRule("time", re.compile(
+        r"what(?:'s| is)? the time|what time is it|(?:tell me )?the time|time check"),
+        _fixed("get_current_time", _time_reply)),
+    PatternRule("date", re.compile(
+        r"what(?:'s| is)? (?:the |today's )?date(?: today)?|what day is (?:it|today)|what's today"),
+        _fixed("get_current_time", _date_reply)),
+    PatternRule("scene", re.compile(
+        rf"(?:run|activate|start|trigger|turn on|set) {_NAME} (?:scene|automation|mode)"),
+        _scene),
+    PatternRule("scene_verb", re.compile(rf"(?:run|activate|trigger) {_NAME}"), _scene),
+    PatternRule("temperature", re.compile(
+        rf"set {_NAME} to (?P<temp>\d+(?:\.\d+)?) ?(?:degrees?|°)?(?: [cf]| celsius| fahrenheit)?"),
+        _temperature),
+    PatternRule("brightness", re.compile(
+        rf"(?:set|dim|turn|bring) (?:up |down )?{_NAME} to (?P<percent>\d+) ?(?:%|percent)"),
+        _brightness),
+    PatternRule("switch", re.compile(
+        rf"(?:turn|switch|power|shut) (?P<state>on|off) {_NAME}"), _switch),
+    PatternRule("switch_after", re.compile(
+        rf"(?:turn|switch|power|shut) {_NAME} (?P<state>on|off)"), _switch),
+]
+
+EXAMPLES = [
+    ExampleIntent("time", "get_current_time", (
+        "what time is it", "what's the time", "do you know what time it is",
+        "have you got the time", "what time do you have", "current time",
+    ), _time_reply),
+    ExampleIntent("date", "get_current_time", (
+        "what's the date today", "what day is it today", "what is today's date",
+        "which day of the week is it", "what's the date",
+    ), _date_reply),
+    ExampleIntent("jobs", "job_status", (
+        "what jobs are running", "are any background jobs running",
+        "how are my background jobs doing", "status of my jobs", "list the jobs",
+    ), _jobs_reply),
+]
+
+
+class IntentMatcher:
+    """Maps an utterance to a tool call without the LLM, or returns None.
+
+    Compiled patterns are tried first; their slot builders reject
+    anything they can't resolve confidently. If no pattern matches and
+    an embedder is configured, parameterless intents are matched by
+    cosine similarity to their sample utterances, requiring a minimum
+    similarity, a margin over the next-best intent, and that every word
+    of the utterance (bar a few function words) occurs in that intent's
+    examples: "what time is it in Tokyo" is close to "what time is it"
+    but asks something else.
+    """
+
+    def __init__(
+        self,
+        rules: list[PatternRule] | None = None,
+        examples: list[ExampleIntent] | None = None,
+        embedder: Embedder | None = None,
+        threshold: float = 0.8,
+        margin: float = 0.1,
+    ):
+        self.rules = RULES if rules is None else rules
+        self.examples = EXAMPLES if examples is None else examples
+        self.embedder = embedder
+        self.threshold = threshold
+        self.margin = margin
+
+        self._matrix: np.ndarray | None = None
+        self._owners: list[int] = []  # row -> index into self.examples
+        self._vocab = [
+            {w for example in intent.examples for w in _WORD_RE.findall(example)}
+            for intent in self.examples
+        ]
+        if embedder is not None and self.examples:
+            texts = []
+            for i, intent in enumerate(self.examples):
+                texts.extend(intent.examples)
+                self._owners.extend([i] * len(intent.examples))
+            self._matrix = embedder.embed(texts)
+
+    def match(self, text: str) -> Intent | None:
+        utterance = clean(text)
+        if not utterance or len(utterance) > 120:
+            return None  # long requests are never one-shot commands
+
+        for rule in self.rules:
+            m = rule.pattern.fullmatch(utterance)
+            if m is not None:
+                intent = rule.build(rule.name, m)
+                if intent is not None:
+                    return intent
+                # A pattern matched but its slots didn't resolve: let the LLM handle it
+                return None
+
+        if self._matrix is None:
+            return None
+        sims = self._matrix @ self.embedder.embed([utterance])[0]
+        best = np.full(len(self.examples), -1.0)
+        np.maximum.at(best, self._owners, sims)
+        order = np.argsort(best)[::-1]
+        top = float(best[order[0]])
+        runner_up = float(best[order[1]]) if len(order) > 1 else -1.0
+        if top < self.threshold or top - runner_up < self.margin:
+            return None
+        unknown = set(_WORD_RE.findall(utterance)) - self._vocab[order[0]] - _FUNCTION_WORDS
+        if unknown:
+            return None
+        intent = self.examples[order[0]]
+        return Intent(intent.name, intent.tool, {}, intent.reply, confidence=round(top, 3))
+
+
+@dataclass
+class FastPathStats:
+    """Hit rate and per-path turn latency."""
+
+    hits: int = 0
+    misses: int = 0
+    latencies: dict[str, list[float]] = field(
+        default_factory=lambda: {"fast": [], "cache": [], "llm": []}
+    )
+
+    def record(self, path: str, seconds: float):
+        if path == "fast":
+            self.hits += 1
+        else:
+            self.misses += 1
+        self.latencies[path].append(seconds)
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def summary(self) -> str:
+        lines = [f"fast path: {self.hits}/{self.hits + self.misses} turns ({self.hit_rate:.0%})"]
+        for path, samples in self.latencies.items():
+            if not samples:
+                continue
+            ms = np.asarray(samples) * 1000
+            p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+            lines.append(
+                f"{path:>5}: n={len(ms)} p50 {p50:.1f} ms  p90 {p90:.1f} ms  p99 {p99:.1f} ms"
+            )
+        return "\n".join(lines)
+
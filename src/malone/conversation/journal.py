@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import atexit
+import json
+import queue
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    role TEXT NOT NULL,
+    body TEXT NOT NULL
+)
+"""
+
+_CLOSE = object()
+
+
+def _complete_tool_groups(messages: list[dict]) -> list[dict]:
+    """Drop assistant tool calls without all their results, and stray results."""
+    kept: list[dict] = []
+    i = 0
+    while i < len(messages):
+        msg = messages[i]
+        i += 1
+        if msg.get("role") == "tool":
+            continue  # not preceded by its tool call
+        if msg.get("role") != "assistant" or not msg.get("tool_calls"):
+            kept.append(msg)
+            continue
+        results = []
+        while i < len(messages) and messages[i].get("role") == "tool":
+            results.append(messages[i])
+            i += 1
+        wanted = {call["id"] for call in msg["tool_calls"]}
+        if wanted <= {r.get("tool_call_id") for r in results}:
+            kept.append(msg)
+            kept.extend(r for r in results if r.get("tool_call_id") in wanted)
+    return kept
+
+
+class ConversationJournal:
+    """Append-only SQLite (WAL) journal of conversation messages.
+
+    append() only queues the message; a writer thread commits queued
+    messages in batches, so a burst of tool results costs one commit
+    (and one fsync) instead of one each. Restoring reads the newest rows
+    by primary key, so it costs the same however long the journal is.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        flush_interval: float = 0.5,
+        retain_messages: int = 5000,
+        retain_days: float = 30.0,
+    ):
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.retain_messages = retain_messages
+        self.retain_days = retain_days
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute(_SCHEMA)
+        self._writer = threading.Thread(target=self._write_loop, name="journal", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path)
+        db.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode NORMAL syncs at checkpoints: a crash of the process
+        # loses nothing committed, a power cut at most the last batches
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def append(self, message: dict):
+        """Queue a message for writing; never blocks on disk."""
+        self._queue.put((time.time(), message["role"], json.dumps(message)))
+
+    def load_recent(self, limit: int) -> list[dict]:
+        """Return up to the last `limit` messages, oldest first.
+
+        Leading messages before the first user message are skipped so a
+        restored history never starts inside a tool-call group, and
+        tool-call groups missing results (the process was stopped while
+        tools ran) are dropped, since APIs reject unanswered tool calls.
+        """
+        try:
+            with self._connect() as db:
+                rows = db.execute(
+                    "SELECT body FROM messages ORDER BY id DESC LIMIT ?", (limit,)
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"  [Journal: failed to read {self.path}: {e}]")
+            return []
+        messages = []
+        for (body,) in reversed(rows):
+            try:
+                messages.append(json.loads(body))
+            except json.JSONDecodeError:
+                continue
+        for i, msg in enumerate(messages):
+            if msg.get("role") == "user":
+                return _complete_tool_groups(messages[i:])
+        return []
+
+    def compact(self):
+        """Apply retention (newest retain_messages, within retain_days) and shrink the WAL."""
+        cutoff = time.time() - self.retain_days * 86400
+        try:
+            with self._connect() as db:
+                db.execute(
+                    "DELETE FROM messages WHERE ts < ? OR id <= "
+                    "(SELECT MAX(id) FROM messages) - ?",
+                    (cutoff, self.retain_messages),
+                )
+                deleted = db.total_changes
+            with self._connect() as db:
+                db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                if deleted:
+                    db.execute("VACUUM")
+        except sqlite3.Error as e:
+            print(f"  [Journal: compaction failed: {e}]")
+            return
+        if deleted:
+            print(f"  [Journal: dropped {deleted} old messages]")
+
+    def close(self):
+        """Write everything queued and stop the writer."""
+        if self._writer.is_alive():
+            self._queue.put(_CLOSE)
+            self._writer.join()
+
+    def _write_loop(self):
+        db = self._connect()
+        try:
+            while True:
+                batch = [self._queue.get()]
+                # Gather whatever else arrives within the flush interval
+                deadline = time.monotonic() + self.flush_interval
+                while batch[-1] is not _CLOSE:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                rows = [row for row in batch if row is not _CLOSE]
+                if rows:
+                    try:
+                        with db:
+                            db.executemany(
+                                "INSERT INTO messages (ts, role, body) VALUES (?, ?, ?)", rows
+                            )
+                    except sqlite3.Error as e:
+                        print(f"  [Journal: failed to write {len(rows)} messages: {e}]")
+                if batch[-1] is _CLOSE:
+                    return
+        finally:
+            db.close()
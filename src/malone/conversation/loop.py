@@ -1,18 +1,34 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import json
+import time
+from collections import deque
 from enum import Enum, auto
+from uuid import uuid4
 
 from malone.audio.capture import AudioCapture
+from malone.audio.gate import EnergyGate
 from malone.audio.playback import AudioPlayback
 from malone.audio.vad import VoiceActivityDetector
+from malone.conversation.fastpath import FastPathStats, IntentMatcher
 from malone.conversation.manager import ConversationManager
-from malone.llm.base import LLMClient
+from malone.conversation.response_cache import ResponseCache, normalize
+from malone.llm.base import LLMClient, LLMResponse, ToolCall
+from malone.llm.trace import TraceLogger, TurnTrace
+from malone.memory.store import MemoryStore
+from malone.residency import ResidencyManager
 from malone.stt.transcriber import Transcriber
 from malone.tools.executor import ToolExecutor
+from malone.tools.jobs import Job
+from malone.tools.selector import ToolSelector
 from malone.tts.synthesizer import TTSSynthesizer
 
 
+_GAVE_UP = "I wasn't able to complete that task."
+
+
 class State(Enum):
     IDLE = auto()
     LISTENING = auto()
@@ -20,6 +36,28 @@ class State(Enum):
     SPEAKING = auto()
 
 
+class _TurnStats:
+    """What the LLM rounds of one turn cost, accumulated for the trace."""
+
+    def __init__(self):
+        self.backend = ""
+        self.fallback = False
+        self.prompt_tokens = 0
+        self.first_token = 0.0
+        self.tools_sent = 0
+        self.rounds = 0
+
+    def add(self, response: LLMResponse, tools_sent: int):
+        if self.rounds == 0:
+            # First round: the routing decision and the latency the user feels
+            self.backend = response.backend
+            self.first_token = response.first_token
+            self.tools_sent = tools_sent
+        self.fallback = self.fallback or response.fallback
+        self.prompt_tokens += response.usage.get("input_tokens", 0)
+        self.rounds += 1
+
+
 class ConversationLoop:
     """Main voice conversation loop: listen → transcribe → think → speak."""
 
@@ -33,8 +71,16 @@ class ConversationLoop:
         tts: TTSSynthesizer,
         conversation: ConversationManager,
         tool_executor: ToolExecutor | None = None,
+        tracer: TraceLogger | None = None,
+        fast_path: IntentMatcher | None = None,
+        tool_selector: ToolSelector | None = None,
+        memory: MemoryStore | None = None,
+        response_cache: ResponseCache | None = None,
+        residency: ResidencyManager | None = None,
+        energy_gate: EnergyGate | None = None,
         silence_threshold: float = 0.8,
         min_speech_duration: float = 0.3,
+        pre_roll: float = 0.3,
     ):
         self.audio_capture = audio_capture
         self.audio_playback = audio_playback
@@ -44,12 +90,28 @@ class ConversationLoop:
         self.tts = tts
         self.conversation = conversation
         self.tool_executor = tool_executor
+        self.tracer = tracer
+        self.fast_path = fast_path
+        self.fast_path_stats = FastPathStats()
+        self.tool_selector = tool_selector
+        self.memory = memory
+        self._memory_writes: set[asyncio.Task] = set()
+        self._recall_key: tuple[str, ...] = ()  # recalled memories a cached reply depends on
+        self.response_cache = response_cache
+        self.residency = residency
+        self.energy_gate = energy_gate
         self.silence_threshold = silence_threshold
         self.min_speech_duration = min_speech_duration
+        self.pre_roll = pre_roll  # seconds of audio kept from before speech onset
 
         self.state = State.IDLE
         self._audio_queue: asyncio.Queue[bytes] = asyncio.Queue(maxsize=200)
         self._loop: asyncio.AbstractEventLoop | None = None
+        # Announcements (e.g. finished background jobs) spoken when idle
+        self._notifications: asyncio.Queue[str] = asyncio.Queue()
+
+        if tool_executor and tool_executor.jobs:
+            tool_executor.jobs.on_complete = self._on_job_complete
 
     async def run(self):
         """Run the conversation loop until interrupted."""
@@ -65,74 +127,300 @@ class ConversationLoop:
                 self.state = State.PROCESSING
 
                 # Transcribe speech to text
-                text = await asyncio.to_thread(
-                    self.transcriber.transcribe, speech_audio
-                )
+                async with self._resident("stt"):
+                    text = await asyncio.to_thread(
+                        self.transcriber.transcribe, speech_audio
+                    )
                 if not text.strip():
                     self.state = State.IDLE
                     continue
 
                 print(f"\n  You: {text}")
 
-                # Get LLM response (with tool calling)
+                # Common intents and repeated requests skip the LLM;
+                # everything else gets a full LLM response (with tool calling)
                 self.conversation.add_user(text)
-                reply = await self._get_response()
+                start = time.monotonic()
+                reply = await self._fast_reply(text)
+                path = "fast"
+                if reply is None:
+                    # Before the cache: a cached reply is only valid with the
+                    # same memories recalled
+                    if self.memory is not None:
+                        await self._recall(text)
+                    reply = self._cached_reply(text)
+                    path = "cache"
+                if reply is None:
+                    reply = await self._get_response(text)
+                    path = "llm"
+                    self._cache_reply(text, reply, time.monotonic() - start)
+                self.fast_path_stats.record(path, time.monotonic() - start)
 
                 print(f"  Malone: {reply}")
+                self._remember()
+                await self._speak(reply)
+        finally:
+            if self.fast_path:
+                print(f"  [{self.fast_path_stats.summary()}]")
+            if self.response_cache:
+                print(f"  [{self.response_cache.summary()}]")
+            if self.energy_gate:
+                print(f"  [{self.energy_gate.summary()}]")
+            if self.tool_executor:
+                self.tool_executor.cancel_all()
+                if self.tool_executor.jobs:
+                    self.tool_executor.jobs.cancel_all()
+            self.audio_capture.stop()
 
-                # Speak the response
-                self.state = State.SPEAKING
-                try:
-                    audio_data = await self.tts.synthesize(reply)
-                    await self.audio_playback.play(audio_data)
-                except Exception as e:
-                    print(f"  [TTS error: {e}]")
+    async def _speak(self, text: str):
+        """Speak text, then discard the echo captured while speaking."""
+        self.state = State.SPEAKING
+        try:
+            # Sentences play as soon as they are synthesized, in order
+            async with self._resident("tts"):
+                await self.audio_playback.play_stream(self.tts.stream(text))
+        except Exception as e:
+            print(f"  [TTS error: {e}]")
+
+        # Drain any audio captured during TTS playback (echo prevention)
+        while not self._audio_queue.empty():
+            try:
+                self._audio_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+        # Brief pause to let echo fade before listening again
+        await asyncio.sleep(0.5)
+        self.vad.reset()
+        self.state = State.IDLE
 
-                # Drain any audio captured during TTS playback (echo prevention)
-                while not self._audio_queue.empty():
+    def _resident(self, name: str):
+        """Keep a component loaded (reloading it if needed) for the block."""
+        if self.residency is None:
+            return contextlib.nullcontext()
+        return self.residency.using(name)
+
+    def _on_job_complete(self, job: Job):
+        """Queue a spoken notice when a background job finishes."""
+        what = job.tool_name.replace("_", " ")
+        if job.status == "succeeded":
+            notice = f"Your {what} job has finished."
+        elif job.status == "cancelled":
+            notice = f"Your {what} job was cancelled."
+        else:
+            notice = f"Your {what} job failed."
+        print(f"  [Job {job.id} {job.status}]")
+        self._notifications.put_nowait(notice)
+
+    async def _fast_reply(self, text: str) -> str | None:
+        """Answer a high-confidence intent with one direct tool call.
+
+        Returns None to fall through to the LLM. The turn is recorded in
+        the history like an LLM tool call so follow-ups keep context.
+        """
+        if self.fast_path is None or self.tool_executor is None:
+            return None
+        intent = self.fast_path.match(text)
+        if intent is None:
+            return None
+        tool = self.tool_executor.registry.get(intent.tool)
+        if tool is None:
+            return None
+
+        print(f"  [Fast path: {intent.rule} -> {intent.tool}({intent.arguments})]")
+        result = await self.tool_executor.execute(intent.tool, intent.arguments)
+        if result.startswith("Error") and tool.side_effect_free:
+            return None  # safe to retry through the LLM
+
+        tool_call = ToolCall(
+            # Unique across runs: restored history may hold earlier fast calls
+            id=f"fast_{uuid4().hex[:12]}", name=intent.tool, arguments=intent.arguments
+        )
+        self.conversation.add_assistant_tool_calls(
+            LLMResponse(content="", tool_calls=[tool_call])
+        )
+        self.conversation.add_tool_result(tool_call.id, result)
+        reply = intent.reply(result)
+        self.conversation.add_assistant(reply)
+        return reply
+
+    def _cache_state(self) -> tuple:
+        """What a cached reply depends on besides the utterance."""
+        version = self.tool_executor.registry.version if self.tool_executor else 0
+        return (time.strftime("%Y-%m-%d"), version, self._recall_key)
+
+    def _cached_reply(self, text: str) -> str | None:
+        """Reply from the response cache, recorded in the history like an LLM reply."""
+        cache = self.response_cache
+        if cache is None or not cache.cacheable(text):
+            return None
+        try:
+            reply = cache.lookup(text, self._cache_state())
+        except Exception as e:
+            print(f"  [Response cache: lookup failed: {e}]")
+            return None
+        if reply is None:
+            return None
+        print("  [Response cache: hit]")
+        self.conversation.add_assistant(reply)
+        return reply
+
+    def _cache_reply(self, text: str, reply: str, latency: float):
+        """Cache an LLM reply unless it depended on tools whose results can't be reused.
+
+        A tool call qualifies when ToolExecutor would cache its result
+        (the tool has a cache_ttl and a cache key for these arguments, so
+        no side effects); the reply then lives no longer than the
+        shortest of their TTLs.
+        """
+        cache = self.response_cache
+        if cache is None or not cache.cacheable(text) or reply == _GAVE_UP:
+            return
+        ttl = cache.ttl
+        for msg in self.conversation.last_turn():
+            for call in msg.get("tool_calls") or []:
+                tool = self.tool_executor.registry.get(call["function"]["name"])
+                key = None
+                if tool is not None and tool.cache_ttl is not None:
                     try:
-                        self._audio_queue.get_nowait()
-                    except asyncio.QueueEmpty:
-                        break
-                # Brief pause to let echo fade before listening again
-                await asyncio.sleep(0.5)
-                self.vad.reset()
-                self.state = State.IDLE
-        finally:
-            self.audio_capture.stop()
+                        key = tool.cache_key(**json.loads(call["function"]["arguments"]))
+                    except Exception:
+                        pass  # bad arguments from the model: the call failed anyway
+                if key is None:
+                    cache.skipped += 1
+                    return
+                ttl = min(ttl, tool.cache_ttl)
+        try:
+            cache.store(text, reply, latency, ttl=ttl, state=self._cache_state())
+        except Exception as e:
+            print(f"  [Response cache: failed to store reply: {e}]")
+
+    async def _recall(self, text: str):
+        """Put memories from past conversations that match the request into the prompt."""
+        try:
+            found = await asyncio.to_thread(self.memory.search, text)
+        except Exception as e:
+            print(f"  [Memory: search failed: {e}]")
+            found = []
+        # Turns still in the history are already in context
+        current = self.conversation.user_texts()
+        found = [m for m in found if m.source not in current]
+        if found:
+            print(f"  [Memory: recalled {len(found)} (best {found[0].score:.2f})]")
+        lines = [m.render() for m in found]
+        self.conversation.set_recall(lines)
+        # A repeated request recalls its own earlier copies, a different set
+        # each time; keyed on those, the response cache would never hit
+        utterance = normalize(text)
+        self._recall_key = tuple(
+            line for m, line in zip(found, lines) if normalize(m.source) != utterance
+        )
+
+    def _remember(self):
+        """Store the finished turn in long-term memory, off the event loop."""
+        if self.memory is None:
+            return
+
+        async def write(turn: list[dict]):
+            try:
+                await asyncio.to_thread(self.memory.remember_turn, turn)
+            except Exception as e:
+                print(f"  [Memory: failed to store turn: {e}]")
 
-    async def _get_response(self) -> str:
+        task = asyncio.create_task(write(self.conversation.last_turn()))
+        self._memory_writes.add(task)
+        task.add_done_callback(self._memory_writes.discard)
+
+    async def _get_response(self, text: str) -> str:
         """Get LLM response, handling tool calls if needed."""
-        tools = None
-        if self.tool_executor:
-            tools = self.tool_executor.get_tool_schemas()
+        # Selection only shrinks the prompt for backends without prompt
+        # caching; the others get the full, stable tool list
+        select = self.tool_selector is not None and not self.llm.wants_all_tools(text)
+        if select:
+            selected = self.tool_selector.begin_turn(text)
+            print(f"  [Tools: {', '.join(selected)}]")
 
-        max_rounds = 5
-        for _ in range(max_rounds):
-            response = await self.llm.chat(
-                self.conversation.get_messages(), tools=tools
-            )
+        start = time.monotonic()
+        stats = _TurnStats()
+        budget = self.llm.budget_for(text)
 
-            # No tool calls - return the text response
-            if not response.tool_calls:
-                self.conversation.add_assistant(response.content)
-                return response.content
+        max_rounds = 5
+        for rounds in range(1, max_rounds + 1):
+            tools = None
+            if self.tool_executor:
+                names = self.tool_selector.selected() if select else None
+                tools = self.tool_executor.get_tool_schemas(names)
 
-            # Handle tool calls
-            # Add assistant message with tool calls to history
-            self.conversation.add_assistant_tool_calls(response)
+            # Tool calls start executing as soon as the model finishes
+            # emitting them, while the rest of the response still streams
+            pending: dict[str, asyncio.Task[str]] = {}
 
-            for tool_call in response.tool_calls:
+            def dispatch(tool_call: ToolCall):
                 print(f"  [Tool: {tool_call.name}({tool_call.arguments})]")
-                result = await self.tool_executor.execute(
-                    tool_call.name, tool_call.arguments
+                pending[tool_call.id] = self.tool_executor.start(tool_call)
+
+            try:
+                response = await self.llm.chat(
+                    self.conversation.get_messages(budget),
+                    tools=tools,
+                    on_tool_call=dispatch if self.tool_executor else None,
+                )
+                stats.add(response, len(tools or []))
+
+                # No tool calls - return the text response
+                if not response.tool_calls:
+                    self.conversation.add_assistant(response.content)
+                    self._trace(text, stats, rounds, start, completed=True)
+                    return response.content
+
+                # Handle tool calls
+                # Add assistant message with tool calls to history
+                self.conversation.add_assistant_tool_calls(response)
+
+                for tool_call in response.tool_calls:
+                    if tool_call.id not in pending:
+                        dispatch(tool_call)
+
+                # Calls run concurrently; stitch results back in issue order
+                results = await asyncio.gather(
+                    *(pending[tc.id] for tc in response.tool_calls)
                 )
-                print(f"  [Result: {result[:200]}]")
-                self.conversation.add_tool_result(tool_call.id, result)
+                for tool_call, result in zip(response.tool_calls, results):
+                    print(f"  [Result: {result[:200]}]")
+                    self.conversation.add_tool_result(tool_call.id, result)
+            finally:
+                # Aborted turn or failed round: cancel any stragglers
+                for task in pending.values():
+                    task.cancel()
 
         # Fallback if we hit max rounds
-        self.conversation.add_assistant("I wasn't able to complete that task.")
-        return "I wasn't able to complete that task."
+        self._trace(text, stats, max_rounds, start, completed=False)
+        self.conversation.add_assistant(_GAVE_UP)
+        return _GAVE_UP
+
+    def _trace(
+        self,
+        text: str,
+        stats: _TurnStats,
+        rounds: int,
+        start: float,
+        completed: bool,
+    ):
+        """Record the turn outcome for routing classifier training."""
+        if self.tracer is None:
+            return
+        self.tracer.log(
+            TurnTrace(
+                text=text,
+                backend=stats.backend,
+                rounds=rounds,
+                fallback=stats.fallback,
+                latency=time.monotonic() - start,
+                completed=completed,
+                prompt_tokens=stats.prompt_tokens,
+                first_token=stats.first_token,
+                tools_sent=stats.tools_sent,
+            )
+        )
 
     async def _collect_speech(self) -> bytes | None:
         """Collect audio until a complete utterance is detected via VAD."""
@@ -141,8 +429,19 @@ class ConversationLoop:
         speech_active = False
         silence_duration = 0.0
         chunk_duration = self.audio_capture.blocksize / self.audio_capture.sample_rate
+        # Audio from just before onset, so the first syllable isn't clipped
+        # by the time the energy gate and VAD take to react
+        pre_roll: deque[bytes] = deque(maxlen=max(round(self.pre_roll / chunk_duration), 1))
+        gate_open = False
 
         while True:
+            # Announce finished background jobs between utterances
+            if not speech_active and not self._notifications.empty():
+                notice = self._notifications.get_nowait()
+                print(f"  Malone: {notice}")
+                await self._speak(notice)
+                continue
+
             try:
                 chunk = await asyncio.wait_for(
                     self._audio_queue.get(), timeout=0.1
@@ -154,15 +453,32 @@ class ConversationLoop:
             if self.state == State.SPEAKING:
                 continue
 
+            # Between utterances, clearly silent blocks skip Silero
+            if not speech_active and self.energy_gate is not None:
+                was_open, gate_open = gate_open, self.energy_gate.passes(chunk)
+                if not gate_open:
+                    pre_roll.append(chunk)
+                    continue
+                if not was_open:
+                    self.vad.reset()  # state is stale from before the gap
+
             is_speech = self.vad.is_speech(chunk, self.audio_capture.sample_rate)
 
             if is_speech and not speech_active:
-                # Speech onset
+                # Speech onset: reload whatever was unloaded while idle
+                # during the utterance rather than after it
+                if self.residency is not None:
+                    self.residency.prefetch("stt", "tts")
                 speech_active = True
                 self.state = State.LISTENING
                 silence_duration = 0.0
+                speech_buffer.extend(b"".join(pre_roll))
+                pre_roll.clear()
                 speech_buffer.extend(chunk)
 
+            elif not is_speech and not speech_active:
+                pre_roll.append(chunk)
+
             elif is_speech and speech_active:
                 silence_duration = 0.0
                 speech_buffer.extend(chunk)
@@ -182,6 +498,7 @@ class ConversationLoop:
                     speech_buffer.clear()
                     speech_active = False
                     silence_duration = 0.0
+                    gate_open = False
                     self.vad.reset()
                     self.state = State.IDLE
 
@@ -1,23 +1,111 @@
 from __future__ import annotations
 
-from malone.llm.base import LLMResponse
+import bisect
+import json
+import re
+
+from malone.conversation.journal import ConversationJournal
+from malone.llm.base import ContextMessage, LLMResponse
+from malone.tokens import estimate_tokens, message_tokens
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s")
+
+# A rebuilt view is filled to this share of its budget, so the next
+# appends extend it instead of shifting its start (which would also
+# defeat the Claude prompt cache) every round
+_REFILL = 0.75
+
+
+def _clip(text: str, words: int) -> str:
+    """First sentence of text, at most `words` words."""
+    first = _SENTENCE_RE.split(text.strip(), maxsplit=1)[0]
+    parts = first.split()
+    return " ".join(parts[:words]) + (" ..." if len(parts) > words else "")
+
+
+def _digest(turn: list[dict]) -> str:
+    """One summary line for a turn: the request, tools used, and the reply."""
+    request = ""
+    reply = ""
+    tools: list[str] = []
+    for msg in turn:
+        if msg["role"] == "user" and not request:
+            request = msg.get("content") or ""
+        elif msg["role"] == "assistant":
+            for call in msg.get("tool_calls") or []:
+                name = call["function"]["name"]
+                if name not in tools:
+                    tools.append(name)
+            if msg.get("content"):
+                reply = msg["content"]
+    line = f"- User: {_clip(request, 20)}"
+    if tools:
+        line += f" [used {', '.join(tools)}]"
+    if reply:
+        line += f" / Malone: {_clip(reply, 25)}"
+    return line
+
+
+class _View:
+    """History assembled for one token budget: system message + newest messages."""
+
+    def __init__(self, messages: list[dict], tokens: int, extendable: bool):
+        self.messages = messages
+        self.tokens = tokens  # of the history part
+        self.extendable = extendable  # False once tool-call groups were dropped
 
 
 class ConversationManager:
-    """Manages conversation message history."""
+    """Manages conversation message history within token budgets.
 
-    def __init__(self, system_prompt: str, max_history: int = 50):
+    Token counts are estimated once per message and kept as prefix sums,
+    so a budget's cut point is found by bisection. Each backend asks for
+    its own budget; the assembled message list for a budget is cached
+    and appending a message extends it in place. History is cut only at
+    turn starts (user messages) so an assistant tool_calls message is
+    never separated from its tool results; if the latest turn alone is
+    too large, its oldest tool-call groups are dropped.
+    Turns left out of a view, and turns dropped once the history exceeds
+    max_tokens, are kept as one-line digests in a rolling summary
+    appended to the system prompt. Memories recalled for the current
+    turn (set_recall) follow the history as a context message, so the
+    prefix before them stays the same from turn to turn. With a journal,
+    every message is also persisted so history survives restarts (see
+    restore()).
+    """
+
+    def __init__(
+        self,
+        system_prompt: str,
+        max_tokens: int = 32000,
+        summary_tokens: int = 300,
+        recall_tokens: int = 300,
+        journal: ConversationJournal | None = None,
+    ):
         self.system_prompt = system_prompt
-        self.max_history = max_history
+        self.max_tokens = max_tokens
+        self.summary_tokens = summary_tokens
+        self.recall_tokens = recall_tokens
+        self.journal = journal
         self._messages: list[dict] = []
+        self._cum: list[int] = [0]  # _cum[i] = tokens of _messages[:i]
+        self._turn_starts: list[int] = []  # indices of user messages (and of 0)
+        self._digests: dict[int, str] = {}  # turn start -> digest line
+        self._summary: list[str] = []  # digests of turns dropped from history
+        self._recall: list[str] = []  # memories recalled for the current turn
+        self._recall_msg: ContextMessage | None = None
+        self._views: dict[int | None, _View] = {}
+        self._system_tokens = message_tokens({"role": "system", "content": system_prompt})
+
+    @property
+    def total_tokens(self) -> int:
+        return self._cum[-1]
 
     def add_user(self, text: str):
-        self._messages.append({"role": "user", "content": text})
-        self._trim()
+        self._add({"role": "user", "content": text})
 
     def add_assistant(self, text: str):
-        self._messages.append({"role": "assistant", "content": text})
-        self._trim()
+        self._add({"role": "assistant", "content": text})
 
     def add_assistant_tool_calls(self, response: LLMResponse):
         """Add an assistant message that contains tool calls."""
@@ -28,27 +116,193 @@ class ConversationManager:
                 "type": "function",
                 "function": {
                     "name": tc.name,
-                    "arguments": str(tc.arguments),
+                    "arguments": json.dumps(tc.arguments),
                 },
             }
             for tc in response.tool_calls
         ]
-        self._messages.append(msg)
-        self._trim()
+        self._add(msg)
 
     def add_tool_result(self, tool_call_id: str, result: str):
         """Add a tool result message."""
-        self._messages.append({
+        self._add({
             "role": "tool",
             "tool_call_id": tool_call_id,
             "content": result,
         })
-        self._trim()
 
-    def get_messages(self) -> list[dict]:
-        """Return full message list including system prompt."""
-        return [{"role": "system", "content": self.system_prompt}] + self._messages
+    def restore(self, limit: int) -> int:
+        """Load the last `limit` journaled messages; returns how many were loaded."""
+        if self.journal is None:
+            return 0
+        messages = self.journal.load_recent(limit)
+        for msg in messages:
+            self._add(msg, record=False)
+        return len(messages)
+
+    def set_recall(self, lines: list[str]):
+        """Show recalled memories (best first) after the history until replaced."""
+        kept: list[str] = []
+        used = 0
+        for line in lines:
+            used += estimate_tokens(line) + 1
+            if used > self.recall_tokens:
+                break
+            kept.append(line)
+        if kept != self._recall:
+            self._recall = kept
+            self._recall_msg = None
+            if kept:
+                self._recall_msg = ContextMessage(
+                    role="user",
+                    content="(Context, not said by the user) Possibly relevant, from past "
+                    "conversations:\n" + "\n".join(kept),
+                )
+
+    def user_texts(self) -> set[str]:
+        """Requests of the turns still in the history."""
+        return {m["content"] for m in self._messages if m["role"] == "user"}
+
+    def last_turn(self) -> list[dict]:
+        """Messages of the latest turn, starting with its user message."""
+        if not self._turn_starts:
+            return []
+        return self._messages[self._turn_starts[-1]:]
+
+    def get_messages(self, budget: int | None = None) -> list[dict]:
+        """Return the system prompt and as much recent history as fits the budget.
+
+        budget is in tokens, including the system message and recalled
+        memories; None keeps the whole history. The returned list may be
+        cached and extended by later appends, so callers must not modify it.
+        """
+        view = self._views.get(budget)
+        if view is None:
+            view = self._views[budget] = self._build_view(budget)
+        if self._recall_msg is None:
+            return view.messages
+        return [*view.messages, self._recall_msg]
+
+    def _add(self, msg: dict, record: bool = True):
+        if record and self.journal is not None:
+            self.journal.append(msg)
+        index = len(self._messages)
+        tokens = message_tokens(msg)
+        self._messages.append(msg)
+        self._cum.append(self._cum[-1] + tokens)
+        if msg["role"] == "user" or index == 0:
+            self._turn_starts.append(index)
+
+        if self.total_tokens > self.max_tokens and len(self._turn_starts) > 1:
+            self._drop_old_turns()
+            return
+
+        for budget, view in list(self._views.items()):
+            fits = budget is None or view.tokens + tokens <= self._history_budget(budget)
+            if view.extendable and fits:
+                view.messages.append(msg)
+                view.tokens += tokens
+            else:
+                del self._views[budget]
+
+    def _history_budget(self, budget: int) -> int:
+        return budget - self._system_tokens - self.summary_tokens - self.recall_tokens
+
+    def _build_view(self, budget: int | None) -> _View:
+        if budget is None:
+            return self._assemble(0, list(range(len(self._messages))), True)
+
+        target = int(self._history_budget(budget) * _REFILL)
+        # Earliest turn start whose suffix fits: total - _cum[start] <= target
+        first = bisect.bisect_left(
+            self._turn_starts, self.total_tokens - target, key=self._cum.__getitem__
+        )
+        if first < len(self._turn_starts):
+            start = self._turn_starts[first]
+            return self._assemble(start, list(range(start, len(self._messages))), True)
+        if not self._turn_starts:
+            return self._assemble(0, [], True)
+
+        # The latest turn alone is too large: keep its request and the
+        # newest tool-call groups that fit
+        start = self._turn_starts[-1]
+        groups = self._groups(start + 1)
+        kept: list[int] = []
+        used = self._cum[start + 1] - self._cum[start]
+        for group in reversed(groups):
+            size = self._cum[group[-1] + 1] - self._cum[group[0]]
+            if used + size > target and kept:
+                break
+            kept[:0] = group
+            used += size
+        return self._assemble(start, [start, *kept], False)
+
+    def _groups(self, begin: int) -> list[list[int]]:
+        """Split messages from begin on into assistant message + tool results groups."""
+        groups: list[list[int]] = []
+        for i in range(begin, len(self._messages)):
+            if self._messages[i]["role"] == "tool" and groups:
+                groups[-1].append(i)
+            else:
+                groups.append([i])
+        return groups
+
+    def _assemble(self, start: int, indices: list[int], extendable: bool) -> _View:
+        lines = list(self._summary)
+        for turn_start in self._turn_starts:
+            if turn_start >= start:
+                break
+            lines.append(self._digest_at(turn_start))
+        summary = self._fit_summary(lines)
+
+        content = self.system_prompt
+        if summary:
+            content += "\n\nEarlier in this conversation:\n" + "\n".join(summary)
+        messages = [{"role": "system", "content": content}]
+        messages.extend(self._messages[i] for i in indices)
+        tokens = sum(self._cum[i + 1] - self._cum[i] for i in indices)
+        return _View(messages, tokens, extendable)
+
+    def _fit_summary(self, lines: list[str]) -> list[str]:
+        """Newest digest lines that fit summary_tokens, oldest first."""
+        kept: list[str] = []
+        used = 0
+        for line in reversed(lines):
+            used += estimate_tokens(line) + 1
+            if used > self.summary_tokens:
+                break
+            kept.append(line)
+        kept.reverse()
+        return kept
+
+    def _digest_at(self, turn_start: int) -> str:
+        digest = self._digests.get(turn_start)
+        if digest is None:
+            position = self._turn_starts.index(turn_start)
+            end = (
+                self._turn_starts[position + 1]
+                if position + 1 < len(self._turn_starts)
+                else len(self._messages)
+            )
+            digest = self._digests[turn_start] = _digest(self._messages[turn_start:end])
+        return digest
+
+    def _drop_old_turns(self):
+        """Move the oldest turns into the rolling summary, keeping the latest turn."""
+        target = int(self.max_tokens * _REFILL)
+        cut = self._turn_starts[-1]
+        for turn_start in self._turn_starts[1:]:
+            if self.total_tokens - self._cum[turn_start] <= target:
+                cut = turn_start
+                break
+        for turn_start in self._turn_starts:
+            if turn_start >= cut:
+                break
+            self._summary.append(self._digest_at(turn_start))
+        self._summary = self._fit_summary(self._summary)
 
-    def _trim(self):
-        if len(self._messages) > self.max_history:
-            self._messages = self._messages[-self.max_history:]
+        self._messages = self._messages[cut:]
+        self._cum = [c - self._cum[cut] for c in self._cum[cut:]]
+        self._turn_starts = [i - cut for i in self._turn_starts if i >= cut]
+        self._digests = {}
+        self._views = {}
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+
+from malone.conversation.fastpath import clean
+from malone.embedding import Embedder
+
+_CONTRACTIONS = {
+    "what's": "what is", "how's": "how is", "where's": "where is", "who's": "who is",
+    "it's": "it is", "that's": "that is", "there's": "there is", "i'm": "i am",
+    "don't": "do not", "doesn't": "does not", "isn't": "is not", "aren't": "are not",
+    "can't": "cannot", "won't": "will not",
+}
+
+# Utterances that lean on the conversation so far, or on what is known
+# about the speaker, can't be answered from a cache
+_CONTEXTUAL_RE = re.compile(
+    r"\b(?:it|its|that|this|those|these|them|they|he|she|again|other|else|"
+    r"too|also|more|instead|same|previous|last one|i|me|my|we|our|earlier|"
+    r"before|just)\b"
+)
+
+# Words two utterances must share exactly for a similarity hit: numbers and
+# words that flip the meaning of otherwise identical requests
+_SIGNIFICANT_RE = re.compile(
+    r"\d+|\b(?:on|off|not|no|up|down|open|close|closed|lock|unlock|start|stop|"
+    r"yesterday|today|tomorrow|tonight)\b"
+)
+
+
+def normalize(text: str) -> str:
+    """clean() plus expanded contractions, without the assistant's name."""
+    words = clean(text).replace(",", " ").split()
+    return " ".join(_CONTRACTIONS.get(w, w) for w in words if w != "malone")
+
+
+@dataclass
+class _Entry:
+    reply: str
+    expires: float
+    latency: float  # seconds the original LLM turn took
+    significant: tuple[str, ...]
+
+
+class ResponseCache:
+    """Replies to repeated utterances, reused without calling the LLM.
+
+    Keyed by the normalized utterance and a fingerprint of the state the
+    reply depends on. An exact match is a hit; with an embedder, so is a
+    stored utterance whose similarity passes the threshold and that has
+    the same numbers and on/off-style words. Entries expire after their
+    TTL and the least recently used are evicted beyond max_entries.
+    Deciding what may be stored, and for how long, is up to the caller.
+    """
+
+    def __init__(
+        self,
+        embedder: Embedder | None = None,
+        ttl: float = 3600.0,
+        max_entries: int = 256,
+        threshold: float = 0.9,
+    ):
+        self.embedder = embedder
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self._entries: OrderedDict[tuple[str, tuple], _Entry] = OrderedDict()
+        self._vectors: dict[tuple[str, tuple], np.ndarray] = {}
+        self._matrix: np.ndarray | None = None  # rows follow _matrix_keys
+        self._matrix_keys: list[tuple[str, tuple]] = []
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.skipped = 0  # turns that could not be cached
+        self.saved = 0.0  # seconds of LLM time avoided
+
+    def cacheable(self, text: str) -> bool:
+        """False for utterances that refer back to the conversation."""
+        return not _CONTEXTUAL_RE.search(normalize(text))
+
+    def lookup(self, text: str, state: tuple = ()) -> str | None:
+        start = time.monotonic()
+        utterance = normalize(text)
+        key = (utterance, state)
+        entry = self._live(key)
+        if entry is not None:
+            self.exact_hits += 1
+        elif self.embedder is not None:
+            key = self._similar(utterance, state)
+            if key is not None:
+                entry = self._entries[key]
+                self.similar_hits += 1
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.saved += max(entry.latency - (time.monotonic() - start), 0.0)
+        return entry.reply
+
+    def store(
+        self, text: str, reply: str, latency: float, ttl: float | None = None, state: tuple = ()
+    ):
+        """Cache a reply for ttl seconds (default self.ttl)."""
+        ttl = self.ttl if ttl is None else ttl
+        utterance = normalize(text)
+        key = (utterance, state)
+        self._entries[key] = _Entry(
+            reply, time.monotonic() + ttl, latency, tuple(_SIGNIFICANT_RE.findall(utterance))
+        )
+        self._entries.move_to_end(key)
+        if self.embedder is not None:
+            self._vectors[key] = self.embedder.embed([utterance])[0]
+            self._matrix = None
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+
+    def _live(self, key: tuple[str, tuple]) -> _Entry | None:
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() >= entry.expires:
+            self._drop(key)
+            return None
+        return entry
+
+    def _drop(self, key: tuple[str, tuple]):
+        del self._entries[key]
+        if self._vectors.pop(key, None) is not None:
+            self._matrix = None
+
+    def _similar(self, utterance: str, state: tuple) -> tuple[str, tuple] | None:
+        if not self._vectors:
+            return None
+        if self._matrix is None:
+            self._matrix_keys = list(self._vectors)
+            self._matrix = np.stack([self._vectors[k] for k in self._matrix_keys])
+        sims = self._matrix @ self.embedder.embed([utterance])[0]
+        significant = tuple(_SIGNIFICANT_RE.findall(utterance))
+        for row in np.argsort(-sims):
+            if sims[row] < self.threshold:
+                break
+            key = self._matrix_keys[row]
+            if key[1] != state:
+                continue
+            entry = self._live(key)
+            if entry is not None and entry.significant == significant:
+                return key
+        return None
+
+    def summary(self) -> str:
+        hits = self.exact_hits + self.similar_hits
+        lookups = hits + self.misses
+        rate = hits / lookups if lookups else 0.0
+        return (
+            f"response cache: {hits}/{lookups} hits ({rate:.0%}; {self.exact_hits} exact, "
+            f"{self.similar_hits} similar), {self.skipped} uncacheable turns, "
+            f"~{self.saved:.1f}s of LLM time saved"
+        )
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+
+@dataclass
+class EngineThreads:
+    """Threads an inference engine may use, and optionally the cores it runs on."""
+
+    intra: int  # threads one inference uses
+    inter: int = 1  # independent inferences / operator branches at once
+    cores: tuple[int, ...] = ()  # empty = not pinned
+
+
+def available_cores() -> list[int]:
+    try:
+        return sorted(os.sched_getaffinity(0))
+    except AttributeError:  # not Linux
+        return list(range(os.cpu_count() or 1))
+
+
+def _split(cores: list[int], *shares: int) -> list[tuple[int, ...]]:
+    """Consecutive slices of cores with the given sizes (at least one core each)."""
+    out, start = [], 0
+    for share in shares:
+        share = max(share, 1)
+        picked = cores[start:start + share] or cores[-share:]
+        out.append(tuple(picked))
+        start += share
+    return out
+
+
+def plan_threads(
+    config, tts_workers: int = 1, cores: list[int] | None = None
+) -> dict[str, EngineThreads]:
+    """Partition the cores between VAD, STT and TTS from ThreadSettings.
+
+    VAD (a tiny model run per audio block) gets its own core; STT and
+    TTS split the rest, each unless set explicitly. TTS threads are per
+    Piper session, so the tts_workers sessions share the TTS cores.
+    VAD runs on the event loop thread, so its core is kept free of the
+    other engines rather than pinned.
+    """
+    cores = cores or available_cores()
+    n = len(cores)
+    vad = config.vad or 1
+    rest = max(n - vad, 1)
+    stt = config.stt or max((rest + 1) // 2, 1)
+    tts_total = max(rest - stt, 1)
+    tts = config.tts or max(tts_total // max(tts_workers, 1), 1)
+
+    _, stt_cores, tts_cores = _split(cores, vad, stt, tts_total)
+    pin = config.pin and n > 2
+    return {
+        "vad": EngineThreads(vad, 1),
+        "stt": EngineThreads(stt, 1, stt_cores if pin else ()),
+        "tts": EngineThreads(tts, 1, tts_cores if pin else ()),
+    }
+
+
+def pin_current_thread(cores: tuple[int, ...]):
+    """Restrict the calling thread (and threads it creates later) to cores."""
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+
+
+@contextmanager
+def pinned(cores: tuple[int, ...]):
+    """Run the block pinned to cores, e.g. while an engine starts its thread pool.
+
+    Threads created meanwhile keep the affinity (Linux threads inherit
+    their creator's), so the engine's workers stay on its cores.
+    """
+    if not cores or not hasattr(os, "sched_setaffinity"):
+        yield
+        return
+    previous = os.sched_getaffinity(0)
+    os.sched_setaffinity(0, cores)
+    try:
+        yield
+    finally:
+        os.sched_setaffinity(0, previous)
+
+
+class StageGate:
+    """Tracks which pipeline stages are running so overlapping ones can back off.
+
+    A stage marks itself with running(); another runs its parallel jobs
+    through slot(), which admits fewer of them while the stages it yields
+    to are busy, e.g. the TTS pool halves while a transcription runs.
+    """
+
+    def __init__(self):
+        self._active: dict[str, int] = {}
+        self._changed = threading.Condition()
+
+    @contextmanager
+    def running(self, stage: str):
+        with self._changed:
+            self._active[stage] = self._active.get(stage, 0) + 1
+        try:
+            yield
+        finally:
+            with self._changed:
+                self._active[stage] -= 1
+                self._changed.notify_all()
+
+    def busy(self, stage: str) -> bool:
+        return self._active.get(stage, 0) > 0
+
+    @contextmanager
+    def slot(self, stage: str, full: int, yields_to: tuple[str, ...] = ()):
+        """Run one job of a stage, at most `full` at once, or half that while
+        any stage in yields_to is running."""
+        with self._changed:
+            while True:
+                limit = full
+                if any(self.busy(other) for other in yields_to):
+                    limit = max(full // 2, 1)
+                if self._active.get(stage, 0) < limit:
+                    break
+                self._changed.wait()
+            self._active[stage] = self._active.get(stage, 0) + 1
+        try:
+            yield
+        finally:
+            with self._changed:
+                self._active[stage] -= 1
+                self._changed.notify_all()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from malone.llm.classifier import hash_features
+
+
+class Embedder(ABC):
+    """Maps texts to L2-normalized vectors, so a dot product is cosine similarity."""
+
+    dim: int
+
+    @abstractmethod
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Return a (len(texts), dim) float32 array of unit vectors."""
+
+
+class HashingEmbedder(Embedder):
+    """Bag of hashed unigrams and bigrams.
+
+    No model and no dependencies; costs microseconds per text. Captures
+    word overlap, not meaning, so paraphrases with different words score
+    low.
+    """
+
+    def __init__(self, dim: int = 4096):
+        self.dim = dim
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            idx = hash_features(text, self.dim)
+            if len(idx):
+                out[row, idx] = 1.0 / np.sqrt(len(idx))
+        return out
+
+
+class SentenceTransformerEmbedder(Embedder):
+    """Small sentence-transformers model (e.g. all-MiniLM-L6-v2) on CPU.
+
+    Requires the sentence-transformers package.
+    """
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", device: str = "cpu"):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device=device)
+        self.dim = self.model.get_sentence_embedding_dimension()
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = self.model.encode(
+            texts, normalize_embeddings=True, convert_to_numpy=True
+        )
+        return vectors.astype(np.float32)
+
+
+def build_embedder(name: str, hashing_dim: int = 4096) -> Embedder | None:
+    """Create an embedder from a settings value.
+
+    "hashing" is the built-in embedder, "" or "none" disables embedding,
+    anything else is a sentence-transformers model name. Falls back to
+    hashing if sentence-transformers is unavailable.
+    """
+    if not name or name == "none":
+        return None
+    if name == "hashing":
+        return HashingEmbedder(hashing_dim)
+    try:
+        return SentenceTransformerEmbedder(name)
+    except ImportError:
+        print(f"  [Embedding: sentence-transformers not installed, using hashing instead of {name}]")
+        return HashingEmbedder(hashing_dim)
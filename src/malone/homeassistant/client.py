@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+from functools import lru_cache
+
+import httpx
+
+from malone.config.settings import get_settings
+
+# Gateway errors usually mean HA is restarting or a proxy hiccupped
+_RETRY_STATUS = {502, 503, 504}
+
+
+class HomeAssistantError(Exception):
+    """Raised when Home Assistant is unreachable or returns an error."""
+
+
+class _Retry(Exception):
+    """Internal signal that a response should be retried."""
+
+
+class HomeAssistantClient:
+    """Shared REST client for Home Assistant.
+
+    One pooled httpx.AsyncClient with keep-alive (and optionally HTTP/2) is
+    reused for every call. Transient failures are retried with exponential
+    backoff and concurrent requests are bounded by a semaphore.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        token: str,
+        timeout: float = 10.0,
+        max_connections: int = 8,
+        max_concurrent: int = 4,
+        http2: bool = False,
+        retries: int = 2,
+        retry_backoff: float = 0.25,
+    ):
+        self.url = url.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_concurrent = max_concurrent
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.http2 = http2
+        if http2 and importlib.util.find_spec("h2") is None:
+            print("  [Home Assistant: h2 not installed, using HTTP/1.1]")
+            self.http2 = False
+        # Created lazily so they bind to the running event loop
+        self._client: httpx.AsyncClient | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.url and self.token)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.url,
+                headers={"Authorization": f"Bearer {self.token}"},
+                timeout=self.timeout,
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._client
+
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Send a request, retrying transient failures.
+
+        GETs are retried on any transport error. Other methods are only
+        retried when the request cannot have reached HA (connection
+        failures), so service calls are never executed twice.
+        """
+        client = self._get_client()
+        idempotent = method == "GET"
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    resp = await client.request(method, path, **kwargs)
+                retryable = resp.status_code in _RETRY_STATUS and (
+                    # A gateway timeout may hide a service call that ran
+                    idempotent or resp.status_code != 504
+                )
+                if retryable and attempt < self.retries:
+                    raise _Retry(f"HTTP {resp.status_code}")
+                resp.raise_for_status()
+                return resp
+            except (_Retry, httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+                if attempt >= self.retries:
+                    raise HomeAssistantError(f"{method} {path} failed after retries")
+            except httpx.TransportError as e:
+                if not idempotent or attempt >= self.retries:
+                    raise HomeAssistantError(f"{method} {path} failed: {e}") from e
+            except httpx.HTTPStatusError as e:
+                raise HomeAssistantError(
+                    f"{method} {path} returned {e.response.status_code}"
+                ) from e
+            await asyncio.sleep(self.retry_backoff * 2**attempt)
+            attempt += 1
+
+    async def get_states(self) -> list[dict]:
+        resp = await self.request("GET", "/api/states")
+        return resp.json()
+
+    async def call_service(self, domain: str, service: str, data: dict) -> list[dict]:
+        """Call a service; returns the states HA reports as changed."""
+        resp = await self.request("POST", f"/api/services/{domain}/{service}", json=data)
+        return resp.json() if resp.content else []
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+@lru_cache
+def get_ha_client() -> HomeAssistantClient:
+    """Return the app-wide Home Assistant client."""
+    config = get_settings().home_assistant
+    return HomeAssistantClient(
+        url=config.url,
+        token=config.token.get_secret_value(),
+        timeout=config.timeout,
+        max_connections=config.max_connections,
+        max_concurrent=config.max_concurrent,
+        http2=config.http2,
+        retries=config.retries,
+        retry_backoff=config.retry_backoff,
+    )
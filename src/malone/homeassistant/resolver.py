@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+from malone.homeassistant.state import StateMirror, get_state_mirror
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Words that carry no identity in a device name
+_STOPWORDS = {"the", "a", "an", "my", "our", "please", "all", "of", "in", "on", "at"}
+
+# Spoken words that imply an entity domain
+DOMAIN_WORDS = {
+    "light": "light", "lights": "light", "lamp": "light", "lamps": "light",
+    "switch": "switch", "plug": "switch", "outlet": "switch",
+    "fan": "fan", "fans": "fan",
+    "thermostat": "climate", "heating": "climate", "heater": "climate", "ac": "climate",
+    "blind": "cover", "blinds": "cover", "shade": "cover", "shades": "cover",
+    "curtain": "cover", "curtains": "cover",
+    "lock": "lock", "locks": "lock",
+    "tv": "media_player", "television": "media_player", "speaker": "media_player",
+    "scene": "scene", "automation": "automation",
+}
+
+# Domains a device action applies to (turn_off has no meaning for a cover or lock)
+ACTION_DOMAINS = {
+    "turn_on": {"light", "switch", "fan", "media_player", "input_boolean"},
+    "turn_off": {"light", "switch", "fan", "media_player", "input_boolean"},
+    "toggle": {"light", "switch", "fan", "media_player", "input_boolean"},
+    "set_brightness": {"light"},
+    "set_temperature": {"climate"},
+}
+
+
+def _stem(word: str) -> str:
+    """Crude singular form so 'lights' matches 'light'."""
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def normalize(text: str) -> list[str]:
+    """Lowercase, split on non-alphanumerics, drop stopwords, singularize."""
+    words = _WORD_RE.findall(text.lower().replace("_", " "))
+    return [_stem(w) for w in words if w not in _STOPWORDS]
+
+
+def trigrams(text: str) -> frozenset[str]:
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass(frozen=True)
+class _Entry:
+    entity_id: str
+    domain: str
+    name: str
+    area: str
+    tokens: frozenset[str]
+    labels: tuple[frozenset[str], ...]  # trigram sets of each name variant
+
+
+@dataclass
+class Match:
+    entity_id: str
+    domain: str
+    name: str
+    area: str
+    score: float
+    coverage: float  # fraction of query words found in the entity's names
+
+
+class EntityResolver:
+    """Resolves spoken device names to Home Assistant entity_ids.
+
+    Each entity is indexed under its friendly name, voice aliases, area and
+    entity_id, with normalized tokens and trigrams precomputed. A query is
+    scored by token coverage (exact or fuzzy) plus trigram similarity to
+    the best matching name variant. The index follows the StateMirror:
+    it is rebuilt on resync and on registry updates (areas, aliases) and
+    patched per entity on state changes.
+    """
+
+    def __init__(self, mirror: StateMirror, min_score: float = 0.55, margin: float = 0.08):
+        self.mirror = mirror
+        self.min_score = min_score
+        self.margin = margin
+        self._entries: dict[str, _Entry] = {}
+        self._by_token: dict[str, set[str]] = {}
+        self._token_grams: dict[str, frozenset[str]] = {}
+        self._area_tokens: set[str] = set()
+        self._generation = (-1, -1)  # mirror (snapshots, registries) indexed
+        mirror.add_listener(self._on_state_changed)
+
+    def resolve(
+        self, query: str, domains: set[str] | None = None, limit: int = 5
+    ) -> list[Match]:
+        """Return the best matching entities for a spoken name, best first."""
+        self._sync()
+        words = normalize(query)
+        if not words:
+            return []
+
+        # A domain word ("lights", "fan") narrows the search unless overridden
+        hinted = {DOMAIN_WORDS[w] for w in words if w in DOMAIN_WORDS}
+        if domains is None and hinted:
+            domains = hinted
+
+        query_grams = trigrams(" ".join(words))
+        candidates: set[str] = set()
+        expanded: dict[str, set[str]] = {}
+        for word in words:
+            expanded[word] = self._fuzzy_tokens(word)
+            for token in expanded[word]:
+                candidates |= self._by_token.get(token, set())
+
+        matches = []
+        for entity_id in candidates:
+            entry = self._entries.get(entity_id)
+            if entry is None or (domains and entry.domain not in domains):
+                continue
+            covered = sum(
+                1 for w in words
+                if expanded[w] & entry.tokens or DOMAIN_WORDS.get(w) == entry.domain
+            )
+            coverage = covered / len(words)
+            similarity = max(_jaccard(query_grams, label) for label in entry.labels)
+            score = 0.65 * coverage + 0.35 * similarity
+            matches.append(
+                Match(entity_id, entry.domain, entry.name, entry.area, round(score, 3), coverage)
+            )
+
+        matches.sort(key=lambda m: (-m.score, m.entity_id))
+        return matches[:limit]
+
+    def best(self, query: str, domains: set[str] | None = None) -> tuple[list[Match], list[Match]]:
+        """Resolve to confident targets.
+
+        Returns (targets, candidates). targets holds one entity, or every
+        matching entity when the query names a group by area and a plural
+        device type ("the kitchen lights"). It is empty when nothing
+        matches confidently, in which case candidates lists the closest
+        options.
+        """
+        matches = self.resolve(query, domains=domains, limit=50)
+        if not matches or matches[0].score < self.min_score:
+            return [], matches[:5]
+
+        words = normalize(query)
+        raw = _WORD_RE.findall(query.lower())
+        plural = any(w in DOMAIN_WORDS and _stem(w) != w for w in raw) or "all" in raw
+        if plural and all(w in self._area_tokens or w in DOMAIN_WORDS for w in words):
+            group = [m for m in matches if m.coverage == 1.0]
+            if len(group) > 1:
+                return group, matches[:5]
+
+        if len(matches) > 1:
+            # An exact name match wins even when similar names are close behind
+            exact = matches[0].score >= 1.0 > matches[1].score
+            if not exact and matches[0].score - matches[1].score < self.margin:
+                return [], matches[:5]
+        return [matches[0]], matches[:5]
+
+    # --- Index maintenance ---------------------------------------------------
+
+    def _current(self) -> tuple[int, int]:
+        return self.mirror.snapshots, self.mirror.registries
+
+    def _sync(self):
+        if self._generation != self._current():
+            self._rebuild()
+
+    def _rebuild(self):
+        self._entries = {}
+        self._by_token = {}
+        self._token_grams = {}
+        self._area_tokens = set()
+        for area_id, area_name in self.mirror.areas.items():
+            for name in [area_name, *self.mirror.area_aliases.get(area_id, [])]:
+                self._area_tokens.update(normalize(name))
+        for state in self.mirror.list_entities():
+            self._add(state["entity_id"], state)
+        self._generation = self._current()
+
+    def _add(self, entity_id: str, state: dict):
+        domain, _, object_id = entity_id.partition(".")
+        name = state.get("attributes", {}).get("friendly_name") or object_id
+        area = self.mirror.area_of(entity_id)
+        variants = [name, object_id, *self.mirror.aliases.get(entity_id, [])]
+        if area:
+            variants += [f"{area} {v}" for v in variants[:1]]
+
+        tokens = set(normalize(area))
+        labels = []
+        for variant in variants:
+            words = normalize(variant)
+            tokens.update(words)
+            labels.append(trigrams(" ".join(words)))
+        tokens.add(domain)
+
+        self._remove(entity_id)
+        entry = _Entry(entity_id, domain, name, area, frozenset(tokens), tuple(labels))
+        self._entries[entity_id] = entry
+        for token in entry.tokens:
+            self._by_token.setdefault(token, set()).add(entity_id)
+            if token not in self._token_grams:
+                self._token_grams[token] = trigrams(token)
+
+    def _remove(self, entity_id: str):
+        entry = self._entries.pop(entity_id, None)
+        if entry is None:
+            return
+        for token in entry.tokens:
+            ids = self._by_token.get(token)
+            if ids is not None:
+                ids.discard(entity_id)
+
+    def _on_state_changed(self, entity_id: str, old: dict | None, new: dict | None):
+        if self._generation != self._current():
+            return  # a full rebuild is pending anyway
+        if new is None:
+            self._remove(entity_id)
+            return
+        old_name = (old or {}).get("attributes", {}).get("friendly_name")
+        if old is None or new.get("attributes", {}).get("friendly_name") != old_name:
+            self._add(entity_id, new)
+
+    def _fuzzy_tokens(self, word: str) -> set[str]:
+        """Indexed tokens equal or close to word (typos, transcription slips)."""
+        if word in self._by_token:
+            return {word}
+        if len(word) < 4:
+            return set()
+        grams = trigrams(word)
+        return {
+            token
+            for token, token_grams in self._token_grams.items()
+            if abs(len(token) - len(word)) <= 2 and _jaccard(grams, token_grams) >= 0.45
+        }
+
+
+@lru_cache
+def get_entity_resolver() -> EntityResolver:
+    """Return the app-wide resolver over the state mirror."""
+    return EntityResolver(get_state_mirror())
@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+from collections.abc import Callable
+from functools import lru_cache
+
+from malone.config.settings import get_settings
+from malone.homeassistant.client import HomeAssistantError
+
+# Called with (entity_id, old_state, new_state) after each change is applied
+StateListener = Callable[[str, dict | None, dict | None], None]
+
+# Events after which areas, device areas and aliases are reloaded
+_REGISTRY_EVENTS = ("area_registry_updated", "device_registry_updated", "entity_registry_updated")
+
+
+class _AuthInvalid(HomeAssistantError):
+    """The token was rejected; reconnecting won't help."""
+
+
+def _normalize_area(name: str) -> str:
+    return " ".join(name.lower().replace("_", " ").split())
+
+
+class StateMirror:
+    """In-memory mirror of Home Assistant entity states.
+
+    Loads a snapshot over the WebSocket API, then applies state_changed
+    events as they arrive. Entities are indexed by entity_id, domain and
+    area so list and state queries are answered without touching HA;
+    registry updates (areas renamed, entities moved) rebuild the area
+    index. On disconnect it reconnects with backoff and resyncs from a
+    fresh snapshot; a rejected token stops it. Requires the websockets
+    package.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        token: str,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+    ):
+        base = url.rstrip("/")
+        if base.startswith("https://"):
+            self.ws_url = "wss://" + base[len("https://"):] + "/api/websocket"
+        else:
+            self.ws_url = "ws://" + base.removeprefix("http://") + "/api/websocket"
+        self.token = token
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+
+        self.ready = asyncio.Event()
+        self.version = 0  # bumped on every applied change or resync
+        self.snapshots = 0  # bumped on every full resync
+        self.registries = 0  # bumped whenever areas, area assignments or aliases change
+        self.areas: dict[str, str] = {}  # area_id -> area name
+        self.area_aliases: dict[str, list[str]] = {}  # area_id -> aliases
+        self.aliases: dict[str, list[str]] = {}  # entity_id -> voice aliases
+        self._states: dict[str, dict] = {}
+        self._by_domain: dict[str, set[str]] = {}
+        self._by_area: dict[str, set[str]] = {}
+        self._entity_area: dict[str, str] = {}  # entity_id -> area_id
+        self._listeners: list[StateListener] = []
+
+        self._task: asyncio.Task | None = None
+        self._ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future] = {}
+        self._states_request: int | None = None
+        self._synced = False
+        self._backlog: list[dict] = []  # events received after the snapshot
+        self._registry_changed = asyncio.Event()
+
+    # --- Queries -------------------------------------------------------------
+
+    @property
+    def synced(self) -> bool:
+        """True while connected and up to date with HA."""
+        return self._synced
+
+    def get(self, entity_id: str) -> dict | None:
+        return self._states.get(entity_id)
+
+    def area_of(self, entity_id: str) -> str:
+        """Return the area name of an entity, or an empty string."""
+        return self.areas.get(self._entity_area.get(entity_id, ""), "")
+
+    def find_area(self, name: str) -> str | None:
+        """Return the area_id matching an area name, alias or id."""
+        wanted = _normalize_area(name)
+        for area_id, area_name in self.areas.items():
+            names = [area_name, area_id, *self.area_aliases.get(area_id, [])]
+            if any(wanted == _normalize_area(n) for n in names):
+                return area_id
+        return None
+
+    def list_entities(self, domain: str = "", area: str = "") -> list[dict]:
+        """Return states filtered by domain and/or area name."""
+        if area:
+            area_id = self.find_area(area)
+            if area_id is None:
+                return []
+            ids = self._by_area.get(area_id, set())
+            if domain:
+                ids = ids & self._by_domain.get(domain, set())
+        elif domain:
+            ids = self._by_domain.get(domain, set())
+        else:
+            ids = self._states.keys()
+        return [self._states[entity_id] for entity_id in sorted(ids)]
+
+    def add_listener(self, listener: StateListener):
+        self._listeners.append(listener)
+
+    # --- Lifecycle -----------------------------------------------------------
+
+    def start(self):
+        if not self.token:
+            print("  [Home Assistant: no token, not mirroring states]")
+            return
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="ha-state-mirror")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        import websockets
+
+        delay = self.reconnect_delay
+        while True:
+            try:
+                async with websockets.connect(self.ws_url, max_size=None) as ws:
+                    delay = self.reconnect_delay
+                    await self._session(ws)
+            except asyncio.CancelledError:
+                raise
+            except _AuthInvalid as e:
+                print(f"  [Home Assistant: {e}; state mirroring stopped]")
+                return
+            except Exception as e:
+                print(f"  [Home Assistant: state stream lost ({e}), reconnecting]")
+            finally:
+                self._synced = False
+                self.ready.clear()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def _session(self, ws):
+        msg = json.loads(await ws.recv())
+        if msg.get("type") != "auth_required":
+            raise HomeAssistantError(f"Unexpected greeting: {msg.get('type')}")
+        await ws.send(json.dumps({"type": "auth", "access_token": self.token}))
+        msg = json.loads(await ws.recv())
+        if msg.get("type") == "auth_invalid":
+            raise _AuthInvalid(f"token rejected ({msg.get('message', 'auth_invalid')})")
+        if msg.get("type") != "auth_ok":
+            raise HomeAssistantError("WebSocket authentication failed")
+
+        reader = asyncio.create_task(self._read(ws))
+        try:
+            # Subscribe before the snapshot so no change is missed in between
+            for event_type in ("state_changed", *_REGISTRY_EVENTS):
+                await self._command(ws, {"type": "subscribe_events", "event_type": event_type})
+            self._registry_changed.clear()
+            registries = await self._get_registries(ws)
+            states = await self._command(ws, {"type": "get_states"}, snapshot=True)
+            self._load(states, *registries)
+            # Events that arrived after the snapshot was taken
+            for event in self._backlog:
+                self._apply_event(event)
+            self._backlog.clear()
+            self._synced = True
+            self.ready.set()
+            print(f"  [Home Assistant: mirroring {len(self._states)} entities]")
+            while not reader.done():
+                changed = asyncio.create_task(self._registry_changed.wait())
+                await asyncio.wait({reader, changed}, return_when=asyncio.FIRST_COMPLETED)
+                changed.cancel()
+                if self._registry_changed.is_set() and not reader.done():
+                    await asyncio.sleep(0.5)  # edits come in bursts
+                    self._registry_changed.clear()
+                    self._load_registries(*await self._get_registries(ws))
+            await reader
+        finally:
+            reader.cancel()
+
+    async def _get_registries(self, ws) -> tuple[list, list, list, dict[str, list[str]]]:
+        areas, devices, entities = await asyncio.gather(
+            self._command(ws, {"type": "config/area_registry/list"}),
+            self._command(ws, {"type": "config/device_registry/list"}),
+            self._command(ws, {"type": "config/entity_registry/list"}),
+        )
+        aliases = await self._get_aliases(ws, entities)
+        return areas, devices, entities, aliases
+
+    async def _command(self, ws, payload: dict, snapshot: bool = False):
+        msg_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[msg_id] = future
+        if snapshot:
+            self._states_request = msg_id
+        await ws.send(json.dumps({"id": msg_id, **payload}))
+        return await future
+
+    async def _get_aliases(self, ws, entities: list) -> dict[str, list[str]]:
+        """Fetch voice assistant aliases (only in the extended registry entries)."""
+        entity_ids = [e["entity_id"] for e in entities or []]
+        if not entity_ids:
+            return {}
+        try:
+            entries = await self._command(
+                ws, {"type": "config/entity_registry/get_entries", "entity_ids": entity_ids}
+            )
+        except HomeAssistantError:
+            return {}  # older HA without get_entries
+        return {
+            entity_id: list(entry.get("aliases") or [])
+            for entity_id, entry in (entries or {}).items()
+            if entry and entry.get("aliases")
+        }
+
+    async def _read(self, ws):
+        try:
+            async for raw in ws:
+                self._dispatch(json.loads(raw))
+        finally:
+            # Unblock commands still waiting on this connection
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("WebSocket closed"))
+            self._pending.clear()
+
+    def _dispatch(self, msg: dict):
+        if msg.get("type") == "event":
+            event = msg["event"]
+            if event.get("event_type") in _REGISTRY_EVENTS:
+                self._registry_changed.set()
+                return
+            if event.get("event_type") != "state_changed":
+                return
+            if self._synced:
+                self._apply_event(event)
+            else:
+                self._backlog.append(event)
+        elif msg.get("type") == "result":
+            if msg["id"] == self._states_request:
+                # Anything buffered so far is older than the snapshot
+                self._backlog.clear()
+            future = self._pending.pop(msg["id"], None)
+            if future is None or future.done():
+                return
+            if msg.get("success"):
+                future.set_result(msg.get("result"))
+            else:
+                future.set_exception(HomeAssistantError(str(msg.get("error"))))
+
+    # --- Index maintenance ---------------------------------------------------
+
+    def _load(
+        self,
+        states: list[dict],
+        areas: list,
+        devices: list,
+        entities: list,
+        aliases: dict[str, list[str]],
+    ):
+        self._set_registries(areas, devices, entities, aliases)
+        self._states = {}
+        self._by_domain = {}
+        self._by_area = {}
+        for state in states:
+            self._index(state["entity_id"], state)
+        self.version += 1
+        self.snapshots += 1
+        self.registries += 1
+
+    def _load_registries(
+        self, areas: list, devices: list, entities: list, aliases: dict[str, list[str]]
+    ):
+        """Apply updated registries to the existing states."""
+        self._set_registries(areas, devices, entities, aliases)
+        self._by_area = {}
+        for entity_id, area_id in self._entity_area.items():
+            if entity_id in self._states:
+                self._by_area.setdefault(area_id, set()).add(entity_id)
+        self.version += 1
+        self.registries += 1
+
+    def _set_registries(
+        self, areas: list, devices: list, entities: list, aliases: dict[str, list[str]]
+    ):
+        self.areas = {a["area_id"]: a["name"] for a in areas or []}
+        self.area_aliases = {a["area_id"]: list(a.get("aliases") or []) for a in areas or []}
+        self.aliases = aliases
+        device_area = {d["id"]: d.get("area_id") for d in devices or []}
+        self._entity_area = {}
+        for entry in entities or []:
+            area_id = entry.get("area_id") or device_area.get(entry.get("device_id"))
+            if area_id:
+                self._entity_area[entry["entity_id"]] = area_id
+
+    def _index(self, entity_id: str, state: dict):
+        self._states[entity_id] = state
+        self._by_domain.setdefault(entity_id.split(".")[0], set()).add(entity_id)
+        area_id = self._entity_area.get(entity_id)
+        if area_id:
+            self._by_area.setdefault(area_id, set()).add(entity_id)
+
+    def _apply_event(self, event: dict):
+        data = event.get("data", {})
+        entity_id = data.get("entity_id")
+        if not entity_id:
+            return
+        old = self._states.get(entity_id)
+        new = data.get("new_state")
+        if new is None:
+            self._states.pop(entity_id, None)
+            self._by_domain.get(entity_id.split(".")[0], set()).discard(entity_id)
+            area_id = self._entity_area.get(entity_id)
+            if area_id:
+                self._by_area.get(area_id, set()).discard(entity_id)
+        else:
+            self._index(entity_id, new)
+        self.version += 1
+
+        for listener in self._listeners:
+            try:
+                listener(entity_id, old, new)
+            except Exception as e:
+                print(f"  [Home Assistant: state listener failed: {e}]")
+
+
+@lru_cache
+def get_state_mirror() -> StateMirror:
+    """Return the app-wide Home Assistant state mirror (not started)."""
+    config = get_settings().home_assistant
+    return StateMirror(config.url, config.token.get_secret_value())
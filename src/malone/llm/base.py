@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from dataclasses import dataclass, field
 
 
@@ -15,11 +16,45 @@ class ToolCall:
 class LLMResponse:
     content: str = ""
     tool_calls: list[ToolCall] = field(default_factory=list)
+    backend: str = ""  # set by LLMRouter: "local" or "cloud"
+    fallback: bool = False  # set by LLMRouter when the preferred backend failed
+    latency: float = 0.0  # seconds spent in the API call
+    first_token: float = 0.0  # seconds until the first streamed token (0 if not streamed)
+    usage: dict = field(default_factory=dict)  # token counts reported by the API
+
+
+class ContextMessage(dict):
+    """A user-role message of supporting context, e.g. recalled memories.
+
+    It is not part of the conversation: it comes after the history, is
+    left out of prompt caching and is not taken for the user's request.
+    """
+
+
+# Called with each tool call as soon as its arguments are complete,
+# while the rest of the response may still be streaming
+ToolCallCallback = Callable[[ToolCall], None]
 
 
 class LLMClient(ABC):
+    # Tokens of history (system prompt included) to send; None = everything
+    context_budget: int | None = None
+    # Send every tool each round instead of the per-turn selection
+    all_tools: bool = False
+
     @abstractmethod
     async def chat(
-        self, messages: list[dict], tools: list[dict] | None = None
+        self,
+        messages: list[dict],
+        tools: list[dict] | None = None,
+        on_tool_call: ToolCallCallback | None = None,
     ) -> LLMResponse:
         ...
+
+    def budget_for(self, text: str) -> int | None:
+        """History token budget for a turn that starts with this user text."""
+        return self.context_budget
+
+    def wants_all_tools(self, text: str) -> bool:
+        """Whether a turn that starts with this user text gets every tool."""
+        return self.all_tools
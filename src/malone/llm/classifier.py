@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import re
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens used for hashed features."""
+    return _WORD_RE.findall(text.lower())
+
+
+def hash_features(text: str, n_features: int) -> np.ndarray:
+    """Map text to unique hashed feature indices (unigrams, bigrams, length)."""
+    words = tokenize(text)
+    grams = list(words)
+    grams.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+    # Coarse length buckets let the model learn "long requests are hard"
+    grams.append(f"__len{min(len(words) // 8, 8)}")
+    if "?" in text:
+        grams.append("__question")
+    indices = {zlib.crc32(g.encode()) % n_features for g in grams}
+    return np.fromiter(indices, dtype=np.int64, count=len(indices))
+
+
+class ComplexityClassifier:
+    """Hashed n-gram logistic regression predicting if a query needs the cloud LLM.
+
+    Inference is a handful of hash lookups and a sum over the weight vector,
+    so it runs in well under a millisecond per utterance.
+    """
+
+    def __init__(self, n_features: int = 2**16):
+        self.n_features = n_features
+        self.weights = np.zeros(n_features, dtype=np.float32)
+        self.bias = 0.0
+
+    def predict_proba(self, text: str) -> float:
+        """Probability that the query is complex."""
+        idx = hash_features(text, self.n_features)
+        z = self.bias + float(self.weights[idx].sum())
+        return 1.0 / (1.0 + np.exp(-z))
+
+    def fit(
+        self,
+        texts: list[str],
+        labels: list[int],
+        epochs: int = 300,
+        lr: float = 0.5,
+        l2: float = 1e-4,
+    ):
+        """Train with full-batch gradient descent over sparse hashed features."""
+        if not texts:
+            raise ValueError("No training examples")
+
+        rows = [hash_features(t, self.n_features) for t in texts]
+        flat_idx = np.concatenate(rows)
+        row_ids = np.repeat(np.arange(len(rows)), [len(r) for r in rows])
+        y = np.asarray(labels, dtype=np.float64)
+
+        # Balance classes so a mostly-simple log doesn't collapse to "local"
+        pos = max(y.sum(), 1.0)
+        neg = max(len(y) - y.sum(), 1.0)
+        sample_weight = np.where(y == 1, len(y) / (2 * pos), len(y) / (2 * neg))
+
+        w = np.zeros(self.n_features, dtype=np.float64)
+        b = 0.0
+        n = len(rows)
+        for _ in range(epochs):
+            z = np.bincount(row_ids, weights=w[flat_idx], minlength=n) + b
+            p = 1.0 / (1.0 + np.exp(-z))
+            err = (p - y) * sample_weight
+            grad_w = np.bincount(
+                flat_idx, weights=err[row_ids], minlength=self.n_features
+            ) / n
+            w -= lr * (grad_w + l2 * w)
+            b -= lr * err.mean()
+
+        self.weights = w.astype(np.float32)
+        self.bias = float(b)
+
+    def save(self, path: str | Path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez(f, weights=self.weights, bias=np.float64(self.bias))
+
+    @classmethod
+    def load(cls, path: str | Path) -> ComplexityClassifier:
+        with np.load(path) as data:
+            weights = data["weights"].astype(np.float32)
+            clf = cls(n_features=len(weights))
+            clf.weights = weights
+            clf.bias = float(data["bias"])
+        return clf
@@ -1,33 +1,81 @@
 from __future__ import annotations
 
 import json
+import time
 
 from anthropic import AsyncAnthropic
 
-from malone.llm.base import LLMClient, LLMResponse, ToolCall
+from malone.llm.base import (
+    ContextMessage,
+    LLMClient,
+    LLMResponse,
+    ToolCall,
+    ToolCallCallback,
+)
+
+_EPHEMERAL = {"type": "ephemeral"}
 
 
 class ClaudeClient(LLMClient):
-    """Client for Anthropic Claude API."""
+    """Client for Anthropic Claude API.
+
+    Uses prompt caching: breakpoints are placed on the system prompt, the
+    tool definitions and the end of the history, so each round only pays
+    full price for the newest messages. Context messages (recalled
+    memories) change every turn, so they go after the last breakpoint.
+    Converted messages are cached per source message so only new history
+    entries are converted.
+
+    When on_tool_call is given the response is streamed and each tool_use
+    block is emitted as soon as it closes.
+    """
+
+    # Tools come first in the cached prefix: a per-turn selection would
+    # miss the cache for the system prompt and history on every change
+    all_tools = True
 
     def __init__(self, config):
         self.model = config.model
+        self.context_budget = config.context_budget
         self.max_tokens = config.max_tokens
         self.client = AsyncAnthropic(
             api_key=config.api_key.get_secret_value(),
         )
+        # id(source message) -> (source message, converted message).
+        # Holding the source keeps its id from being reused while cached.
+        self._converted: dict[int, tuple[dict, dict]] = {}
+        self._system_src: str | None = None
+        self._system: list[dict] = []
+        self._tools_src: list[dict] | None = None
+        self._tools: list[dict] = []
 
     async def chat(
-        self, messages: list[dict], tools: list[dict] | None = None
+        self,
+        messages: list[dict],
+        tools: list[dict] | None = None,
+        on_tool_call: ToolCallCallback | None = None,
     ) -> LLMResponse:
         # Separate system message from conversation messages
         system_prompt = ""
         conversation = []
+        converted: dict[int, tuple[dict, dict]] = {}
+        history = 0  # messages before the trailing context messages
         for msg in messages:
             if msg["role"] == "system":
                 system_prompt = msg["content"]
-            else:
-                conversation.append(self._convert_message(msg))
+                continue
+            cached = self._converted.get(id(msg))
+            if cached is None or cached[0] is not msg:
+                cached = (msg, self._convert_message(msg))
+            converted[id(msg)] = cached
+            conversation.append(cached[1])
+            if not isinstance(msg, ContextMessage):
+                history = len(conversation)
+        self._converted = converted
+
+        if history:
+            # Cache everything up to and including the latest history message
+            conversation[history - 1] = self._with_cache_breakpoint(conversation[history - 1])
 
         kwargs: dict = {
             "model": self.model,
@@ -35,11 +83,29 @@ class ClaudeClient(LLMClient):
             "messages": conversation,
         }
         if system_prompt:
-            kwargs["system"] = system_prompt
+            kwargs["system"] = self._get_system(system_prompt)
         if tools:
-            kwargs["tools"] = [self._convert_tool(t) for t in tools]
-
-        response = await self.client.messages.create(**kwargs)
+            kwargs["tools"] = self._get_tools(tools)
+
+        start = time.monotonic()
+        first_token = 0.0
+        if on_tool_call is None:
+            response = await self.client.messages.create(**kwargs)
+        else:
+            async with self.client.messages.stream(**kwargs) as stream:
+                async for event in stream:
+                    if not first_token and event.type == "content_block_start":
+                        first_token = time.monotonic() - start
+                    if (
+                        event.type == "content_block_stop"
+                        and event.content_block.type == "tool_use"
+                    ):
+                        block = event.content_block
+                        on_tool_call(
+                            ToolCall(id=block.id, name=block.name, arguments=block.input)
+                        )
+                response = await stream.get_final_message()
+        latency = time.monotonic() - start
 
         # Parse response content and tool calls
         content = ""
@@ -57,7 +123,66 @@ class ClaudeClient(LLMClient):
                     )
                 )
 
-        return LLMResponse(content=content, tool_calls=tool_calls)
+        usage = {
+            "input_tokens": response.usage.input_tokens,
+            "output_tokens": response.usage.output_tokens,
+            "cache_read_tokens": response.usage.cache_read_input_tokens or 0,
+            "cache_write_tokens": response.usage.cache_creation_input_tokens or 0,
+        }
+        first = f", first token {first_token * 1000:.0f}ms" if first_token else ""
+        print(
+            f"  [Claude: {latency * 1000:.0f}ms{first}, in={usage['input_tokens']} "
+            f"out={usage['output_tokens']} cache_read={usage['cache_read_tokens']} "
+            f"cache_write={usage['cache_write_tokens']}]"
+        )
+
+        return LLMResponse(
+            content=content,
+            tool_calls=tool_calls,
+            latency=latency,
+            first_token=first_token,
+            usage=usage,
+        )
+
+    def _get_system(self, system_prompt: str) -> list[dict]:
+        """Return the system prompt as a cached text block."""
+        if system_prompt != self._system_src:
+            self._system_src = system_prompt
+            self._system = [
+                {"type": "text", "text": system_prompt, "cache_control": _EPHEMERAL}
+            ]
+        return self._system
+
+    def _get_tools(self, tools: list[dict]) -> list[dict]:
+        """Return converted tool schemas, reconverting only when they change."""
+        src = self._tools_src
+        key = getattr(tools, "key", None)
+        unchanged = tools is src or (key is not None and key == getattr(src, "key", None))
+        if not unchanged and tools != src:
+            anthropic = getattr(tools, "anthropic", None)  # registry ToolSchemas
+            if anthropic is not None:
+                converted = list(anthropic)
+            else:
+                converted = [self._convert_tool(t) for t in tools]
+            converted[-1] = {**converted[-1], "cache_control": _EPHEMERAL}
+            self._tools_src = tools
+            self._tools = converted
+        return self._tools
+
+    @staticmethod
+    def _with_cache_breakpoint(msg: dict) -> dict:
+        """Copy a converted message with cache_control on its last block."""
+        content = msg["content"]
+        if isinstance(content, str):
+            if not content:
+                return msg
+            blocks = [{"type": "text", "text": content}]
+        else:
+            if not content:
+                return msg
+            blocks = list(content)
+        blocks[-1] = {**blocks[-1], "cache_control": _EPHEMERAL}
+        return {"role": msg["role"], "content": blocks}
 
     def _convert_message(self, msg: dict) -> dict:
         """Convert OpenAI-format message to Anthropic format."""
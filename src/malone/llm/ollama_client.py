@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 import json
+import time
 
 from openai import AsyncOpenAI
 
-from malone.llm.base import LLMClient, LLMResponse, ToolCall
+from malone.llm.base import LLMClient, LLMResponse, ToolCall, ToolCallCallback
 
 
 class OllamaClient(LLMClient):
@@ -12,6 +13,7 @@ class OllamaClient(LLMClient):
 
     def __init__(self, config):
         self.model = config.model
+        self.context_budget = config.context_budget
         self.timeout = config.timeout
         self.client = AsyncOpenAI(
             base_url=config.base_url,
@@ -20,16 +22,24 @@ class OllamaClient(LLMClient):
         )
 
     async def chat(
-        self, messages: list[dict], tools: list[dict] | None = None
+        self,
+        messages: list[dict],
+        tools: list[dict] | None = None,
+        on_tool_call: ToolCallCallback | None = None,
     ) -> LLMResponse:
         kwargs: dict = {
             "model": self.model,
             "messages": messages,
         }
         if tools:
-            kwargs["tools"] = tools
+            kwargs["tools"] = list(tools)  # registry schema sets are tuples
 
+        if on_tool_call is not None:
+            return await self._chat_stream(kwargs, on_tool_call)
+
+        start = time.monotonic()
         response = await self.client.chat.completions.create(**kwargs)
+        latency = time.monotonic() - start
         choice = response.choices[0]
         message = choice.message
 
@@ -43,7 +53,99 @@ class OllamaClient(LLMClient):
                     ToolCall(id=tc.id, name=tc.function.name, arguments=args)
                 )
 
+        usage = self._usage(response.usage)
+        self._report(latency, 0.0, usage)
         return LLMResponse(
             content=message.content or "",
             tool_calls=tool_calls,
+            latency=latency,
+            usage=usage,
+        )
+
+    async def _chat_stream(
+        self, kwargs: dict, on_tool_call: ToolCallCallback
+    ) -> LLMResponse:
+        """Stream the completion, emitting tool calls once their JSON parses."""
+        content = ""
+        # Tool call fragments by stream index: id, name, raw args, parsed call
+        partial: dict[int, dict] = {}
+        usage: dict = {}
+        first_token = 0.0
+
+        start = time.monotonic()
+        stream = await self.client.chat.completions.create(
+            **kwargs, stream=True, stream_options={"include_usage": True}
+        )
+        async for chunk in stream:
+            if chunk.usage is not None:
+                usage = self._usage(chunk.usage)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if not first_token and (delta.content or delta.tool_calls):
+                first_token = time.monotonic() - start
+            if delta.content:
+                content += delta.content
+            for tc in delta.tool_calls or []:
+                entry = partial.setdefault(
+                    tc.index, {"id": "", "name": "", "args": "", "call": None}
+                )
+                if entry["call"] is not None:
+                    continue
+                if tc.id:
+                    entry["id"] = tc.id
+                if tc.function and tc.function.name:
+                    entry["name"] += tc.function.name
+                if tc.function and tc.function.arguments:
+                    entry["args"] += tc.function.arguments
+                # A JSON object is complete as soon as it parses
+                try:
+                    args = json.loads(entry["args"])
+                except json.JSONDecodeError:
+                    continue
+                entry["call"] = ToolCall(
+                    id=entry["id"] or f"call_{tc.index}",
+                    name=entry["name"],
+                    arguments=args,
+                )
+                on_tool_call(entry["call"])
+
+        tool_calls = []
+        for index in sorted(partial):
+            entry = partial[index]
+            if entry["call"] is None:
+                # Never parsed mid-stream (e.g. empty arguments)
+                entry["call"] = ToolCall(
+                    id=entry["id"] or f"call_{index}",
+                    name=entry["name"],
+                    arguments=json.loads(entry["args"] or "{}"),
+                )
+                on_tool_call(entry["call"])
+            tool_calls.append(entry["call"])
+
+        latency = time.monotonic() - start
+        self._report(latency, first_token, usage)
+        return LLMResponse(
+            content=content,
+            tool_calls=tool_calls,
+            latency=latency,
+            first_token=first_token,
+            usage=usage,
+        )
+
+    @staticmethod
+    def _usage(usage) -> dict:
+        if usage is None:
+            return {}
+        return {
+            "input_tokens": usage.prompt_tokens or 0,
+            "output_tokens": usage.completion_tokens or 0,
+        }
+
+    @staticmethod
+    def _report(latency: float, first_token: float, usage: dict):
+        first = f", first token {first_token * 1000:.0f}ms" if first_token else ""
+        print(
+            f"  [Ollama: {latency * 1000:.0f}ms{first}, "
+            f"in={usage.get('input_tokens', '?')} out={usage.get('output_tokens', '?')}]"
         )
@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from malone.llm.classifier import ComplexityClassifier
+
+# Keywords that suggest a complex query needing Claude
+_COMPLEX_KEYWORDS = [
+    "analyze", "explain", "refactor", "debug", "review",
+    "write code", "implement", "architecture", "design",
+    "compare", "summarize", "translate", "improve yourself",
+    "edit your code", "add a feature", "complex",
+]
+
+
+class RoutingPolicy(ABC):
+    """Decides whether a user query should go to the cloud LLM."""
+
+    @abstractmethod
+    def should_use_cloud(self, text: str) -> bool:
+        ...
+
+
+class KeywordPolicy(RoutingPolicy):
+    """Routes long queries and queries containing complexity keywords to the cloud."""
+
+    def __init__(self, complexity_threshold: int = 500):
+        self.complexity_threshold = complexity_threshold
+
+    def should_use_cloud(self, text: str) -> bool:
+        # Long messages suggest complexity
+        if len(text) > self.complexity_threshold:
+            return True
+
+        # Check for complexity keywords
+        lower = text.lower()
+        for keyword in _COMPLEX_KEYWORDS:
+            if keyword in lower:
+                return True
+
+        return False
+
+
+class ClassifierPolicy(RoutingPolicy):
+    """Routes using a learned complexity classifier."""
+
+    def __init__(self, classifier: ComplexityClassifier, threshold: float = 0.5):
+        self.classifier = classifier
+        self.threshold = threshold
+
+    def should_use_cloud(self, text: str) -> bool:
+        return self.classifier.predict_proba(text) >= self.threshold
+
+
+def build_policy(config) -> RoutingPolicy:
+    """Create the routing policy described by RouterSettings."""
+    keyword = KeywordPolicy(complexity_threshold=config.complexity_threshold)
+    if config.policy == "keyword":
+        return keyword
+    if config.policy == "classifier":
+        if not Path(config.model_path).exists():
+            print(f"  [Router: no model at {config.model_path}, using keywords]")
+            return keyword
+        classifier = ComplexityClassifier.load(config.model_path)
+        return ClassifierPolicy(classifier, threshold=config.cloud_threshold)
+    raise ValueError(f"Unknown routing policy '{config.policy}'")
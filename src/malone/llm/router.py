@@ -1,15 +1,13 @@
 from __future__ import annotations
 
-from malone.llm.base import LLMClient, LLMResponse
-
-
-# Keywords that suggest a complex query needing Claude
-_COMPLEX_KEYWORDS = [
-    "analyze", "explain", "refactor", "debug", "review",
-    "write code", "implement", "architecture", "design",
-    "compare", "summarize", "translate", "improve yourself",
-    "edit your code", "add a feature", "complex",
-]
+from malone.llm.base import (
+    ContextMessage,
+    LLMClient,
+    LLMResponse,
+    ToolCall,
+    ToolCallCallback,
+)
+from malone.llm.policy import KeywordPolicy, RoutingPolicy
 
 
 class LLMRouter(LLMClient):
@@ -17,61 +15,99 @@ class LLMRouter(LLMClient):
 
     Simple/short queries go to Ollama (fast, free, local).
     Complex/long queries go to Claude (smart, tool-savvy, cloud).
-    Falls back to the other if one fails.
+    The split is decided by a pluggable RoutingPolicy.
+    Falls back to the other if one fails, unless tool calls were already
+    dispatched from a partial streamed response.
     """
 
     def __init__(
         self,
         local: LLMClient,
         cloud: LLMClient | None = None,
-        complexity_threshold: int = 500,
+        policy: RoutingPolicy | None = None,
     ):
         self.local = local
         self.cloud = cloud
-        self.complexity_threshold = complexity_threshold
+        self.policy = policy or KeywordPolicy()
 
     async def chat(
-        self, messages: list[dict], tools: list[dict] | None = None
+        self,
+        messages: list[dict],
+        tools: list[dict] | None = None,
+        on_tool_call: ToolCallCallback | None = None,
     ) -> LLMResponse:
         use_cloud = self.cloud is not None and self._should_use_cloud(messages)
 
+        emitted = 0
+        callback = None
+        if on_tool_call is not None:
+            def callback(tool_call: ToolCall):
+                nonlocal emitted
+                emitted += 1
+                on_tool_call(tool_call)
+
         if use_cloud:
             try:
                 print("  [Router: using Claude]")
-                return await self.cloud.chat(messages, tools=tools)
+                response = await self.cloud.chat(
+                    messages, tools=tools, on_tool_call=callback
+                )
+                response.backend = "cloud"
+                return response
             except Exception as e:
+                if emitted:
+                    raise
                 print(f"  [Router: Claude failed ({e}), falling back to Ollama]")
-                return await self.local.chat(messages, tools=tools)
+                response = await self.local.chat(
+                    messages, tools=tools, on_tool_call=callback
+                )
+                response.backend = "cloud"
+                response.fallback = True
+                return response
         else:
             try:
                 print("  [Router: using Ollama]")
-                return await self.local.chat(messages, tools=tools)
+                response = await self.local.chat(
+                    messages, tools=tools, on_tool_call=callback
+                )
+                response.backend = "local"
+                return response
             except Exception as e:
-                if self.cloud:
+                if self.cloud and not emitted:
                     print(f"  [Router: Ollama failed ({e}), falling back to Claude]")
-                    return await self.cloud.chat(messages, tools=tools)
+                    response = await self.cloud.chat(
+                        messages, tools=tools, on_tool_call=callback
+                    )
+                    response.backend = "local"
+                    response.fallback = True
+                    return response
                 raise
 
+    def budget_for(self, text: str) -> int | None:
+        """Budget of the backend this text will be routed to.
+
+        A fallback to the other backend is sent the same history.
+        """
+        if self.cloud is not None and text and self.policy.should_use_cloud(text):
+            return self.cloud.budget_for(text)
+        return self.local.budget_for(text)
+
+    def wants_all_tools(self, text: str) -> bool:
+        """The routed backend's choice; a fallback gets the same tools."""
+        if self.cloud is not None and text and self.policy.should_use_cloud(text):
+            return self.cloud.wants_all_tools(text)
+        return self.local.wants_all_tools(text)
+
     def _should_use_cloud(self, messages: list[dict]) -> bool:
         """Decide whether to route to cloud LLM."""
         # Get the last user message
         last_user = ""
         for msg in reversed(messages):
-            if msg["role"] == "user":
+            if msg["role"] == "user" and not isinstance(msg, ContextMessage):
                 last_user = msg.get("content", "")
                 break
 
         if not last_user:
             return False
 
-        # Long messages suggest complexity
-        if len(last_user) > self.complexity_threshold:
-            return True
-
-        # Check for complexity keywords
-        lower = last_user.lower()
-        for keyword in _COMPLEX_KEYWORDS:
-            if keyword in lower:
-                return True
-
-        return False
+        return self.policy.should_use_cloud(last_user)
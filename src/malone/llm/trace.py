@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import atexit
+import json
+import queue
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+
+@dataclass
+class TurnTrace:
+    """Outcome of one user turn, logged for training the routing classifier."""
+
+    text: str
+    backend: str  # "local" or "cloud" - where the router sent the first round
+    rounds: int
+    fallback: bool
+    latency: float  # seconds from user text to final reply
+    completed: bool  # False if the turn hit max_rounds
+    prompt_tokens: int = 0  # input tokens summed over all rounds
+    first_token: float = 0.0  # seconds to the first token of the first round
+    tools_sent: int = 0  # tool schemas sent in the first round
+
+
+_CLOSE = object()
+
+
+class TraceLogger:
+    """Appends turn traces to a JSONL file.
+
+    log() only queues the trace; a writer thread does the file I/O so the
+    event loop never waits on disk.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_loop, name="trace", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def log(self, trace: TurnTrace):
+        self._queue.put(json.dumps(asdict(trace)) + "\n")
+
+    def close(self):
+        """Write what is queued and stop the writer. Safe to call twice."""
+        if self._writer.is_alive():
+            self._queue.put(_CLOSE)
+            self._writer.join()
+
+    def _write_loop(self):
+        while True:
+            lines = [self._queue.get()]
+            while not self._queue.empty():
+                lines.append(self._queue.get())
+            closing = _CLOSE in lines
+            lines = [line for line in lines if line is not _CLOSE]
+            if lines:
+                try:
+                    self.path.parent.mkdir(parents=True, exist_ok=True)
+                    with open(self.path, "a") as f:
+                        f.writelines(lines)
+                except OSError as e:
+                    print(f"  [Trace: failed to write {self.path}: {e}]")
+            if closing:
+                return
+
+
+def load_traces(path: str | Path) -> list[TurnTrace]:
+    """Read traces from a JSONL file, skipping malformed lines."""
+    traces = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                traces.append(TurnTrace(**json.loads(line)))
+            except (json.JSONDecodeError, TypeError):
+                continue
+    return traces
+
+
+def label_trace(
+    trace: TurnTrace, hard_rounds: int = 3, slow_latency: float = 10.0
+) -> int | None:
+    """Label a turn 1 (needs cloud) or 0 (local is fine) from its outcome.
+
+    None for cloud turns that went fine: they say nothing about whether
+    local would have coped, and labelling them 0 would teach the router
+    to send exactly those queries to local.
+    """
+    if not trace.completed or trace.rounds >= hard_rounds:
+        return 1
+    if trace.backend == "local" and (trace.fallback or trace.latency >= slow_latency):
+        return 1
+    if trace.backend == "cloud":
+        return None
+    return 0
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+def kmeans(
+    vectors: np.ndarray, k: int, iterations: int = 10, seed: int = 0
+) -> np.ndarray:
+    """Spherical k-means on unit vectors; returns (k, dim) unit centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(vectors @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, vectors)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        empty = norms[:, 0] == 0
+        # Re-seed empty clusters with random points
+        sums[empty] = vectors[rng.choice(len(vectors), size=int(empty.sum()))]
+        norms[empty] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+    return centroids
+
+
+class IVFIndex:
+    """Inverted-file index over unit vectors.
+
+    Vectors are bucketed by their nearest k-means centroid; a query scans
+    only the buckets of its nprobe nearest centroids, which is a small
+    fraction of the data with most of the exact top-k.
+    """
+
+    def __init__(self, centroids: np.ndarray, assign: np.ndarray, nprobe: int = 8):
+        self.centroids = centroids
+        self.nprobe = nprobe
+        self.count = len(assign)  # vectors covered by the index
+        # Bucket members as one sorted id array plus per-bucket offsets
+        self._order = np.argsort(assign, kind="stable").astype(np.int64)
+        self._offsets = np.searchsorted(assign[self._order], np.arange(len(centroids) + 1))
+
+    @classmethod
+    def train(
+        cls, vectors: np.ndarray, nlist: int | None = None, nprobe: int = 8,
+        sample: int = 20000, chunk: int = 16384,
+    ) -> IVFIndex:
+        """Build an index over vectors (e.g. a memmap), training on a sample."""
+        n = len(vectors)
+        nlist = nlist or max(int(np.sqrt(n)), 1)
+        rng = np.random.default_rng(0)
+        picked = np.sort(rng.choice(n, size=min(sample, n), replace=False))
+        centroids = kmeans(np.asarray(vectors[picked], dtype=np.float32), min(nlist, len(picked)))
+        assign = np.empty(n, dtype=np.int32)
+        for start in range(0, n, chunk):
+            block = np.asarray(vectors[start:start + chunk])
+            assign[start:start + chunk] = np.argmax(block @ centroids.T, axis=1)
+        return cls(centroids, assign, nprobe=nprobe)
+
+    def candidates(self, query: np.ndarray) -> np.ndarray:
+        """Ids of the vectors in the buckets nearest to the query."""
+        nprobe = min(self.nprobe, len(self.centroids))
+        probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        return np.concatenate(
+            [self._order[self._offsets[c]:self._offsets[c + 1]] for c in probes]
+        )
+
+    def save(self, path: str):
+        np.savez(path, centroids=self.centroids, assign=self.assignments(), nprobe=self.nprobe)
+
+    def assignments(self) -> np.ndarray:
+        assign = np.empty(self.count, dtype=np.int32)
+        for c in range(len(self.centroids)):
+            assign[self._order[self._offsets[c]:self._offsets[c + 1]]] = c
+        return assign
+
+    @classmethod
+    def load(cls, path: str) -> IVFIndex:
+        data = np.load(path)
+        return cls(data["centroids"], data["assign"], nprobe=int(data["nprobe"]))
@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from malone.embedding import Embedder
+from malone.memory.ivf import IVFIndex
+
+# Stored text per memory; the embedding models read ~256 tokens at most
+_MAX_CHARS = 800
+
+# Rows copied at a time when compacting
+_COPY_ROWS = 65536
+
+
+@dataclass
+class Memory:
+    text: str
+    kind: str  # "turn" or "tool"
+    ts: float  # when it was stored
+    source: str  # user request of the turn it came from
+    score: float = 0.0
+
+    def render(self) -> str:
+        day = time.strftime("%Y-%m-%d", time.localtime(self.ts))
+        return f"- [{day}] {' '.join(self.text.split())}"
+
+
+def _clip(text: str, chars: int = _MAX_CHARS) -> str:
+    return text if len(text) <= chars else text[:chars] + " ..."
+
+
+class MemoryStore:
+    """Long-term memory of past turns and tool results.
+
+    Embeddings are appended to a float32 matrix on disk that is read
+    through a memory map, so the resident cost is only the pages a
+    search touches. Texts are appended to a JSONL file, located by an
+    offsets file. Up to index_min entries are searched exhaustively;
+    beyond that an IVF index narrows each search to a few buckets. It is
+    retrained in the background once the entries added since it was
+    built pass reindex_share of it (those are searched exhaustively).
+    compact() drops memories older than retain_days.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        embedder: Embedder,
+        embedder_name: str = "",
+        top_k: int = 4,
+        min_score: float = 0.35,
+        nprobe: int = 8,
+        index_min: int = 20000,
+        reindex_share: float = 0.1,
+        retain_days: float = 0.0,
+    ):
+        self.dir = Path(path)
+        self.embedder = embedder
+        self.dim = embedder.dim
+        self.top_k = top_k
+        self.min_score = min_score
+        self.nprobe = nprobe
+        self.index_min = index_min
+        self.reindex_share = reindex_share
+        self.retain_days = retain_days  # 0 = keep everything
+        self._vectors_path = self.dir / "vectors.f32"
+        self._offsets_path = self.dir / "offsets.i64"
+        self._entries_path = self.dir / "entries.jsonl"
+        self._index_path = self.dir / "ivf.npz"
+        self._compacting_path = self.dir / "compacting"
+        self._write_lock = threading.Lock()  # one add/reindex at a time
+        self._lock = threading.Lock()  # guards the snapshot below
+        self._vectors: np.ndarray | None = None
+        self._offsets: np.ndarray | None = None
+        self._index: IVFIndex | None = None
+        self._count = 0
+        self._open(embedder_name)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _open(self, embedder_name: str):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        meta_path = self.dir / "meta.json"
+        meta = {"dim": self.dim, "embedder": embedder_name}
+        try:
+            stored = json.loads(meta_path.read_text())
+        except (OSError, json.JSONDecodeError):
+            stored = None
+        if stored != meta:
+            if stored is not None:
+                print(f"  [Memory: embedder changed ({stored} -> {meta}), starting over]")
+            for path in (self._vectors_path, self._offsets_path, self._entries_path,
+                         self._index_path):
+                path.unlink(missing_ok=True)
+            meta_path.write_text(json.dumps(meta))
+        self._finish_compaction()
+
+        # A crash mid-append leaves the files at different lengths: keep
+        # the entries that are complete in both
+        rows = 0
+        if self._vectors_path.exists() and self._offsets_path.exists():
+            rows = min(
+                self._vectors_path.stat().st_size // (self.dim * 4),
+                self._offsets_path.stat().st_size // 8,
+            )
+        for path, row_size in ((self._vectors_path, self.dim * 4), (self._offsets_path, 8)):
+            with open(path, "ab") as f:
+                f.truncate(rows * row_size)
+        self._remap(rows)
+
+        if rows and self._index_path.exists():
+            try:
+                index = IVFIndex.load(str(self._index_path))
+                if index.count <= rows and index.centroids.shape[1] == self.dim:
+                    index.nprobe = self.nprobe
+                    self._index = index
+            except (OSError, ValueError, KeyError) as e:
+                print(f"  [Memory: ignoring index: {e}]")
+
+    def _remap(self, rows: int):
+        vectors = offsets = None
+        if rows:
+            vectors = np.memmap(self._vectors_path, np.float32, "r", shape=(rows, self.dim))
+            offsets = np.memmap(self._offsets_path, np.int64, "r", shape=(rows,))
+        with self._lock:
+            self._vectors, self._offsets, self._count = vectors, offsets, rows
+
+    def compact(self):
+        """Drop memories older than retain_days; blocks, so call it at startup."""
+        if not self.retain_days or not self._count:
+            return
+        cutoff = time.time() - self.retain_days * 86400
+        with self._write_lock:
+            vectors, offsets, count = self._vectors, self._offsets, self._count
+            # Memories are appended in time order: the old ones are a prefix
+            with open(self._entries_path, "rb") as f:
+
+                def stored_at(row: int) -> float:
+                    f.seek(int(offsets[row]))
+                    return json.loads(f.readline())["ts"]
+
+                keep = bisect.bisect_left(range(count), cutoff, key=stored_at)
+            if not keep:
+                return
+
+            # Write the kept rows next to the files, then swap them in;
+            # the marker lets _open() finish the swap after a crash
+            base = int(offsets[keep]) if keep < count else self._entries_path.stat().st_size
+            with open(self._entries_path, "rb") as src:
+                src.seek(base)
+                with open(self._new(self._entries_path), "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                    os.fsync(dst.fileno())
+            with open(self._new(self._offsets_path), "wb") as f:
+                f.write((np.asarray(offsets[keep:]) - base).astype(np.int64).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self._new(self._vectors_path), "wb") as f:
+                for row in range(keep, count, _COPY_ROWS):
+                    f.write(np.asarray(vectors[row:row + _COPY_ROWS]).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            self._compacting_path.touch()
+            self._finish_compaction()
+
+            with self._lock:
+                self._index = None
+            self._remap(count - keep)
+            print(f"  [Memory: dropped {keep} memories older than {self.retain_days:g} days]")
+            if self._needs_index():
+                self.reindex()
+
+    @staticmethod
+    def _new(path: Path) -> Path:
+        return path.with_name(path.name + ".new")
+
+    def _finish_compaction(self):
+        """Swap in the files a compaction wrote, or discard them if it never finished."""
+        paths = (self._vectors_path, self._offsets_path, self._entries_path)
+        if self._compacting_path.exists():
+            for path in paths:
+                if self._new(path).exists():
+                    os.replace(self._new(path), path)
+            # Row numbers changed
+            self._index_path.unlink(missing_ok=True)
+            self._compacting_path.unlink()
+        else:
+            for path in paths:
+                self._new(path).unlink(missing_ok=True)
+
+    def add(self, memories: list[Memory]):
+        """Embed and store memories; blocks, so call it off the event loop."""
+        if not memories:
+            return
+        vectors = self.embedder.embed([m.text for m in memories]).astype(np.float32)
+        with self._write_lock:
+            offsets = []
+            with open(self._entries_path, "ab") as f:
+                for m in memories:
+                    offsets.append(f.tell())
+                    line = {"text": m.text, "kind": m.kind, "ts": m.ts, "source": m.source}
+                    f.write(json.dumps(line).encode() + b"\n")
+            # Entries first and vectors last: a row counts once both exist
+            with open(self._offsets_path, "ab") as f:
+                f.write(np.asarray(offsets, dtype=np.int64).tobytes())
+            with open(self._vectors_path, "ab") as f:
+                f.write(vectors.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            self._remap(self._count + len(memories))
+            if self._needs_index():
+                self.reindex()
+
+    def _needs_index(self) -> bool:
+        if self._count < self.index_min:
+            return False
+        if self._index is None:
+            return True
+        return self._count - self._index.count > self._index.count * self.reindex_share
+
+    def reindex(self):
+        """Train the IVF index over everything stored so far."""
+        start = time.perf_counter()
+        vectors = self._vectors
+        index = IVFIndex.train(vectors, nprobe=self.nprobe)
+        index.save(str(self._index_path))
+        with self._lock:
+            self._index = index
+        print(
+            f"  [Memory: indexed {index.count} entries in "
+            f"{(time.perf_counter() - start) * 1000:.0f}ms]"
+        )
+
+    def search(self, query: str, k: int | None = None) -> list[Memory]:
+        """The top-k stored memories most similar to the query, best first."""
+        vector = self.embedder.embed([query])[0]
+        return self.search_vector(vector, k)
+
+    def search_vector(self, vector: np.ndarray, k: int | None = None) -> list[Memory]:
+        k = k or self.top_k
+        with self._lock:
+            vectors, offsets, count, index = self._vectors, self._offsets, self._count, self._index
+        if not count:
+            return []
+
+        if index is not None:
+            ids = np.concatenate([index.candidates(vector), np.arange(index.count, count)])
+            scores = vectors[ids] @ vector
+        else:
+            ids = None
+            scores = vectors @ vector
+        k = min(k, len(scores))
+        if not k:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        found = []
+        with open(self._entries_path, "rb") as f:
+            for i in top:
+                score = float(scores[i])
+                if score < self.min_score:
+                    break
+                f.seek(int(offsets[ids[i] if ids is not None else i]))
+                entry = json.loads(f.readline())
+                found.append(Memory(score=score, **entry))
+        return found
+
+    def remember_turn(self, messages: list[dict]):
+        """Store a finished turn (OpenAI-format messages) and its tool results."""
+        request = ""
+        reply = ""
+        calls: dict[str, str] = {}
+        results: list[tuple[str, str]] = []
+        for msg in messages:
+            if msg["role"] == "user" and not request:
+                request = msg.get("content") or ""
+            elif msg["role"] == "assistant":
+                for call in msg.get("tool_calls") or []:
+                    function = call["function"]
+                    calls[call["id"]] = f"{function['name']}({function['arguments']})"
+                if msg.get("content"):
+                    reply = msg["content"]
+            elif msg["role"] == "tool":
+                results.append((calls.get(msg["tool_call_id"], "tool"), msg.get("content") or ""))
+        if not request:
+            return
+
+        now = time.time()
+        memories = [Memory(_clip(f"User: {request}\nMalone: {reply}"), "turn", now, request)]
+        for call, result in results:
+            if result and not result.startswith("Error"):
+                memories.append(Memory(_clip(f"{call} -> {result}"), "tool", now, request))
+        self.add(memories)
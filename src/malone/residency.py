@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import asyncio
+import ctypes
+import gc
+import inspect
+import os
+import time
+from collections.abc import Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+
+from malone.config.settings import get_settings
+
+_PAGE_MB = os.sysconf("SC_PAGE_SIZE") / 2**20 if hasattr(os, "sysconf") else 4 / 1024
+
+
+def _statm_mb(pid: str) -> float:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_MB
+    except (OSError, IndexError, ValueError):
+        return 0.0
+
+
+def _children(pid: str) -> list[str]:
+    found = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                found.extend(f.read().split())
+    except OSError:
+        pass
+    return found
+
+
+def rss_mb(children: bool = True) -> float:
+    """Resident memory of this process, plus its child processes (e.g. Chromium).
+
+    Summed per process, so pages shared between children count more than
+    once; 0 where /proc is unavailable.
+    """
+    total, pending = 0.0, [str(os.getpid())]
+    while pending:
+        pid = pending.pop()
+        total += _statm_mb(pid)
+        if children:
+            pending.extend(_children(pid))
+    return total
+
+
+def _release_memory():
+    """Collect the unloaded objects and hand freed heap pages back to the OS."""
+    gc.collect()
+    try:
+        ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass  # not glibc
+
+
+@dataclass
+class Resident:
+    name: str
+    load: Callable | None  # None: the component reloads itself on next use
+    unload: Callable | None
+    size_mb: float  # estimate; re-measured on every reload
+    keep: bool = False  # never evicted
+    loaded: bool = True
+    last_used: float = field(default_factory=time.monotonic)
+    users: int = 0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+class ResidencyManager:
+    """Keeps heavy components (models, the browser) in memory only while useful.
+
+    Components register load and unload hooks (sync hooks run in a
+    thread) and an estimated size. Anything unused for idle_after
+    seconds is unloaded, and while the process RSS is over budget_mb the
+    least recently used idle components go first. prefetch() reloads
+    ahead of use, e.g. at speech onset; using() reloads on demand and
+    keeps a component resident while in use. RSS is sampled every
+    interval seconds to log_path as CSV.
+    """
+
+    def __init__(
+        self,
+        budget_mb: float = 0.0,
+        idle_after: float = 1800.0,
+        interval: float = 30.0,
+        grace: float = 60.0,
+        log_path: str | Path | None = None,
+    ):
+        self.budget_mb = budget_mb  # 0 = no budget
+        self.idle_after = idle_after  # 0 = only evict over budget
+        self.interval = interval
+        self.grace = grace  # recently used components are never evicted
+        self.log_path = Path(log_path) if log_path else None
+        self._residents: dict[str, Resident] = {}
+        self._prefetches: set[asyncio.Task] = set()
+        self.evictions = 0
+        self.reloads = 0
+        self.peak_mb = 0.0
+        self.low_mb = float("inf")
+
+    def register(
+        self,
+        name: str,
+        unload: Callable | None,
+        load: Callable | None = None,
+        size_mb: float = 0.0,
+        keep: bool = False,
+    ):
+        """Track a (loaded) component. Registering again marks it loaded and used."""
+        resident = self._residents.get(name)
+        if resident is None:
+            self._residents[name] = Resident(name, load, unload, max(size_mb, 0.0), keep)
+        else:
+            resident.loaded = True
+            resident.last_used = time.monotonic()
+
+    def touch(self, name: str):
+        resident = self._residents.get(name)
+        if resident is not None:
+            resident.last_used = time.monotonic()
+
+    @asynccontextmanager
+    async def using(self, name: str):
+        """Keep a component loaded for the duration of the block."""
+        resident = self._residents.get(name)
+        if resident is None:
+            yield
+            return
+        resident.users += 1
+        try:
+            await self._ensure(resident)
+            resident.last_used = time.monotonic()
+            yield
+        finally:
+            resident.users -= 1
+            resident.last_used = time.monotonic()
+
+    def prefetch(self, *names: str):
+        """Start reloading unloaded components in the background."""
+        for name in names:
+            resident = self._residents.get(name)
+            if resident is None or resident.loaded or resident.load is None:
+                continue
+            resident.last_used = time.monotonic()  # not evicted again right away
+            task = asyncio.create_task(self._ensure(resident))
+            self._prefetches.add(task)
+            task.add_done_callback(self._prefetches.discard)
+
+    async def run(self):
+        """Sample RSS and evict idle components until cancelled."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self._sample(await self.enforce())
+            except Exception as e:
+                print(f"  [Residency: {e}]")
+
+    async def enforce(self) -> float:
+        """Evict what is idle or over budget; return the RSS afterwards."""
+        now = time.monotonic()
+        idle = sorted(
+            (r for r in self._residents.values()
+             if r.loaded and not r.keep and r.unload and r.users == 0
+             and now - r.last_used >= self.grace),
+            key=lambda r: r.last_used,
+        )
+        rss = rss_mb()
+        for resident in idle:
+            if self.idle_after and now - resident.last_used >= self.idle_after:
+                reason = f"idle {(now - resident.last_used) / 60:.0f} min"
+            elif self.budget_mb and rss > self.budget_mb:
+                reason = f"RSS {rss:.0f}/{self.budget_mb:.0f} MB"
+            else:
+                continue
+            if await self._evict(resident):
+                print(f"  [Residency: unloaded {resident.name} ({reason})]")
+                rss = rss_mb()
+        return rss
+
+    async def _call(self, hook: Callable):
+        if inspect.iscoroutinefunction(hook):
+            return await hook()
+        return await asyncio.to_thread(hook)
+
+    async def _ensure(self, resident: Resident):
+        async with resident.lock:
+            if resident.loaded or resident.load is None:
+                return
+            before = rss_mb()
+            start = time.monotonic()
+            await self._call(resident.load)
+            resident.loaded = True
+            resident.size_mb = max(rss_mb() - before, resident.size_mb)
+            self.reloads += 1
+            print(f"  [Residency: reloaded {resident.name} in {time.monotonic() - start:.1f}s]")
+
+    async def _evict(self, resident: Resident) -> bool:
+        async with resident.lock:
+            if not resident.loaded or resident.users:
+                return False
+            await self._call(resident.unload)
+            resident.loaded = False
+            self.evictions += 1
+        await asyncio.to_thread(_release_memory)
+        return True
+
+    def _sample(self, rss: float):
+        self.peak_mb = max(self.peak_mb, rss)
+        self.low_mb = min(self.low_mb, rss)
+        if self.log_path is None:
+            return
+        loaded = " ".join(r.name for r in self._residents.values() if r.loaded)
+        new = not self.log_path.exists()
+        try:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.log_path, "a") as f:
+                if new:
+                    f.write("time,rss_mb,loaded\n")
+                f.write(f"{time.strftime('%Y-%m-%dT%H:%M:%S')},{rss:.1f},{loaded}\n")
+        except OSError as e:
+            print(f"  [Residency: failed to log RSS: {e}]")
+            self.log_path = None
+
+    def summary(self) -> str:
+        rss = rss_mb()
+        self.peak_mb = max(self.peak_mb, rss)
+        self.low_mb = min(self.low_mb, rss)
+        parts = ", ".join(
+            f"{r.name} {'~%.0f MB' % r.size_mb if r.loaded else 'unloaded'}"
+            for r in self._residents.values()
+        )
+        return (
+            f"residency: RSS {rss:.0f} MB (low {self.low_mb:.0f}, peak {self.peak_mb:.0f}), "
+            f"{self.evictions} unloads, {self.reloads} reloads; {parts}"
+        )
+
+
+@lru_cache
+def get_residency() -> ResidencyManager:
+    """Return the app-wide residency manager."""
+    config = get_settings().residency
+    return ResidencyManager(
+        budget_mb=config.budget_mb,
+        idle_after=config.idle_minutes * 60,
+        interval=config.interval,
+        log_path=config.log_path or None,
+    )
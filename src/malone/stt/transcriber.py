@@ -1,25 +1,68 @@
 from __future__ import annotations
 
+import threading
+
 import numpy as np
 from faster_whisper import WhisperModel
 
+from malone.cpu import EngineThreads, StageGate, pinned
+
 
 class Transcriber:
-    """Speech-to-text using faster-whisper."""
+    """Speech-to-text using faster-whisper.
+
+    The model can be unloaded to free memory; the next transcription
+    (or load()) brings it back.
+    """
 
     def __init__(
         self,
         model_size: str = "base.en",
         device: str = "cpu",
         compute_type: str = "int8",
+        threads: EngineThreads | None = None,
+        gate: StageGate | None = None,
     ):
-        self.model = WhisperModel(model_size, device=device, compute_type=compute_type)
+        self.model_size = model_size
+        self.device = device
+        self.compute_type = compute_type
+        self.threads = threads
+        self.gate = gate or StageGate()
+        self._lock = threading.Lock()
+        self.model: WhisperModel | None = None
+        self.load()
+
+    def load(self) -> WhisperModel:
+        with self._lock:
+            if self.model is not None:
+                return self.model
+            threads = self.threads
+            if threads is None:
+                self.model = WhisperModel(
+                    self.model_size, device=self.device, compute_type=self.compute_type
+                )
+                return self.model
+            with pinned(threads.cores):
+                self.model = WhisperModel(
+                    self.model_size,
+                    device=self.device,
+                    compute_type=self.compute_type,
+                    cpu_threads=threads.intra,
+                    num_workers=threads.inter,
+                )
+            return self.model
+
+    def unload(self):
+        with self._lock:
+            self.model = None
 
     def transcribe(self, audio_data: bytes) -> str:
         """Transcribe raw PCM int16 audio at 16kHz to text."""
         audio_array = np.frombuffer(audio_data, dtype=np.int16)
         audio_float = audio_array.astype(np.float32) / 32768.0
 
-        segments, _ = self.model.transcribe(audio_float, beam_size=5)
-        text = " ".join(segment.text.strip() for segment in segments)
+        model = self.load()
+        with self.gate.running("stt"):
+            segments, _ = model.transcribe(audio_float, beam_size=5)
+            text = " ".join(segment.text.strip() for segment in segments)
         return text.strip()
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import json
+import re
+
+# Words, numbers, and runs of other non-space characters
+_PIECE_RE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]+")
+
+# Per-message framing the chat templates add (role markers, separators)
+MESSAGE_OVERHEAD = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate BPE token count without loading a tokenizer.
+
+    Counts words and symbol runs, charging long pieces extra since
+    tokenizers split them. Good enough for budgeting; errs high on
+    symbol-heavy text such as logs and tables.
+    """
+    if not text:
+        return 0
+    tokens = 0
+    for piece in _PIECE_RE.findall(text):
+        tokens += 1 + len(piece) // 6 if piece[0].isalpha() else (len(piece) + 2) // 3
+    return tokens
+
+
+def message_tokens(message: dict) -> int:
+    """Approximate tokens of one OpenAI-format chat message."""
+    tokens = MESSAGE_OVERHEAD
+    content = message.get("content")
+    if isinstance(content, str):
+        tokens += estimate_tokens(content)
+    elif content:
+        tokens += estimate_tokens(json.dumps(content))
+    for call in message.get("tool_calls") or []:
+        function = call.get("function", {})
+        tokens += MESSAGE_OVERHEAD + estimate_tokens(function.get("name", ""))
+        tokens += estimate_tokens(function.get("arguments", ""))
+    return tokens
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 from abc import ABC, abstractmethod
 from typing import Any
 
@@ -7,6 +8,27 @@ from typing import Any
 class BaseTool(ABC):
     """Base class for all Malone tools."""
 
+    # Execution policy, overridden as class attributes by subclasses.
+    # timeout: seconds before ToolExecutor cancels the call (None = no limit)
+    # max_concurrency: calls allowed in flight at once (None = unlimited)
+    # concurrency_group: tools sharing a group share one max_concurrency limit
+    # side_effect_free: True if the call only reads state
+    # background: run as a job and return a handle instead of blocking the turn
+    # keywords: extra words users say when they want this tool (for ToolSelector)
+    # cache_ttl: seconds ToolExecutor may reuse a result for the same arguments
+    #   (None = never cached; see cache_key)
+    # invalidates: tools whose cached results are dropped after this tool runs
+    # result_budget: token budget for results (None = ResultShaper default, 0 = unshaped)
+    timeout: float | None = 60.0
+    max_concurrency: int | None = None
+    concurrency_group: str | None = None
+    side_effect_free: bool = False
+    background: bool = False
+    keywords: tuple[str, ...] = ()
+    cache_ttl: float | None = None
+    invalidates: tuple[str, ...] = ()
+    result_budget: int | None = None
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -30,6 +52,18 @@ class BaseTool(ABC):
         """Execute the tool with the given arguments."""
         ...
 
+    def cache_key(self, **kwargs) -> str | None:
+        """Key identifying a call's result for caching, or None to skip the cache.
+
+        Defaults to the arguments with whitespace normalized. Override to
+        refuse calls that change state (e.g. mutating commands).
+        """
+        normalized = {
+            k: " ".join(v.split()) if isinstance(v, str) else v
+            for k, v in kwargs.items()
+        }
+        return json.dumps(normalized, sort_keys=True, default=str)
+
     def to_openai_schema(self) -> dict:
         """Return OpenAI-compatible tool schema for LLM function calling."""
         return {
@@ -40,3 +74,11 @@ class BaseTool(ABC):
                 "parameters": self.parameters,
             },
         }
+
+    def to_anthropic_schema(self) -> dict:
+        """Return Anthropic tool schema for Claude tool use."""
+        return {
+            "name": self.name,
+            "description": self.description,
+            "input_schema": self.parameters,
+        }
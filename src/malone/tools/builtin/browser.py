@@ -3,28 +3,59 @@ from __future__ import annotations
 import asyncio
 import json
 
+from malone.config.settings import get_settings
+from malone.residency import get_residency
 from malone.tools.base import BaseTool
 
 # Lazy-loaded to avoid import cost when not used
+_playwright = None
 _browser = None
 _page = None
 
+_BROWSER_MB = 250.0  # headless Chromium with one page, across its processes
+
+# Page text returned; with result shaping on, ToolExecutor fits it to the
+# token budget and keeps the rest for read_tool_output
+_SHAPED_CHARS = 100_000
+_UNSHAPED_CHARS = 3000
+
 
 async def _get_page():
     """Get or create the browser page (lazy singleton)."""
-    global _browser, _page
+    global _playwright, _browser, _page
     if _page is None:
         from playwright.async_api import async_playwright
 
-        pw = await async_playwright().start()
-        _browser = await pw.chromium.launch(headless=True)
+        _playwright = await async_playwright().start()
+        _browser = await _playwright.chromium.launch(headless=True)
         _page = await _browser.new_page()
+        # Closed again once idle; the next browser tool call relaunches it
+        get_residency().register("browser", unload=close_browser, size_mb=_BROWSER_MB)
+    get_residency().touch("browser")
     return _page
 
 
+async def close_browser():
+    """Shut down Chromium and Playwright (the page and its session are lost)."""
+    global _playwright, _browser, _page
+    browser, playwright = _browser, _playwright
+    _playwright = _browser = _page = None
+    if browser is not None:
+        await browser.close()
+    if playwright is not None:
+        await playwright.stop()
+
+
 class BrowseWebTool(BaseTool):
     """Navigate to a URL and return the page content."""
 
+    timeout = 30.0
+    max_concurrency = 1
+    concurrency_group = "browser"  # one shared page
+    keywords = (
+        "web", "website", "page", "internet", "search", "online", "look", "up", "open", "site",
+    )
+
     @property
     def name(self) -> str:
         return "browse_web"
@@ -57,7 +88,8 @@ class BrowseWebTool(BaseTool):
             title = await page.title()
             # Get visible text, truncated to avoid flooding
             text = await page.inner_text("body")
-            text = text.strip()[:3000]
+            shaped = get_settings().result_shaping.enabled
+            text = text.strip()[:_SHAPED_CHARS if shaped else _UNSHAPED_CHARS]
             return f"Page: {title}\nURL: {page.url}\n\n{text}"
         except Exception as e:
             return f"Error browsing {url}: {e}"
@@ -66,6 +98,10 @@ class BrowseWebTool(BaseTool):
 class BrowserClickTool(BaseTool):
     """Click an element on the current page."""
 
+    timeout = 20.0
+    max_concurrency = 1
+    concurrency_group = "browser"
+
     @property
     def name(self) -> str:
         return "browser_click"
@@ -115,6 +151,10 @@ class BrowserClickTool(BaseTool):
 class BrowserFillTool(BaseTool):
     """Fill in a form field on the current page."""
 
+    timeout = 20.0
+    max_concurrency = 1
+    concurrency_group = "browser"
+
     @property
     def name(self) -> str:
         return "browser_fill"
@@ -164,6 +204,11 @@ class BrowserFillTool(BaseTool):
 class BrowserGetElementsTool(BaseTool):
     """List interactive elements on the current page."""
 
+    timeout = 20.0
+    max_concurrency = 1
+    concurrency_group = "browser"
+    side_effect_free = True
+
     @property
     def name(self) -> str:
         return "browser_get_elements"
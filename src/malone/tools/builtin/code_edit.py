@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import os
-import subprocess
 
 from malone.tools.base import BaseTool
+from malone.tools.jobs import report_output
+from malone.tools.process import run_process
 
 PROJECT_DIR = "/mnt/c/Users/denni/malone-ai"
 
@@ -11,6 +12,11 @@ PROJECT_DIR = "/mnt/c/Users/denni/malone-ai"
 class ClaudeCodeTool(BaseTool):
     """Spawns Claude Code CLI to edit Malone's own source code."""
 
+    timeout = None  # enforces its own 5 minute limit
+    max_concurrency = 1  # sessions share the git working tree
+    background = True
+    keywords = ("code", "improve", "yourself", "feature", "fix", "bug", "edit", "source", "program")
+
     @property
     def name(self) -> str:
         return "claude_code"
@@ -22,7 +28,8 @@ class ClaudeCodeTool(BaseTool):
             "Use this for complex code changes: adding features, fixing bugs, "
             "refactoring, or improving Malone itself. Claude Code can read, "
             "write, and edit files in the project. A git commit is created "
-            "before changes as a safety net."
+            "before changes as a safety net. Runs as a background job: it "
+            "returns a job ID right away and the user is told when it finishes."
         )
 
     @property
@@ -44,55 +51,50 @@ class ClaudeCodeTool(BaseTool):
 
     async def execute(self, task: str) -> str:
         # Safety: commit current state before making changes
-        safety_result = subprocess.run(
+        safety_result = await run_process(
             ["git", "stash", "--include-untracked", "-m", "malone-auto-save"],
-            capture_output=True,
-            text=True,
             cwd=PROJECT_DIR,
         )
 
         try:
             # Run Claude Code with the task
             env = os.environ.copy()
-            result = subprocess.run(
+            result = await run_process(
                 [
                     "claude",
                     "--print",
                     "--dangerously-skip-permissions",
                     task,
                 ],
-                capture_output=True,
-                text=True,
                 timeout=300,  # 5 minute timeout
                 cwd=PROJECT_DIR,
                 env=env,
+                on_output=report_output,
             )
+            if result.timed_out:
+                return "Error: Claude Code session timed out after 5 minutes"
 
             output = result.stdout
             if result.stderr:
                 output += f"\nSTDERR: {result.stderr}"
 
             # Check what changed
-            diff_result = subprocess.run(
+            diff_result = await run_process(
                 ["git", "diff", "--stat"],
-                capture_output=True,
-                text=True,
                 cwd=PROJECT_DIR,
             )
 
             if diff_result.stdout.strip():
                 # Auto-commit the changes
-                subprocess.run(
+                await run_process(
                     ["git", "add", "-A"],
                     cwd=PROJECT_DIR,
                 )
-                subprocess.run(
+                await run_process(
                     [
                         "git", "commit", "-m",
                         f"Malone self-edit: {task[:80]}",
                     ],
-                    capture_output=True,
-                    text=True,
                     cwd=PROJECT_DIR,
                 )
                 output += f"\n\nFiles changed:\n{diff_result.stdout}"
@@ -101,13 +103,10 @@ class ClaudeCodeTool(BaseTool):
 
             return output.strip() or "(no output from Claude Code)"
 
-        except subprocess.TimeoutExpired:
-            return "Error: Claude Code session timed out after 5 minutes"
         finally:
             # Restore stashed changes if any were stashed
-            if "Saved working directory" in (safety_result.stdout or ""):
-                subprocess.run(
+            if "Saved working directory" in safety_result.stdout:
+                await run_process(
                     ["git", "stash", "pop"],
-                    capture_output=True,
                     cwd=PROJECT_DIR,
                 )
@@ -1,22 +1,102 @@
 from __future__ import annotations
 
-import json
+import asyncio
 
-import httpx
-
-from malone.config.settings import get_settings
+from malone.homeassistant.client import get_ha_client
+from malone.homeassistant.resolver import ACTION_DOMAINS, get_entity_resolver
+from malone.homeassistant.state import get_state_mirror
 from malone.tools.base import BaseTool
 
 
-def _get_ha_config():
-    """Get Home Assistant config (URL and token)."""
-    settings = get_settings()
-    return settings.home_assistant
+def _resolve(name: str, domains: set[str] | None = None) -> tuple[list[str], str]:
+    """Map an entity_id or spoken device name to entity_ids.
+
+    Returns (entity_ids, error); entity_ids is empty when error is set.
+    """
+    mirror = get_state_mirror()
+    if not mirror.synced:
+        if "." in name:
+            return [name], ""
+        return [], (
+            f"Error: Can't resolve '{name}' without the live state mirror. "
+            "Use ha_list_entities to find the entity_id."
+        )
+
+    if mirror.get(name) is not None:
+        return [name], ""
+    targets, candidates = get_entity_resolver().best(name, domains)
+    if targets:
+        return [m.entity_id for m in targets], ""
+    if candidates:
+        options = ", ".join(f"{m.entity_id} ({m.name})" for m in candidates)
+        return [], f"Error: '{name}' is ambiguous. Closest matches: {options}"
+    return [], f"Error: No device matching '{name}'."
+
+
+_UNKNOWN_ACTION = "Unknown action '{}'. Use: turn_on, turn_off, toggle, set_temperature, set_brightness."
+
+
+def _check_action(action: str, value: str) -> str:
+    """Return an error for an unknown action or a missing value, else ''."""
+    if action not in ACTION_DOMAINS:
+        return "Error: " + _UNKNOWN_ACTION.format(action)
+    if action in ("set_brightness", "set_temperature") and not value:
+        return f"Error: value is required for {action}."
+    return ""
+
+
+def _service_for(action: str, value: str, domain: str) -> tuple[str, str, dict] | None:
+    """Map an action to (service_domain, service, extra service data)."""
+    if action == "set_temperature" and value:
+        return "climate", "set_temperature", {"temperature": float(value)}
+    if action == "set_brightness" and value:
+        return domain, "turn_on", {"brightness": int(value)}
+    if action in ("turn_on", "turn_off", "toggle"):
+        return domain, action, {}
+    return None
+
+
+async def _call_grouped(
+    client, entity_ids: list[str], action: str, value: str
+) -> tuple[list[str], int]:
+    """Apply one action to many entities with as few service calls as possible.
+
+    Entities sharing a service and service data go into one call (HA takes
+    a list of entity_ids); the resulting calls run concurrently. Returns
+    one error line per failed call and how many entities those covered.
+    """
+    groups: dict[tuple, list[str]] = {}
+    for entity_id in entity_ids:
+        service = _service_for(action, value, entity_id.split(".")[0])
+        if service is None:
+            return [_UNKNOWN_ACTION.format(action)], len(entity_ids)
+        service_domain, service_name, extra = service
+        key = (service_domain, service_name, tuple(sorted(extra.items())))
+        groups.setdefault(key, []).append(entity_id)
+
+    calls = [
+        client.call_service(service_domain, service_name, {"entity_id": targets, **dict(extra)})
+        for (service_domain, service_name, extra), targets in groups.items()
+    ]
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    errors, failed = [], 0
+    for ((service_domain, service_name, _), targets), result in zip(groups.items(), results):
+        if isinstance(result, Exception):
+            errors.append(f"{service_domain}.{service_name} on {', '.join(targets)} failed: {result}")
+            failed += len(targets)
+    return errors, failed
 
 
 class HAListEntitiesTool(BaseTool):
     """Lists available Home Assistant entities."""
 
+    timeout = 15.0
+    max_concurrency = 4
+    concurrency_group = "home_assistant"
+    side_effect_free = True
+    keywords = ("home", "device", "devices", "sensor", "status", "which", "lights")
+    cache_ttl = 5.0
+
     @property
     def name(self) -> str:
         return "ha_list_entities"
@@ -25,7 +105,8 @@ class HAListEntitiesTool(BaseTool):
     def description(self) -> str:
         return (
             "List available Home Assistant entities (devices). "
-            "Optionally filter by domain (light, switch, climate, sensor, etc). "
+            "Optionally filter by domain (light, switch, climate, sensor, etc) "
+            "and/or area (kitchen, bedroom, etc). "
             "Returns entity_id, friendly name, and current state."
         )
 
@@ -42,25 +123,28 @@ class HAListEntitiesTool(BaseTool):
                         "Leave empty to list all."
                     ),
                 },
+                "area": {
+                    "type": "string",
+                    "description": "Filter by area name (e.g. 'kitchen'). Leave empty for all areas.",
+                },
             },
             "required": [],
         }
 
-    async def execute(self, domain: str = "") -> str:
-        config = _get_ha_config()
-        if not config.url or not config.token.get_secret_value():
+    async def execute(self, domain: str = "", area: str = "") -> str:
+        client = get_ha_client()
+        if not client.configured:
             return "Error: Home Assistant not configured. Set MALONE_HOME_ASSISTANT__URL and MALONE_HOME_ASSISTANT__TOKEN."
 
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.get(
-                f"{config.url}/api/states",
-                headers={"Authorization": f"Bearer {config.token.get_secret_value()}"},
-            )
-            resp.raise_for_status()
-            states = resp.json()
-
-        if domain:
-            states = [s for s in states if s["entity_id"].startswith(f"{domain}.")]
+        mirror = get_state_mirror()
+        if mirror.synced:
+            states = mirror.list_entities(domain=domain, area=area)
+        elif area:
+            return "Error: Area filtering needs the live state mirror, which is not connected."
+        else:
+            states = await client.get_states()
+            if domain:
+                states = [s for s in states if s["entity_id"].startswith(f"{domain}.")]
 
         results = []
         for entity in states[:50]:  # Limit to avoid flooding
@@ -70,13 +154,25 @@ class HAListEntitiesTool(BaseTool):
             )
 
         if not results:
-            return f"No entities found{' for domain ' + domain if domain else ''}."
+            where = "".join(
+                [f" for domain {domain}" if domain else "", f" in area {area}" if area else ""]
+            )
+            return f"No entities found{where}."
         return f"Found {len(results)} entities:\n" + "\n".join(results)
 
 
 class HAControlDeviceTool(BaseTool):
     """Controls a Home Assistant device."""
 
+    timeout = 15.0
+    max_concurrency = 4
+    concurrency_group = "home_assistant"
+    keywords = (
+        "home", "light", "lamp", "fan", "switch", "thermostat", "heating",
+        "dim", "brightness", "turn", "off", "on", "lock", "blinds",
+    )
+    invalidates = ("ha_list_entities",)
+
     @property
     def name(self) -> str:
         return "ha_control_device"
@@ -86,7 +182,8 @@ class HAControlDeviceTool(BaseTool):
         return (
             "Control a Home Assistant device. Supports turning on/off lights, "
             "switches, fans, covers, locks, and setting climate temperature. "
-            "Use ha_list_entities first to discover available entity IDs."
+            "Accepts an entity ID or the device's natural name (e.g. 'kitchen "
+            "lights', 'bedroom fan'), so there is no need to list entities first."
         )
 
     @property
@@ -96,7 +193,10 @@ class HAControlDeviceTool(BaseTool):
             "properties": {
                 "entity_id": {
                     "type": "string",
-                    "description": "The entity ID to control (e.g. 'light.living_room')",
+                    "description": (
+                        "Entity ID (e.g. 'light.living_room') or natural device "
+                        "name (e.g. 'living room lamp', 'kitchen lights')"
+                    ),
                 },
                 "action": {
                     "type": "string",
@@ -117,41 +217,162 @@ class HAControlDeviceTool(BaseTool):
         }
 
     async def execute(self, entity_id: str, action: str, value: str = "") -> str:
-        config = _get_ha_config()
-        if not config.url or not config.token.get_secret_value():
+        client = get_ha_client()
+        if not client.configured:
             return "Error: Home Assistant not configured."
+        error = _check_action(action, value)
+        if error:
+            return error
 
-        domain = entity_id.split(".")[0]
-        headers = {"Authorization": f"Bearer {config.token.get_secret_value()}"}
-
-        # Build the service call
-        service_data: dict = {"entity_id": entity_id}
-
-        if action == "set_temperature" and value:
-            service = "climate/set_temperature"
-            service_data["temperature"] = float(value)
-        elif action == "set_brightness" and value:
-            service = f"{domain}/turn_on"
-            service_data["brightness"] = int(value)
-        elif action in ("turn_on", "turn_off", "toggle"):
-            service = f"{domain}/{action}"
-        else:
-            return f"Unknown action '{action}'. Use: turn_on, turn_off, toggle, set_temperature, set_brightness."
+        entity_ids, error = _resolve(entity_id)
+        if error:
+            return error
 
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.post(
-                f"{config.url}/api/services/{service}",
-                headers=headers,
-                json=service_data,
-            )
-            resp.raise_for_status()
+        errors, _ = await _call_grouped(client, entity_ids, action, value)
+        if errors:
+            return "Error: " + "; ".join(errors)
+
+        return f"OK: {action} on {', '.join(entity_ids)}" + (f" (value: {value})" if value else "")
 
-        return f"OK: {action} on {entity_id}" + (f" (value: {value})" if value else "")
+
+class HABatchControlTool(BaseTool):
+    """Applies one action to many Home Assistant devices at once."""
+
+    timeout = 20.0
+    max_concurrency = 4
+    concurrency_group = "home_assistant"
+    keywords = ("home", "lights", "all", "everything", "downstairs", "upstairs", "turn", "off", "on")
+    invalidates = ("ha_list_entities",)
+
+    @property
+    def name(self) -> str:
+        return "ha_control_many"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Apply one action to many Home Assistant devices in a single call, "
+            "e.g. 'turn off all the downstairs lights'. Targets can be device "
+            "names or entity IDs, whole areas, and/or whole domains; areas and "
+            "domains combine as a filter (areas ['kitchen'] + domains ['light'] "
+            "= every kitchen light). Prefer this over repeated ha_control_device calls."
+        )
+
+    @property
+    def parameters(self) -> dict:
+        return {
+            "type": "object",
+            "properties": {
+                "entities": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Device names or entity IDs (e.g. ['porch light', 'fan.bedroom_fan'])",
+                },
+                "areas": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Area names whose devices should be included (e.g. ['kitchen', 'hallway'])",
+                },
+                "domains": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Entity domains to include, or to filter areas by (e.g. ['light', 'switch'])",
+                },
+                "action": {
+                    "type": "string",
+                    "description": (
+                        "Action to perform: 'turn_on', 'turn_off', 'toggle', "
+                        "'set_temperature', 'set_brightness'"
+                    ),
+                },
+                "value": {
+                    "type": "string",
+                    "description": "Optional value for the action: temperature or brightness 0-255.",
+                },
+            },
+            "required": ["action"],
+        }
+
+    async def execute(
+        self,
+        action: str,
+        entities: list[str] | None = None,
+        areas: list[str] | None = None,
+        domains: list[str] | None = None,
+        value: str = "",
+    ) -> str:
+        client = get_ha_client()
+        if not client.configured:
+            return "Error: Home Assistant not configured."
+        error = _check_action(action, value)
+        if error:
+            return error
+        if not (entities or areas or domains):
+            return "Error: Give at least one of entities, areas or domains."
+
+        targets: dict[str, None] = {}  # ordered set
+        problems = []
+        for name in entities or []:
+            entity_ids, error = _resolve(name)
+            if error:
+                problems.append(error.removeprefix("Error: "))
+            targets.update(dict.fromkeys(entity_ids))
+
+        if areas or domains:
+            # Only expand to domains the action makes sense for
+            wanted = set(domains or ACTION_DOMAINS[action]) & ACTION_DOMAINS[action]
+            mirror = get_state_mirror()
+            if mirror.synced:
+                for area in areas or [""]:
+                    if area and mirror.find_area(area) is None:
+                        problems.append(f"No area named '{area}'.")
+                        continue
+                    for domain in sorted(wanted):
+                        for state in mirror.list_entities(domain=domain, area=area):
+                            targets[state["entity_id"]] = None
+            elif areas:
+                return "Error: Area targeting needs the live state mirror, which is not connected."
+            else:
+                for state in await client.get_states():
+                    if state["entity_id"].split(".")[0] in wanted:
+                        targets[state["entity_id"]] = None
+
+        if not targets:
+            return "Error: " + (" ".join(problems) or "No matching devices.")
+
+        entity_ids = list(targets)
+        errors, failed = await _call_grouped(client, entity_ids, action, value)
+
+        counts: dict[str, int] = {}
+        for entity_id in entity_ids:
+            domain = entity_id.split(".")[0]
+            counts[domain] = counts.get(domain, 0) + 1
+        summary = f"{len(entity_ids)} entities (" + ", ".join(f"{domain}: {n}" for domain, n in counts.items()) + ")"
+        if len(entity_ids) <= 8:
+            summary = ", ".join(entity_ids)
+
+        status = "OK"
+        if failed >= len(entity_ids):
+            status = "Failed"
+        elif errors:
+            status = "Partial"
+        result = f"{status}: {action} on {summary}" + (f" (value: {value})" if value else "")
+        if errors:
+            result += "\nFailed: " + "; ".join(errors)
+        if problems:
+            result += "\nSkipped: " + " ".join(problems)
+        return result
 
 
 class HATriggerSceneTool(BaseTool):
     """Triggers a Home Assistant scene or automation."""
 
+    timeout = 15.0
+    max_concurrency = 4
+    concurrency_group = "home_assistant"
+    keywords = ("home", "scene", "mode", "routine", "activate", "run")
+    invalidates = ("ha_list_entities",)
+
     @property
     def name(self) -> str:
         return "ha_trigger_scene"
@@ -159,8 +380,9 @@ class HATriggerSceneTool(BaseTool):
     @property
     def description(self) -> str:
         return (
-            "Trigger a Home Assistant scene or automation. "
-            "Use ha_list_entities with domain 'scene' or 'automation' to find available ones."
+            "Trigger a Home Assistant scene or automation by entity ID or by "
+            "name (e.g. 'movie night'). Use ha_list_entities with domain 'scene' "
+            "or 'automation' to find available ones."
         )
 
     @property
@@ -170,33 +392,30 @@ class HATriggerSceneTool(BaseTool):
             "properties": {
                 "entity_id": {
                     "type": "string",
-                    "description": "The scene or automation entity_id (e.g. 'scene.movie_night')",
+                    "description": "The scene or automation entity_id (e.g. 'scene.movie_night') or its name",
                 },
             },
             "required": ["entity_id"],
         }
 
     async def execute(self, entity_id: str) -> str:
-        config = _get_ha_config()
-        if not config.url or not config.token.get_secret_value():
+        client = get_ha_client()
+        if not client.configured:
             return "Error: Home Assistant not configured."
 
-        headers = {"Authorization": f"Bearer {config.token.get_secret_value()}"}
+        entity_ids, error = _resolve(entity_id, domains={"scene", "automation"})
+        if error:
+            return error
+        entity_id = entity_ids[0]
         domain = entity_id.split(".")[0]
 
         if domain == "scene":
-            service = "scene/turn_on"
+            service = "turn_on"
         elif domain == "automation":
-            service = "automation/trigger"
+            service = "trigger"
         else:
             return f"Entity '{entity_id}' is not a scene or automation."
 
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.post(
-                f"{config.url}/api/services/{service}",
-                headers=headers,
-                json={"entity_id": entity_id},
-            )
-            resp.raise_for_status()
+        await client.call_service(domain, service, {"entity_id": entity_id})
 
         return f"OK: Triggered {entity_id}"
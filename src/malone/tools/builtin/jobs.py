@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from malone.tools.base import BaseTool
+from malone.tools.jobs import get_job_manager
+
+
+class JobStatusTool(BaseTool):
+    """Reports the status of background jobs."""
+
+    timeout = 5.0
+    side_effect_free = True
+    keywords = ("job", "jobs", "background", "progress", "running", "finished")
+
+    @property
+    def name(self) -> str:
+        return "job_status"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Check the status of background jobs started by long-running tools "
+            "such as claude_code. Leave job_id empty to list all jobs."
+        )
+
+    @property
+    def parameters(self) -> dict:
+        return {
+            "type": "object",
+            "properties": {
+                "job_id": {
+                    "type": "string",
+                    "description": "The job ID (e.g. 'job-1'). Leave empty to list all jobs.",
+                },
+            },
+            "required": [],
+        }
+
+    async def execute(self, job_id: str = "") -> str:
+        jobs = get_job_manager()
+        if job_id:
+            job = jobs.get(job_id)
+            if job is None:
+                return f"No job '{job_id}'."
+            status = job.summary()
+            if job.result:
+                status += f"\nResult:\n{job.result}"
+            return status
+
+        all_jobs = jobs.list_jobs()
+        if not all_jobs:
+            return "No background jobs."
+        return "\n".join(job.summary() for job in all_jobs)
+
+
+class JobOutputTool(BaseTool):
+    """Returns the streamed output of a background job."""
+
+    timeout = 5.0
+    side_effect_free = True
+    keywords = ("job", "output", "log", "progress")
+
+    @property
+    def name(self) -> str:
+        return "job_output"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Read the most recent output of a background job, "
+            "including jobs that are still running."
+        )
+
+    @property
+    def parameters(self) -> dict:
+        return {
+            "type": "object",
+            "properties": {
+                "job_id": {
+                    "type": "string",
+                    "description": "The job ID (e.g. 'job-1')",
+                },
+                "max_chars": {
+                    "type": "integer",
+                    "description": "Return at most this many trailing characters (default 2000)",
+                },
+            },
+            "required": ["job_id"],
+        }
+
+    async def execute(self, job_id: str, max_chars: int = 2000) -> str:
+        job = get_job_manager().get(job_id)
+        if job is None:
+            return f"No job '{job_id}'."
+        # [-0:] would be the whole buffer (and a negative count most of it)
+        output = job.output.text()[-max(max_chars, 1):]
+        return f"{job.summary()}\n\n{output or '(no output yet)'}"
+
+
+class JobCancelTool(BaseTool):
+    """Cancels a running background job."""
+
+    timeout = 5.0
+    keywords = ("job", "stop", "cancel", "abort", "kill")
+
+    @property
+    def name(self) -> str:
+        return "job_cancel"
+
+    @property
+    def description(self) -> str:
+        return "Cancel a running background job."
+
+    @property
+    def parameters(self) -> dict:
+        return {
+            "type": "object",
+            "properties": {
+                "job_id": {
+                    "type": "string",
+                    "description": "The job ID to cancel (e.g. 'job-1')",
+                },
+            },
+            "required": ["job_id"],
+        }
+
+    async def execute(self, job_id: str) -> str:
+        if get_job_manager().cancel(job_id):
+            return f"Cancelling {job_id}."
+        return f"Job '{job_id}' is not running."
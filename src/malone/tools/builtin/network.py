@@ -1,14 +1,25 @@
 from __future__ import annotations
 
-import asyncio
 import shlex
 
 from malone.tools.base import BaseTool
+from malone.tools.process import run_process
+
+# kubectl verbs that never change cluster state
+_KUBECTL_READ_VERBS = {
+    "get", "describe", "logs", "top", "version", "cluster-info",
+    "explain", "api-resources", "api-versions",
+}
 
 
 class SSHCommandTool(BaseTool):
     """Execute commands on remote hosts via SSH."""
 
+    timeout = 40.0
+    max_concurrency = 4
+    keywords = ("server", "remote", "host", "machine", "nas", "login")
+    invalidates = ("kubectl",)  # remote changes may touch cluster nodes
+
     @property
     def name(self) -> str:
         return "ssh_command"
@@ -62,32 +73,24 @@ class SSHCommandTool(BaseTool):
         ssh_args.append(command)
 
         try:
-            proc = await asyncio.create_subprocess_exec(
-                *ssh_args,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            stdout, stderr = await asyncio.wait_for(
-                proc.communicate(), timeout=30
-            )
-
-            output = stdout.decode(errors="replace")
-            if stderr:
-                output += f"\nSTDERR: {stderr.decode(errors='replace')}"
-            if proc.returncode != 0:
-                output += f"\nExit code: {proc.returncode}"
-            return output.strip() or "(no output)"
-
-        except asyncio.TimeoutError:
-            proc.kill()
-            return f"Error: SSH command timed out after 30 seconds"
+            result = await run_process(ssh_args, timeout=30)
         except FileNotFoundError:
             return "Error: ssh command not found"
 
+        if result.timed_out:
+            return "Error: SSH command timed out after 30 seconds"
+        return result.format()
+
 
 class KubectlTool(BaseTool):
     """Execute kubectl commands for Kubernetes cluster management."""
 
+    timeout = 40.0
+    max_concurrency = 4
+    keywords = ("k8s", "kubernetes", "cluster", "pod", "pods", "deployment", "container", "node")
+    cache_ttl = 10.0
+    invalidates = ("kubectl",)  # after a mutating command
+
     @property
     def name(self) -> str:
         return "kubectl"
@@ -117,6 +120,18 @@ class KubectlTool(BaseTool):
             "required": ["args"],
         }
 
+    def cache_key(self, args: str, context: str = "") -> str | None:
+        """Only read-only, non-streaming commands are cached."""
+        try:
+            words = shlex.split(args)
+        except ValueError:
+            return None
+        if not words or words[0] not in _KUBECTL_READ_VERBS:
+            return None
+        if any(w in ("-w", "--watch", "-f", "--follow") for w in words):
+            return None
+        return f"{context}|{' '.join(words)}"
+
     async def execute(self, args: str, context: str = "") -> str:
         cmd = ["kubectl"]
         if context:
@@ -124,24 +139,10 @@ class KubectlTool(BaseTool):
         cmd.extend(shlex.split(args))
 
         try:
-            proc = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            stdout, stderr = await asyncio.wait_for(
-                proc.communicate(), timeout=30
-            )
-
-            output = stdout.decode(errors="replace")
-            if stderr:
-                output += f"\nSTDERR: {stderr.decode(errors='replace')}"
-            if proc.returncode != 0:
-                output += f"\nExit code: {proc.returncode}"
-            return output.strip() or "(no output)"
-
-        except asyncio.TimeoutError:
-            proc.kill()
-            return "Error: kubectl command timed out after 30 seconds"
+            result = await run_process(cmd, timeout=30)
         except FileNotFoundError:
             return "Error: kubectl not found. Is it installed?"
+
+        if result.timed_out:
+            return "Error: kubectl command timed out after 30 seconds"
+        return result.format()
@@ -1,15 +1,19 @@
 from __future__ import annotations
 
 import platform
-import subprocess
 from datetime import datetime
 
 from malone.tools.base import BaseTool
+from malone.tools.process import run_process
 
 
 class GetCurrentTimeTool(BaseTool):
     """Returns the current date and time."""
 
+    timeout = 5.0
+    side_effect_free = True
+    keywords = ("time", "date", "day", "today", "clock")
+
     @property
     def name(self) -> str:
         return "get_current_time"
@@ -30,6 +34,11 @@ class GetCurrentTimeTool(BaseTool):
 class GetSystemInfoTool(BaseTool):
     """Returns system information about the machine Malone is running on."""
 
+    timeout = 10.0
+    side_effect_free = True
+    keywords = ("memory", "ram", "cpu", "gpu", "disk", "hardware", "computer")
+    cache_ttl = 30.0
+
     @property
     def name(self) -> str:
         return "get_system_info"
@@ -55,9 +64,9 @@ class GetSystemInfoTool(BaseTool):
             pass
 
         try:
-            result = subprocess.run(
+            result = await run_process(
                 ["nvidia-smi", "--query-gpu=name,memory.used,memory.total", "--format=csv,noheader"],
-                capture_output=True, text=True, timeout=5,
+                timeout=5,
             )
             if result.returncode == 0:
                 info.append(f"GPU: {result.stdout.strip()}")
@@ -70,6 +79,11 @@ class GetSystemInfoTool(BaseTool):
 class RunShellCommandTool(BaseTool):
     """Runs a shell command and returns the output."""
 
+    timeout = 40.0
+    max_concurrency = 4
+    keywords = ("shell", "terminal", "command", "bash", "run", "file", "files", "disk", "process")
+    invalidates = ("get_system_info",)
+
     @property
     def name(self) -> str:
         return "run_shell_command"
@@ -95,19 +109,7 @@ class RunShellCommandTool(BaseTool):
         }
 
     async def execute(self, command: str) -> str:
-        try:
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-            output = result.stdout
-            if result.stderr:
-                output += f"\nSTDERR: {result.stderr}"
-            if result.returncode != 0:
-                output += f"\nExit code: {result.returncode}"
-            return output.strip() or "(no output)"
-        except subprocess.TimeoutExpired:
+        result = await run_process(command, shell=True, timeout=30)
+        if result.timed_out:
             return "Error: Command timed out after 30 seconds"
+        return result.format()
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
+
+class ResultCache:
+    """Bounded LRU cache of tool results with per-entry TTL.
+
+    Identical concurrent calls are collapsed: the first runs, the others
+    wait for its result. Error results are never stored. Invalidating a
+    tool drops its entries and keeps calls already in flight from storing
+    results that may predate the change.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], tuple[float, str]] = OrderedDict()
+        self._inflight: dict[tuple[str, str], asyncio.Future[str]] = {}
+        self._generations: dict[str, int] = {}  # bumped per tool on invalidation
+        self.hits = 0
+        self.misses = 0
+        self.collapsed = 0
+
+    async def get_or_run(
+        self, tool: str, key: str, ttl: float, run: Callable[[], Awaitable[str]]
+    ) -> str:
+        entry_key = (tool, key)
+        entry = self._entries.get(entry_key)
+        if entry is not None:
+            expires, result = entry
+            if time.monotonic() < expires:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                return result
+            del self._entries[entry_key]
+
+        inflight = self._inflight.get(entry_key)
+        if inflight is not None:
+            self.collapsed += 1
+            # Shielded so one waiter being cancelled doesn't cancel the shared call
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        self._inflight[entry_key] = future
+        generation = self._generations.get(tool, 0)
+        try:
+            result = await run()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved; waiters re-raise it
+            raise
+        finally:
+            del self._inflight[entry_key]
+
+        future.set_result(result)
+        if not result.startswith("Error") and self._generations.get(tool, 0) == generation:
+            self._entries[entry_key] = (time.monotonic() + ttl, result)
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def invalidate(self, *tools: str):
+        """Drop every cached result of the given tools."""
+        for tool in tools:
+            self._generations[tool] = self._generations.get(tool, 0) + 1
+        stale = [k for k in self._entries if k[0] in tools]
+        for k in stale:
+            del self._entries[k]
+
+    def clear(self):
+        self._entries.clear()
+
+    def summary(self) -> str:
+        total = self.hits + self.misses + self.collapsed
+        saved = self.hits + self.collapsed
+        rate = saved / total if total else 0.0
+        return (
+            f"tool cache: {saved}/{total} calls served ({rate:.0%}), "
+            f"{self.hits} hits, {self.collapsed} collapsed, {len(self._entries)} entries"
+        )
@@ -1,16 +1,41 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import traceback
 
-from malone.tools.registry import ToolRegistry
+from malone.llm.base import ToolCall
+from malone.tools.base import BaseTool
+from malone.tools.cache import ResultCache
+from malone.tools.jobs import JobLimitError, JobManager
+from malone.tools.registry import ToolRegistry, ToolSchemas
+from malone.tools.shaping import ResultShaper
 
 
 class ToolExecutor:
-    """Executes tool calls from the LLM and returns results."""
+    """Executes tool calls from the LLM and returns results.
 
-    def __init__(self, registry: ToolRegistry):
+    Calls run as independent tasks so one round's calls execute
+    concurrently, subject to each tool's timeout and concurrency limit.
+    Tools marked background are handed to the JobManager and return a
+    job handle immediately. Tools with a cache_ttl are served from the
+    ResultCache when one is given, and a ResultShaper fits results into
+    a token budget before they reach the conversation.
+    """
+
+    def __init__(
+        self,
+        registry: ToolRegistry,
+        jobs: JobManager | None = None,
+        cache: ResultCache | None = None,
+        shaper: ResultShaper | None = None,
+    ):
         self.registry = registry
+        self.jobs = jobs
+        self.cache = cache
+        self.shaper = shaper
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._tasks: set[asyncio.Task[str]] = set()
 
     async def execute(self, tool_name: str, arguments: dict) -> str:
         """Execute a tool by name and return the result as a string."""
@@ -18,12 +43,90 @@ class ToolExecutor:
         if tool is None:
             return f"Error: Unknown tool '{tool_name}'. Available: {self.registry.list_tools()}"
 
+        if tool.background and self.jobs is not None:
+            return self._start_job(tool, arguments)
+
+        if self.cache is not None and tool.cache_ttl:
+            try:
+                key = tool.cache_key(**arguments)
+            except Exception as e:
+                return f"Error executing {tool_name}: {e}"
+            if key is not None:
+                return await self.cache.get_or_run(
+                    tool_name, key, tool.cache_ttl, lambda: self._run(tool, arguments)
+                )
+
+        result = await self._run(tool, arguments)
+        if self.cache is not None and tool.invalidates:
+            # Even failed calls may have changed something
+            self.cache.invalidate(*tool.invalidates)
+        return result
+
+    async def _run(self, tool: BaseTool, arguments: dict) -> str:
+        result = await self._call(tool, arguments)
+        if self.shaper is not None:
+            result = await self.shaper.shape(tool, result)
+        return result
+
+    async def _call(self, tool: BaseTool, arguments: dict) -> str:
+        tool_name = tool.name
+        semaphore = self._get_semaphore(tool)
         try:
-            result = await tool.execute(**arguments)
+            if semaphore is None:
+                result = await asyncio.wait_for(tool.execute(**arguments), tool.timeout)
+            else:
+                async with semaphore:
+                    result = await asyncio.wait_for(
+                        tool.execute(**arguments), tool.timeout
+                    )
             return str(result)
+        except asyncio.TimeoutError:
+            msg = f"Error: {tool_name} timed out after {tool.timeout:g} seconds"
+            if not tool.side_effect_free:
+                msg += " (the action may still have taken effect)"
+            return msg
         except Exception as e:
             return f"Error executing {tool_name}: {e}\n{traceback.format_exc()}"
 
-    def get_tool_schemas(self) -> list[dict]:
-        """Return OpenAI-compatible tool schemas."""
-        return self.registry.get_all_schemas()
+    def start(self, tool_call: ToolCall) -> asyncio.Task[str]:
+        """Start executing a tool call in the background and return its task."""
+        task = asyncio.create_task(
+            self.execute(tool_call.name, tool_call.arguments),
+            name=f"tool:{tool_call.name}:{tool_call.id}",
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def cancel_all(self):
+        """Cancel every in-flight tool call (e.g. when a turn is aborted)."""
+        for task in list(self._tasks):
+            task.cancel()
+
+    def _start_job(self, tool: BaseTool, arguments: dict) -> str:
+        description = ", ".join(f"{k}={v}" for k, v in arguments.items())[:120]
+        try:
+            job = self.jobs.submit(
+                tool.name, description, lambda: self._run(tool, arguments)
+            )
+        except JobLimitError as e:
+            return f"Error: {e}. Check job_status or cancel a job first."
+        return (
+            f"Started background job {job.id} for {tool.name}. "
+            "Use job_status or job_output to check on it; "
+            "the user will be notified when it finishes."
+        )
+
+    def get_tool_schemas(self, names: tuple[str, ...] | None = None) -> ToolSchemas:
+        """Return OpenAI-compatible tool schemas (all tools, or just names)."""
+        return self.registry.get_schemas(names)
+
+    def _get_semaphore(self, tool: BaseTool) -> asyncio.Semaphore | None:
+        if tool.max_concurrency is None:
+            return None
+        key = tool.concurrency_group or tool.name
+        semaphore = self._semaphores.get(key)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(tool.max_concurrency)
+            self._semaphores[key] = semaphore
+        return semaphore
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from malone.config.settings import get_settings
+
+
+class JobLimitError(Exception):
+    """Raised when too many background jobs are already running."""
+
+
+class OutputBuffer:
+    """Keeps the most recent max_chars of streamed output."""
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self._chunks: deque[str] = deque()
+        self._size = 0
+        self.dropped = 0
+
+    def append(self, text: str):
+        if not text:
+            return
+        self._chunks.append(text)
+        self._size += len(text)
+        while self._size > self.max_chars and len(self._chunks) > 1:
+            old = self._chunks.popleft()
+            self._size -= len(old)
+            self.dropped += len(old)
+
+    def text(self) -> str:
+        return "".join(self._chunks)[-self.max_chars:]
+
+
+@dataclass
+class Job:
+    id: str
+    tool_name: str
+    description: str
+    output: OutputBuffer
+    started: float = field(default_factory=time.monotonic)
+    finished: float | None = None
+    status: str = "running"  # running, succeeded, failed, cancelled
+    result: str = ""
+    task: asyncio.Task | None = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    def summary(self) -> str:
+        return (
+            f"{self.id}: {self.tool_name} {self.status} "
+            f"({self.elapsed:.0f}s) - {self.description}"
+        )
+
+
+# The job whose coroutine is currently running, so tools can stream progress
+_current_job: ContextVar[Job | None] = ContextVar("current_job", default=None)
+
+
+def report_output(text: str):
+    """Append streamed output to the calling background job, if any."""
+    job = _current_job.get()
+    if job is not None:
+        job.output.append(text)
+
+
+class JobManager:
+    """Runs long tool calls in the background and tracks their progress."""
+
+    def __init__(
+        self,
+        max_running: int = 2,
+        retention: float = 3600.0,
+        max_finished: int = 20,
+        max_output_chars: int = 20000,
+    ):
+        self.max_running = max_running
+        self.retention = retention
+        self.max_finished = max_finished
+        self.max_output_chars = max_output_chars
+        # Called with each job when it finishes (e.g. to announce it)
+        self.on_complete: Callable[[Job], None] | None = None
+        self._jobs: dict[str, Job] = {}
+        self._ids = itertools.count(1)
+
+    def submit(
+        self, tool_name: str, description: str, run: Callable[[], Awaitable[str]]
+    ) -> Job:
+        """Start run() as a background job and return its handle."""
+        self._prune()
+        running = sum(1 for j in self._jobs.values() if j.status == "running")
+        if running >= self.max_running:
+            raise JobLimitError(
+                f"{running} background jobs already running (limit {self.max_running})"
+            )
+
+        job = Job(
+            id=f"job-{next(self._ids)}",
+            tool_name=tool_name,
+            description=description,
+            output=OutputBuffer(self.max_output_chars),
+        )
+        self._jobs[job.id] = job
+        job.task = asyncio.create_task(self._run(job, run), name=job.id)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        self._prune()
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> list[Job]:
+        self._prune()
+        return list(self._jobs.values())
+
+    def cancel(self, job_id: str) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None or job.task is None or job.task.done():
+            return False
+        job.task.cancel()
+        return True
+
+    def cancel_all(self):
+        for job in self._jobs.values():
+            if job.task is not None and not job.task.done():
+                job.task.cancel()
+
+    async def _run(self, job: Job, run: Callable[[], Awaitable[str]]):
+        _current_job.set(job)
+        try:
+            job.result = await run()
+            job.status = "failed" if job.result.startswith("Error") else "succeeded"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+        except Exception as e:
+            job.result = f"Error: {e}"
+            job.status = "failed"
+        finally:
+            job.finished = time.monotonic()
+
+        if self.on_complete is not None:
+            try:
+                self.on_complete(job)
+            except Exception as e:
+                print(f"  [Jobs: completion callback failed: {e}]")
+
+    def _prune(self):
+        """Forget finished jobs past retention or beyond max_finished."""
+        now = time.monotonic()
+        finished = sorted(
+            (j for j in self._jobs.values() if j.finished is not None),
+            key=lambda j: j.finished,
+        )
+        excess = len(finished) - self.max_finished
+        for i, job in enumerate(finished):
+            if i < excess or now - job.finished > self.retention:
+                del self._jobs[job.id]
+
+
+@lru_cache
+def get_job_manager() -> JobManager:
+    """Return the app-wide job manager."""
+    config = get_settings().jobs
+    return JobManager(
+        max_running=config.max_running,
+        retention=config.retention,
+        max_finished=config.max_finished,
+        max_output_chars=config.max_output_chars,
+    )
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import hashlib
+import importlib
+import inspect
+import json
+import pkgutil
+import time
+from pathlib import Path
+from typing import Any
+
+from malone.tools.base import BaseTool
+
+MANIFEST_NAME = "manifest.json"
+
+# Execution policy attributes copied into the manifest
+_POLICY = (
+    "timeout", "max_concurrency", "concurrency_group",
+    "side_effect_free", "background", "keywords", "cache_ttl", "invalidates",
+    "result_budget",
+)
+
+
+def module_hash(path: str | Path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()[:16]
+
+
+def package_modules(package_path: str) -> dict[str, Path]:
+    """Map each module in a package to its source file."""
+    package = importlib.import_module(package_path)
+    package_dir = Path(package.__path__[0])
+    return {
+        f"{package_path}.{name}": package_dir / f"{name}.py"
+        for _, name, _ in pkgutil.iter_modules(package.__path__)
+    }
+
+
+def import_tools(module_path: str) -> tuple[list[BaseTool], float]:
+    """Import a module and instantiate the BaseTool subclasses it defines.
+
+    Returns the tools and the seconds the import took (only what was not
+    already imported is counted).
+    """
+    start = time.perf_counter()
+    try:
+        module = importlib.import_module(module_path)
+    except Exception as e:
+        print(f"  [Warning: Failed to import {module_path}: {e}]")
+        return [], 0.0
+    elapsed = time.perf_counter() - start
+
+    tools = []
+    for attr_name in dir(module):
+        attr = getattr(module, attr_name)
+        if (
+            isinstance(attr, type)
+            and issubclass(attr, BaseTool)
+            and attr is not BaseTool
+            and not inspect.isabstract(attr)
+            and attr.__module__ == module_path
+        ):
+            try:
+                tools.append(attr())
+            except Exception as e:
+                print(f"  [Warning: Failed to register {attr_name}: {e}]")
+    return tools, elapsed
+
+
+def build_manifest(package_path: str = "malone.tools.builtin") -> dict:
+    """Describe every tool in a package: import path, schema and policy."""
+    modules = {}
+    tools = []
+    for module_path, source in package_modules(package_path).items():
+        if source.exists():
+            modules[module_path] = module_hash(source)
+        tools.extend(import_tools(module_path)[0])
+
+    entries = []
+    for tool in tools:
+        cls = type(tool)
+        entries.append({
+            "name": tool.name,
+            "module": cls.__module__,
+            "class": cls.__qualname__,
+            "description": tool.description,
+            "parameters": tool.parameters,
+            **{attr: getattr(tool, attr) for attr in _POLICY},
+        })
+    return {"package": package_path, "modules": modules, "tools": entries}
+
+
+def write_manifest(manifest: dict, path: str | Path):
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=False)
+        f.write("\n")
+
+
+class LazyTool(BaseTool):
+    """Stand-in for a tool, built from its manifest entry.
+
+    Exposes the name, schema and execution policy without importing the
+    tool's module; the module is imported and the real tool created on
+    the first execute().
+    """
+
+    def __init__(self, entry: dict[str, Any]):
+        self._entry = entry
+        self._tool: BaseTool | None = None
+        self.load_time: float | None = None  # seconds to import and instantiate
+        for attr in _POLICY:
+            if attr in entry:
+                value = entry[attr]
+                if attr in ("keywords", "invalidates"):
+                    value = tuple(value)
+                setattr(self, attr, value)
+
+    @property
+    def name(self) -> str:
+        return self._entry["name"]
+
+    @property
+    def description(self) -> str:
+        return self._entry["description"]
+
+    @property
+    def parameters(self) -> dict:
+        return self._entry["parameters"]
+
+    @property
+    def loaded(self) -> bool:
+        return self._tool is not None
+
+    def load(self) -> BaseTool:
+        if self._tool is None:
+            start = time.perf_counter()
+            module = importlib.import_module(self._entry["module"])
+            self._tool = getattr(module, self._entry["class"])()
+            self.load_time = time.perf_counter() - start
+            print(f"  [Tools: loaded {self.name} in {self.load_time * 1000:.0f}ms]")
+        return self._tool
+
+    def cache_key(self, **kwargs) -> str | None:
+        # Tools may override cache_key, so ask the real one (it is about to run)
+        return self.load().cache_key(**kwargs)
+
+    async def execute(self, **kwargs) -> Any:
+        return await self.load().execute(**kwargs)
+
+
+def load_manifest(package_path: str) -> tuple[list[LazyTool], list[str]]:
+    """Read a package's manifest.
+
+    Returns lazy tools for modules whose source still matches the
+    manifest, plus the modules that are new or changed since it was
+    built (these must be imported to discover their tools).
+    """
+    package = importlib.import_module(package_path)
+    current = package_modules(package_path)
+
+    manifest_path = Path(package.__path__[0]) / MANIFEST_NAME
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (OSError, json.JSONDecodeError):
+        return [], list(current)
+
+    fresh = {
+        module
+        for module, digest in manifest.get("modules", {}).items()
+        if module in current
+        and current[module].exists()
+        and module_hash(current[module]) == digest
+    }
+    tools = [LazyTool(entry) for entry in manifest.get("tools", []) if entry["module"] in fresh]
+    stale = [module for module in current if module not in fresh]
+    return tools, stale
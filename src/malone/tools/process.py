@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+import codecs
+import os
+import signal
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from malone.config.settings import get_settings
+
+# Bounds how many child processes tools may run at once (created lazily so
+# it binds to the running event loop)
+_slots: asyncio.Semaphore | None = None
+
+
+def _get_slots() -> asyncio.Semaphore:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(get_settings().process.max_concurrent)
+    return _slots
+
+
+@dataclass
+class ProcessResult:
+    stdout: str
+    stderr: str
+    returncode: int | None
+    timed_out: bool = False
+    dropped_bytes: int = 0  # output discarded beyond the size cap
+
+    def format(self) -> str:
+        """Render as tool output: stdout, then STDERR and exit code if relevant."""
+        output = self.stdout
+        if self.stderr:
+            output += f"\nSTDERR: {self.stderr}"
+        if self.returncode:
+            output += f"\nExit code: {self.returncode}"
+        if self.dropped_bytes:
+            output += f"\n[output truncated: {self.dropped_bytes} bytes omitted]"
+        return output.strip() or "(no output)"
+
+
+class _CappedBuffer:
+    """Collects a stream's bytes up to a limit, counting what it drops."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.data = bytearray()
+        self.dropped = 0
+
+    def append(self, chunk: bytes):
+        room = self.limit - len(self.data)
+        if room > 0:
+            self.data.extend(chunk[:room])
+        self.dropped += max(len(chunk) - max(room, 0), 0)
+
+
+async def _pump(
+    stream: asyncio.StreamReader,
+    buffer: _CappedBuffer,
+    on_output: Callable[[str], None] | None,
+):
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while True:
+        chunk = await stream.read(4096)
+        if not chunk:
+            break
+        buffer.append(chunk)
+        if on_output is not None:
+            on_output(decoder.decode(chunk))
+
+
+def _kill_group(proc: asyncio.subprocess.Process):
+    """Kill the process and everything it spawned."""
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+async def run_process(
+    args: list[str] | str,
+    *,
+    shell: bool = False,
+    timeout: float | None = 30,
+    cwd: str | None = None,
+    env: dict | None = None,
+    max_output: int | None = None,
+    on_output: Callable[[str], None] | None = None,
+) -> ProcessResult:
+    """Run a child process without blocking the event loop.
+
+    stdout/stderr are read as they arrive (passed to on_output if given) and
+    capped at max_output bytes each. The process runs in its own session so
+    on timeout or cancellation the whole process group is killed.
+    Raises FileNotFoundError if the executable does not exist.
+    """
+    if max_output is None:
+        max_output = get_settings().process.max_output_bytes
+
+    async with _get_slots():
+        if shell:
+            proc = await asyncio.create_subprocess_shell(
+                args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                stdin=asyncio.subprocess.DEVNULL,
+                cwd=cwd,
+                env=env,
+                start_new_session=True,
+            )
+        else:
+            proc = await asyncio.create_subprocess_exec(
+                *args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                stdin=asyncio.subprocess.DEVNULL,
+                cwd=cwd,
+                env=env,
+                start_new_session=True,
+            )
+
+        stdout = _CappedBuffer(max_output)
+        stderr = _CappedBuffer(max_output)
+        timed_out = False
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(
+                    _pump(proc.stdout, stdout, on_output),
+                    _pump(proc.stderr, stderr, on_output),
+                    proc.wait(),
+                ),
+                timeout,
+            )
+        except asyncio.TimeoutError:
+            timed_out = True
+            _kill_group(proc)
+            await proc.wait()
+        except asyncio.CancelledError:
+            _kill_group(proc)
+            raise
+
+    return ProcessResult(
+        stdout=stdout.data.decode(errors="replace"),
+        stderr=stderr.data.decode(errors="replace"),
+        returncode=proc.returncode,
+        timed_out=timed_out,
+        dropped_bytes=stdout.dropped + stderr.dropped,
+    )
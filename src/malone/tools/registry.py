@@ -1,44 +1,137 @@
 from __future__ import annotations
 
-import importlib
-import pkgutil
-from typing import Any
+from collections.abc import Iterable
 
 from malone.tools.base import BaseTool
+from malone.tools.manifest import LazyTool, import_tools, load_manifest, package_modules
+
+
+# Memoized schema sets kept per registry version (one per distinct selection)
+_MAX_SETS = 64
+
+
+class ToolSchemas(tuple):
+    """OpenAI-format schemas for a set of tools, with the Anthropic format precomputed.
+
+    An immutable sequence, since the same object is shared between
+    callers. anthropic holds the same tools in Anthropic format, and key
+    identifies the set and registry version, so clients can cache
+    anything derived from it.
+    """
+
+    anthropic: tuple[dict, ...]
+    key: tuple
+
+    def __new__(cls, openai: list[dict], anthropic: list[dict], key: tuple):
+        schemas = super().__new__(cls, openai)
+        schemas.anthropic = tuple(anthropic)
+        schemas.key = key
+        return schemas
 
 
 class ToolRegistry:
-    """Discovers, registers, and manages available tools."""
+    """Discovers, registers, and manages available tools.
+
+    Each tool's schemas are built once at registration. Schema sets are
+    memoized per tool selection and returned as the same object until a
+    register or unregister bumps the version.
+    """
 
     def __init__(self):
         self._tools: dict[str, BaseTool] = {}
+        self._openai: dict[str, dict] = {}
+        self._anthropic: dict[str, dict] = {}
+        self._sets: dict[tuple | None, ToolSchemas] = {}
+        self._import_times: dict[str, float] = {}  # eagerly imported tools
+        self.version = 0
 
     def register(self, tool: BaseTool):
-        self._tools[tool.name] = tool
+        name = tool.name
+        self._tools[name] = tool
+        self._openai[name] = tool.to_openai_schema()
+        self._anthropic[name] = tool.to_anthropic_schema()
+        self._changed()
+
+    def unregister(self, name: str) -> bool:
+        """Remove a tool; returns False if it wasn't registered."""
+        if self._tools.pop(name, None) is None:
+            return False
+        del self._openai[name]
+        del self._anthropic[name]
+        self._changed()
+        return True
+
+    def _changed(self):
+        self.version += 1
+        self._sets.clear()
 
     def get(self, name: str) -> BaseTool | None:
         return self._tools.get(name)
 
-    def get_all_schemas(self) -> list[dict]:
+    def get_all_schemas(self) -> ToolSchemas:
         """Return OpenAI-compatible tool schemas for LLM."""
-        return [tool.to_openai_schema() for tool in self._tools.values()]
+        return self.get_schemas(None)
+
+    def get_schemas(self, names: Iterable[str] | None) -> ToolSchemas:
+        """Return schemas for the named tools (all if None), in registry order.
+
+        Repeated calls with the same names return the same object until
+        the registry changes.
+        """
+        key = names if names is None or isinstance(names, tuple) else tuple(names)
+        schemas = self._sets.get(key)
+        if schemas is None:
+            wanted = self._tools.keys() if key is None else set(key)
+            selected = [name for name in self._tools if name in wanted]
+            schemas = ToolSchemas(
+                [self._openai[name] for name in selected],
+                [self._anthropic[name] for name in selected],
+                key=(self.version, *selected),
+            )
+            if len(self._sets) >= _MAX_SETS:
+                del self._sets[next(iter(self._sets))]  # oldest selection
+            self._sets[key] = schemas
+        return schemas
 
     def list_tools(self) -> list[str]:
         return list(self._tools.keys())
 
-    def auto_discover(self, package_path: str = "malone.tools.builtin"):
-        """Automatically discover and register tool classes from a package."""
-        package = importlib.import_module(package_path)
-        for _, module_name, _ in pkgutil.iter_modules(package.__path__):
-            module = importlib.import_module(f"{package_path}.{module_name}")
-            for attr_name in dir(module):
-                attr = getattr(module, attr_name)
-                if (
-                    isinstance(attr, type)
-                    and issubclass(attr, BaseTool)
-                    and attr is not BaseTool
-                ):
-                    try:
-                        self.register(attr())
-                    except Exception as e:
-                        print(f"  [Warning: Failed to register {attr_name}: {e}]")
+    def auto_discover(self, package_path: str = "malone.tools.builtin", lazy: bool = True):
+        """Register the tools of a package.
+
+        With lazy, tools listed in the package's manifest are registered as
+        LazyTool stand-ins and their modules imported on first use; only
+        modules that are missing from or changed since the manifest are
+        imported now. Otherwise every module is imported up front.
+        """
+        if lazy:
+            tools, stale = load_manifest(package_path)
+            for tool in tools:
+                self.register(tool)
+            if stale:
+                print(
+                    f"  [Tools: manifest missing or outdated for {len(stale)} module(s), "
+                    "importing them; run scripts/build_tool_manifest.py]"
+                )
+        else:
+            stale = list(package_modules(package_path))
+
+        for module_path in stale:
+            tools, elapsed = import_tools(module_path)
+            for tool in tools:
+                self.register(tool)
+                self._import_times[tool.name] = elapsed
+
+    def import_report(self) -> str:
+        """Per tool: how long its module took to import, or that it isn't loaded yet."""
+        lines = []
+        for name, tool in self._tools.items():
+            if isinstance(tool, LazyTool):
+                seconds = tool.load_time
+                how = "lazy"
+            else:
+                seconds = self._import_times.get(name)
+                how = "eager"
+            took = "not loaded" if seconds is None else f"{seconds * 1000:7.1f} ms"
+            lines.append(f"  {name:<24} {how:<6} {took}")
+        return "\n".join(lines)
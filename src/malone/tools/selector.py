@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import math
+import re
+from collections import Counter
+
+from malone.tools.base import BaseTool
+from malone.tools.registry import ToolRegistry
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Frequent words that say nothing about which tool is wanted
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "e", "for",
+    "from", "g", "how", "i", "if", "in", "is", "it", "me", "my", "of", "on",
+    "or", "please", "so", "the", "this", "to", "use", "what", "with", "you",
+}
+
+
+def _stem(word: str) -> str:
+    """Strip common suffixes so 'turning'/'turn' and 'lights'/'light' match."""
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(word) > len(suffix) + 2 and word.endswith(suffix) and not word.endswith("ss"):
+            return word[: -len(suffix)]
+    return word
+
+
+def terms(text: str) -> list[str]:
+    return [_stem(w) for w in _WORD_RE.findall(text.lower()) if w not in _STOPWORDS]
+
+
+def _tool_text(tool: BaseTool) -> str:
+    """Everything that describes a tool: name, keywords, description, parameters."""
+    parts = [tool.name.replace("_", " "), " ".join(tool.keywords), tool.description]
+    for name, spec in tool.parameters.get("properties", {}).items():
+        parts.append(name.replace("_", " "))
+        parts.append(spec.get("description", ""))
+    return " ".join(parts)
+
+
+class ToolSelector:
+    """Picks the tool schemas worth sending for one user turn.
+
+    Tools are indexed once with BM25 over their name, keywords,
+    description and parameter descriptions. Each turn sends the core set
+    plus the best-scoring tools for the utterance; a picked tool brings
+    the rest of its concurrency group along (e.g. all browser tools), as
+    they are used together. Tools the model asks for via
+    request_more_tools are added for the rest of the turn.
+    """
+
+    def __init__(
+        self,
+        registry: ToolRegistry,
+        core: list[str] | None = None,
+        limit: int = 4,
+        min_score: float = 1.0,
+        relative_score: float = 0.4,
+        k1: float = 1.2,
+        b: float = 0.75,
+    ):
+        self.registry = registry
+        self.core = list(core or [])
+        self.limit = limit
+        self.min_score = min_score
+        self.relative_score = relative_score
+        self.k1 = k1
+        self.b = b
+        self._requested: set[str] = set()
+        self._selected: list[str] = []
+        self._indexed = -1  # registry version the index was built from
+        self._current: tuple[str, ...] | None = None
+        self._docs: dict[str, Counter] = {}
+        self._lengths: dict[str, int] = {}
+        self._idf: dict[str, float] = {}
+        self._avg_length = 1.0
+
+    def index(self):
+        """(Re)build the index from the registry."""
+        self._docs = {
+            name: Counter(terms(_tool_text(self.registry.get(name))))
+            for name in self.registry.list_tools()
+        }
+        self._lengths = {name: sum(doc.values()) for name, doc in self._docs.items()}
+        self._avg_length = max(sum(self._lengths.values()) / max(len(self._docs), 1), 1.0)
+        df = Counter(term for doc in self._docs.values() for term in doc)
+        n = len(self._docs)
+        self._idf = {
+            term: math.log(1 + (n - count + 0.5) / (count + 0.5)) for term, count in df.items()
+        }
+        self._indexed = self.registry.version
+
+    def rank(self, query: str) -> list[tuple[str, float]]:
+        """Score every tool against a query, best first."""
+        if self._indexed != self.registry.version:
+            self.index()
+        query_terms = set(terms(query))
+        scores = []
+        for name, doc in self._docs.items():
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[name] / self._avg_length)
+            score = sum(
+                self._idf[t] * doc[t] * (self.k1 + 1) / (doc[t] + norm)
+                for t in query_terms
+                if t in doc
+            )
+            if score > 0:
+                scores.append((name, round(score, 3)))
+        scores.sort(key=lambda item: (-item[1], item[0]))
+        return scores
+
+    def begin_turn(self, text: str) -> tuple[str, ...]:
+        """Select tools for a new user turn and return their names."""
+        self._requested = set()
+        ranked = self.rank(text)[: self.limit]
+        # Weak matches far behind the best one are mostly shared filler words
+        cutoff = max(self.min_score, ranked[0][1] * self.relative_score) if ranked else 0.0
+        picked = [name for name, score in ranked if score >= cutoff]
+        self._selected = self._expand(picked)
+        self._current = None
+        return self.selected()
+
+    def request(self, names: list[str]) -> list[str]:
+        """Add tools for the rest of the turn; returns the names that were added."""
+        known = [n for n in self._expand(names) if self.registry.get(n) is not None]
+        added = [n for n in known if n not in self._requested and n not in self.selected()]
+        self._requested.update(known)
+        self._current = None
+        return added
+
+    def selected(self) -> tuple[str, ...]:
+        """Names of the tools to send this round, in registry order.
+
+        Returns the same tuple until the selection or registry changes, so
+        the registry's memoized schema set is hit without rebuilding keys.
+        """
+        if self._current is None or self._indexed != self.registry.version:
+            if self._indexed != self.registry.version:
+                self.index()
+            wanted = set(self.core) | set(self._selected) | self._requested
+            self._current = tuple(n for n in self.registry.list_tools() if n in wanted)
+        return self._current
+
+    def _expand(self, names: list[str]) -> list[str]:
+        groups = {
+            self.registry.get(n).concurrency_group
+            for n in names
+            if self.registry.get(n) is not None
+        } - {None}
+        expanded = list(names)
+        for name in self.registry.list_tools():
+            tool = self.registry.get(name)
+            if tool.concurrency_group in groups and name not in expanded:
+                expanded.append(name)
+        return expanded
+
+
+class RequestMoreToolsTool(BaseTool):
+    """Lets the model ask for tools that weren't selected for this turn."""
+
+    timeout = 5.0
+    side_effect_free = True
+
+    def __init__(self, selector: ToolSelector):
+        self.selector = selector
+
+    @property
+    def name(self) -> str:
+        return "request_more_tools"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Only a few relevant tools are loaded per request. If you need a "
+            "capability that isn't available (smart home, shell, SSH, Kubernetes, "
+            "web browser, code editing, background jobs), describe it here and "
+            "matching tools will be added for your next step."
+        )
+
+    @property
+    def parameters(self) -> dict:
+        return {
+            "type": "object",
+            "properties": {
+                "need": {
+                    "type": "string",
+                    "description": "What you need to do, e.g. 'control a light' or 'read a web page'",
+                },
+            },
+            "required": ["need"],
+        }
+
+    async def execute(self, need: str) -> str:
+        ranked = [name for name, _ in self.selector.rank(need) if name != self.name]
+        added = self.selector.request(ranked[:3])
+        if not added:
+            available = ", ".join(n for n in self.selector.selected() if n != self.name)
+            return f"No additional tools match '{need}'. Available: {available}"
+        lines = [
+            f"  {name}: {self.selector.registry.get(name).description}" for name in added
+        ]
+        return "Added tools:\n" + "\n".join(lines)
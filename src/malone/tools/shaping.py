@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import itertools
+import re
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+
+from malone.llm.base import LLMClient
+from malone.tokens import estimate_tokens
+from malone.tools.base import BaseTool
+
+# Lines that differ only in numbers (timestamps, counters, ids) count as repeats
+_DIGITS_RE = re.compile(r"\d+")
+
+Summarizer = Callable[[str], Awaitable[str]]
+
+
+class SpillStore:
+    """Keeps full tool outputs out of the conversation, bounded by count and size."""
+
+    def __init__(self, max_items: int = 32, max_chars: int = 4_000_000):
+        self.max_items = max_items
+        self.max_chars = max_chars
+        self._outputs: OrderedDict[str, tuple[str, list[str]]] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+        self._chars = 0
+        self._ids = itertools.count(1)
+
+    def put(self, tool_name: str, text: str) -> str:
+        output_id = f"out-{next(self._ids)}"
+        self._outputs[output_id] = (tool_name, text.splitlines())
+        self._sizes[output_id] = len(text)
+        self._chars += len(text)
+        while len(self._outputs) > 1 and (
+            len(self._outputs) > self.max_items or self._chars > self.max_chars
+        ):
+            oldest, _ = self._outputs.popitem(last=False)
+            self._chars -= self._sizes.pop(oldest)
+        return output_id
+
+    def get(self, output_id: str) -> tuple[str, list[str]] | None:
+        """Return (tool name, lines) of a stored output."""
+        return self._outputs.get(output_id)
+
+
+def collapse_repeats(lines: list[str], min_run: int = 3) -> list[str]:
+    """Collapse runs of identical or number-only-different lines."""
+    out: list[str] = []
+    for key, group in itertools.groupby(lines, key=lambda line: _DIGITS_RE.sub("#", line)):
+        run = list(group)
+        if len(run) >= min_run and key.strip():
+            out.append(run[0])
+            out.append(f"[... {len(run) - 1} more similar lines ...]")
+        else:
+            out.extend(run)
+    return out
+
+
+def head_tail(lines: list[str], budget: int, head_share: float = 0.4) -> tuple[list[str], list[str]]:
+    """Split lines into a head and tail that together fit a token budget.
+
+    The tail gets the larger share since errors and results tend to come
+    last. Single lines longer than their share are cut.
+    """
+    def take(source, share: int) -> list[str]:
+        taken, used = [], 0
+        if share <= 0:
+            return taken
+        for line in source:
+            cost = estimate_tokens(line) + 1
+            if used + cost > share:
+                if not taken:
+                    # One huge line: keep a prefix of it (~4 chars per token)
+                    taken.append(line[: share * 4] + " [...]")
+                break
+            taken.append(line)
+            used += cost
+        return taken
+
+    head = take(lines, int(budget * head_share))
+    rest = lines[len(head):]
+    tail = take(reversed(rest), budget - int(budget * head_share))
+    tail.reverse()
+    return head, tail
+
+
+class ResultShaper:
+    """Fits tool results into a token budget before they enter the context.
+
+    Oversized results have repeated lines collapsed, then are cut to a
+    head and tail around an omission marker, or summarized by the
+    optional summarizer when very large. The full output goes to the
+    SpillStore so the model can page through it with read_tool_output.
+    """
+
+    def __init__(
+        self,
+        spill: SpillStore,
+        budget: int = 1000,
+        summarizer: Summarizer | None = None,
+        summarize_over: int = 4000,
+    ):
+        self.spill = spill
+        self.budget = budget
+        self.summarizer = summarizer
+        self.summarize_over = summarize_over
+
+    async def shape(self, tool: BaseTool, result: str) -> str:
+        budget = self.budget if tool.result_budget is None else tool.result_budget
+        if not budget:
+            return result
+        tokens = estimate_tokens(result)
+        if tokens <= budget:
+            return result
+
+        # Whatever shaping drops (even rows that only differ in numbers)
+        # stays reachable through the spilled original
+        output_id = self.spill.put(tool.name, result)
+        where = (
+            f"full output ({len(result.splitlines())} lines, ~{tokens} tokens) "
+            f"saved as '{output_id}'; use read_tool_output to page or search it"
+        )
+
+        lines = collapse_repeats(result.splitlines())
+        collapsed = "\n".join(lines)
+        if estimate_tokens(collapsed) <= budget:
+            return f"{collapsed}\n[Similar lines collapsed; {where}]"
+
+        if self.summarizer is not None and tokens >= self.summarize_over:
+            try:
+                summary = await self.summarizer(collapsed)
+            except Exception as e:
+                print(f"  [Result shaping: summarizer failed: {e}]")
+            else:
+                head, tail = head_tail(summary.splitlines(), budget // 2)
+                _, last = head_tail(lines, budget // 2, head_share=0.0)
+                parts = [f"[Summary; {where}]", *head, *tail, "[Last lines]", *last]
+                return "\n".join(parts)
+
+        head, tail = head_tail(lines, budget)
+        omitted = len(lines) - len(head) - len(tail)
+        return "\n".join([*head, f"[... {omitted} lines omitted; {where} ...]", *tail])
+
+
+def make_llm_summarizer(llm: LLMClient, max_input_tokens: int = 6000) -> Summarizer:
+    """Summarize oversized output with a (local, fast) LLM."""
+
+    async def summarize(text: str) -> str:
+        lines = text.splitlines()
+        head, tail = head_tail(lines, max_input_tokens)
+        if len(head) + len(tail) < len(lines):
+            head.append("[...]")
+        excerpt = "\n".join([*head, *tail])
+        response = await llm.chat([
+            {
+                "role": "system",
+                "content": (
+                    "Summarize this command or tool output for another assistant in "
+                    "under 120 words. Keep errors, warnings, counts, names and "
+                    "anything that looks abnormal. No preamble."
+                ),
+            },
+            {"role": "user", "content": excerpt},
+        ])
+        return response.content.strip()
+
+    return summarize
+
+
+class ReadToolOutputTool(BaseTool):
+    """Pages through or searches tool outputs that were too large for the context."""
+
+    timeout = 5.0
+    side_effect_free = True
+    result_budget = 0  # pages are already bounded by max_lines
+
+    def __init__(self, spill: SpillStore, max_chars: int = 6000):
+        self.spill = spill
+        self.max_chars = max_chars
+
+    @property
+    def name(self) -> str:
+        return "read_tool_output"
+
+    @property
+    def description(self) -> str:
+        return (
+            "Read part of a large tool output that was shortened, by its output id "
+            "(e.g. 'out-3'). Page with start_line/max_lines or filter with grep."
+        )
+
+    @property
+    def parameters(self) -> dict:
+        return {
+            "type": "object",
+            "properties": {
+                "output_id": {"type": "string", "description": "The id, e.g. 'out-3'"},
+                "start_line": {
+                    "type": "integer",
+                    "description": "First line to return (0-based, negative counts from the end)",
+                },
+                "max_lines": {"type": "integer", "description": "Lines to return (default 80)"},
+                "grep": {
+                    "type": "string",
+                    "description": "Only return lines matching this regex (case-insensitive)",
+                },
+            },
+            "required": ["output_id"],
+        }
+
+    async def execute(
+        self, output_id: str, start_line: int = 0, max_lines: int = 80, grep: str = ""
+    ) -> str:
+        stored = self.spill.get(output_id)
+        if stored is None:
+            return f"No stored output '{output_id}' (it may have expired)."
+        _, lines = stored
+
+        numbered = list(enumerate(lines))
+        if grep:
+            try:
+                pattern = re.compile(grep, re.IGNORECASE)
+            except re.error as e:
+                return f"Error: invalid grep pattern: {e}"
+            numbered = [(n, line) for n, line in numbered if pattern.search(line)]
+        if start_line < 0:
+            start_line = max(len(numbered) + start_line, 0)
+        page = numbered[start_line:start_line + max(1, min(max_lines, 500))]
+
+        out, chars = [], 0
+        for n, line in page:
+            chars += len(line)
+            if chars > self.max_chars:
+                break
+            out.append(f"{n}: {line}")
+        header = f"{output_id}: {len(numbered)} {'matching ' if grep else ''}lines"
+        if not out:
+            return header + ", none in range."
+        shown = page[: len(out)]
+        header += f", showing {shown[0][0]}-{shown[-1][0]}"
+        if len(out) < len(page):
+            out.append("[... page cut at size limit; request fewer lines ...]")
+        return header + "\n" + "\n".join(out)
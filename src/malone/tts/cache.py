@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+# Sentence ends: ., ! or ? followed by space and what starts a new sentence
+# (so "e.g. this" and "3.5" stay whole)
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+
+
+def split_sentences(text: str) -> list[str]:
+    return [s for s in (" ".join(part.split()) for part in _SENTENCE_END_RE.split(text)) if s]
+
+
+class PhraseCache:
+    """Synthesized audio per (voice, sentence), persisted across runs.
+
+    Each entry is a raw PCM file that is memory-mapped on first use, so a
+    hit is a memoryview of the page cache with no copy. Files past the
+    size budget are deleted least recently used first; mappings still in
+    use (e.g. being played) stay valid after their file is deleted.
+    """
+
+    def __init__(self, path: str | Path, max_bytes: int = 64 * 2**20, max_chars: int = 200):
+        self.dir = Path(path)
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars  # longer sentences rarely repeat
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._maps: dict[str, mmap.mmap] = {}
+        # file name -> size, least recently used first (mtime is the last use)
+        files = sorted(self.dir.glob("*.pcm"), key=lambda p: p.stat().st_mtime)
+        self._sizes: OrderedDict[str, int] = OrderedDict(
+            (p.name, p.stat().st_size) for p in files
+        )
+        self._bytes = sum(self._sizes.values())
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._sizes)
+
+    def _name(self, voice: str, sentence: str) -> str:
+        key = f"{voice}\n{' '.join(sentence.split())}"
+        return hashlib.sha1(key.encode()).hexdigest() + ".pcm"
+
+    def cacheable(self, sentence: str) -> bool:
+        return 0 < len(sentence) <= self.max_chars
+
+    def has(self, voice: str, sentence: str) -> bool:
+        return self._name(voice, sentence) in self._sizes
+
+    def get(self, voice: str, sentence: str) -> memoryview | None:
+        name = self._name(voice, sentence)
+        with self._lock:
+            if name not in self._sizes:
+                self.misses += 1
+                return None
+            view = self._map(name)
+            if view is None:
+                self.misses += 1
+                return None
+            self._sizes.move_to_end(name)
+            self.hits += 1
+        try:
+            os.utime(self.dir / name)
+        except OSError:
+            pass
+        return view
+
+    def _map(self, name: str) -> memoryview | None:
+        mapped = self._maps.get(name)
+        if mapped is None:
+            try:
+                with open(self.dir / name, "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # Deleted behind our back, or empty
+                self._bytes -= self._sizes.pop(name, 0)
+                return None
+            self._maps[name] = mapped
+        return memoryview(mapped)
+
+    def put(self, voice: str, sentence: str, audio: bytes | memoryview):
+        if not audio or not self.cacheable(sentence):
+            return
+        name = self._name(voice, sentence)
+        path = self.dir / name
+        tmp = path.with_suffix(".tmp")
+        try:
+            tmp.write_bytes(audio)
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"  [TTS cache: failed to write {path}: {e}]")
+            return
+        with self._lock:
+            self._bytes += len(audio) - self._sizes.pop(name, 0)
+            self._sizes[name] = len(audio)
+            self._maps.pop(name, None)
+            while self._bytes > self.max_bytes and len(self._sizes) > 1:
+                old, size = self._sizes.popitem(last=False)
+                self._bytes -= size
+                # Dropped, not closed: a caller may still hold a view of it
+                self._maps.pop(old, None)
+                (self.dir / old).unlink(missing_ok=True)
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return (
+            f"TTS cache: {self.hits}/{total} sentences ({rate:.0%}), "
+            f"{len(self._sizes)} phrases, {self._bytes / 2**20:.1f} MiB"
+        )
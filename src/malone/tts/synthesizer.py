@@ -1,34 +1,165 @@
 from __future__ import annotations
 
 import asyncio
+import queue
+import threading
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
+import onnxruntime
 from piper import PiperVoice
 
+from malone.cpu import EngineThreads, StageGate, pin_current_thread, pinned
+from malone.tts.cache import PhraseCache, split_sentences
+
 VOICE_DIR = "/home/dennis/.local/share/piper-voices"
 
 
 class TTSSynthesizer:
-    """Text-to-speech using Piper TTS (local, fast, offline)."""
+    """Text-to-speech using Piper TTS (local, fast, offline).
+
+    Text is synthesized sentence by sentence on a pool of Piper voices
+    (one ONNX session each; inference releases the GIL, so they run in
+    parallel) and streamed back in order. With a PhraseCache each
+    sentence's audio is reused across replies. With a thread budget the
+    sessions use its thread counts and cores, and half the pool pauses
+    while a transcription is running. The voices can be unloaded to free
+    memory; the next synthesis (or load()) brings them back.
+    """
 
     def __init__(
         self,
         voice: str = "en_GB-alba-medium",
         rate: str = "+0%",
         volume: str = "+0%",
+        cache: PhraseCache | None = None,
+        workers: int = 2,
+        threads: EngineThreads | None = None,
+        gate: StageGate | None = None,
     ):
-        model_path = f"{VOICE_DIR}/{voice}.onnx"
-        self._voice = PiperVoice.load(model_path)
-        self.sample_rate = self._voice.config.sample_rate
+        self.model_path = f"{VOICE_DIR}/{voice}.onnx"
+        self.voice = voice
+        self.workers = max(workers, 1)
+        self.threads = threads
+        self.gate = gate or StageGate()
+        self._lock = threading.Lock()
+        self._voices: queue.SimpleQueue[PiperVoice] | None = None
+        self.load()
+        self.cache = cache
+        cores = threads.cores if threads else ()
+        # With one intra-op thread ONNX runs on the calling (pool) thread
+        self._executor = ThreadPoolExecutor(
+            self.workers,
+            thread_name_prefix="piper",
+            initializer=pin_current_thread,
+            initargs=(cores,),
+        )
+
+    def load(self) -> queue.SimpleQueue[PiperVoice]:
+        """Load the voice pool if it was unloaded; return it."""
+        with self._lock:
+            if self._voices is not None:
+                return self._voices
+            voices: queue.SimpleQueue[PiperVoice] = queue.SimpleQueue()
+            for _ in range(self.workers):
+                loaded = PiperVoice.load(self.model_path)
+                if self.threads is not None:
+                    loaded.session = self._session(self.model_path, self.threads)
+                voices.put(loaded)
+            self.sample_rate = loaded.config.sample_rate
+            self._voices = voices
+            return voices
 
-    async def synthesize(self, text: str) -> bytes:
+    def unload(self):
+        # Renders in flight hold the old pool and finish normally
+        with self._lock:
+            self._voices = None
+
+    @staticmethod
+    def _session(model_path: str, threads: EngineThreads) -> onnxruntime.InferenceSession:
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = threads.intra
+        options.inter_op_num_threads = threads.inter
+        with pinned(threads.cores):  # the session's thread pool starts here
+            return onnxruntime.InferenceSession(
+                model_path, sess_options=options, providers=["CPUExecutionProvider"]
+            )
+
+    async def synthesize(self, text: str) -> bytes | memoryview:
         """Convert text to raw PCM int16 audio bytes."""
-        return await asyncio.to_thread(self._synthesize_sync, text)
-
-    def _synthesize_sync(self, text: str) -> bytes:
-        """Synchronous synthesis (Piper is CPU-bound)."""
-        audio_chunks = []
-        for chunk in self._voice.synthesize(text):
-            int_audio = (chunk.audio_float_array * 32767).astype(np.int16)
-            audio_chunks.append(int_audio.tobytes())
-        return b"".join(audio_chunks)
+        parts = [part async for part in self.stream(text)]
+        if len(parts) == 1:
+            return parts[0]  # a cache hit stays a zero-copy view
+        return b"".join(parts)
+
+    async def stream(self, text: str) -> AsyncIterator[bytes | memoryview]:
+        """Yield each sentence's audio in order, as soon as it and those before it are ready.
+
+        All sentences are queued at once, so later ones synthesize while
+        earlier ones play.
+        """
+        loop = asyncio.get_running_loop()
+        pending = [
+            loop.run_in_executor(self._executor, self._sentence, sentence)
+            for sentence in split_sentences(text)
+        ]
+        try:
+            for future in pending:
+                yield await future
+        finally:
+            # Interrupted: don't synthesize what won't be played
+            for future in pending:
+                future.cancel()
+
+    async def prewarm(self, phrases: list[str]):
+        """Synthesize phrases into the cache ahead of their first use."""
+        if self.cache is None:
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._prewarm_sync, phrases)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _prewarm_sync(self, phrases: list[str]):
+        rendered = 0
+        for phrase in phrases:
+            for sentence in split_sentences(phrase):
+                if not self.cache.cacheable(sentence) or self.cache.has(self.voice, sentence):
+                    continue
+                try:
+                    self.cache.put(self.voice, sentence, self._render(sentence))
+                except Exception as e:
+                    print(f"  [TTS cache: failed to prewarm '{sentence}': {e}]")
+                    return
+                rendered += 1
+        if rendered:
+            print(f"  [TTS cache: prewarmed {rendered} phrases]")
+
+    def _sentence(self, sentence: str) -> bytes | memoryview:
+        if self.cache is None or not self.cache.cacheable(sentence):
+            return self._render(sentence)
+        audio = self.cache.get(self.voice, sentence)
+        if audio is None:
+            audio = self._render(sentence)
+            self.cache.put(self.voice, sentence, audio)
+        return audio
+
+    def _render(self, text: str) -> memoryview:
+        """Synchronous synthesis (Piper is CPU-bound) on a free voice from the pool."""
+        voices = self.load()
+        with self.gate.slot("tts", self.workers, yields_to=("stt",)):
+            voice = voices.get()
+            try:
+                chunks = [chunk.audio_float_array for chunk in voice.synthesize(text)]
+            finally:
+                voices.put(voice)
+        # Scale each chunk straight into one int16 buffer: no per-chunk
+        # temporaries or bytes copies
+        out = np.empty(sum(len(c) for c in chunks), dtype=np.int16)
+        pos = 0
+        for chunk in chunks:
+            np.multiply(chunk, 32767, out=out[pos:pos + len(chunk)], casting="unsafe")
+            pos += len(chunk)
+        return out.data.cast("B")